@@ -0,0 +1,157 @@
+# bench_catalog_sync.py
+"""
+Mide la sincronización de la copia local del catálogo (CatalogMirror + CatalogSync) contra un servidor HTTP
+local que sirve el feed de cambios de un catálogo sintético, y la latencia de las búsquedas resueltas desde la copia.
+
+Escenarios:
+    - sincronización completa (sin cursor) de --items items,
+    - sincronización incremental con --delta-percent % de items modificados,
+    - búsquedas por id y por llave alternativa (código de barras) desde SQLite.
+
+Uso:
+    python benchmarks/bench_catalog_sync.py [--items 50000] [--page-size 500] [--delta-percent 1] [--lookups 2000] [--db archivo]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from api import CatalogMirror, CatalogSync, HTTPInterceptor  # noqa: E402
+
+LABEL_SIZE = "4_x_2_5"
+
+
+def make_change(index, updated_at):
+    inventory_id = f"BENCH{index:06d}"
+    item = {
+        "inventory_id": inventory_id,
+        "title": f"Producto de prueba {index}",
+        "label": f"^XA^PW320^LL200^FO20,20^A0N,24,24^FDProducto de prueba {index}^FS^FO20,60^BCN,80,Y,N^FD{inventory_id}^FS^PQ1,0,1,Y^XZ",
+        "pictures": [{"url": f"https://http2.mlstatic.com/D_{index}_{picture}-O.jpg"} for picture in range(3)],
+        "tecneu_item_relationships": [{"tecneu_item": {"_id": f"BENCH{(index + offset) % 50000:06d}"}, "quantity": 1} for offset in (1, 2)],
+        "bins": [{"warehouse": "CDMX", "bin": f"A-{index % 40:02d}-{index % 7}"}],
+    }
+    return {"inventory_id": inventory_id, "updated_at": updated_at, "keys": [f"750{index:010d}"], "item": item}
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        query = parse_qs(urlsplit(self.path).query)
+        updated_after = query.get("updated_after", [""])[0]
+        limit = int(query.get("limit", ["500"])[0])
+        # El catálogo está ordenado por updated_at: la página empieza después del cursor
+        start = server.find_after(updated_after)
+        page = server.catalog[start : start + limit]
+        cursor = page[-1]["updated_at"] if page else updated_after
+        body = json.dumps({"changes": page, "cursor": cursor, "has_more": start + limit < len(server.catalog)}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_feed_server(catalog):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FeedHandler)
+    server.daemon_threads = True
+    server.set_catalog = lambda changes: setattr(server, "catalog", sorted(changes, key=lambda change: change["updated_at"]))
+
+    def find_after(cursor):
+        catalog = server.catalog
+        low, high = 0, len(catalog)
+        while low < high:
+            middle = (low + high) // 2
+            if catalog[middle]["updated_at"] <= cursor:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    server.find_after = find_after
+    server.set_catalog(catalog)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def timed_sync(sync):
+    start = time.perf_counter()
+    applied = sync.sync(LABEL_SIZE)
+    return applied, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=50000, help="Items del catálogo sintético")
+    parser.add_argument("--page-size", type=int, default=500, help="Cambios por página del feed")
+    parser.add_argument("--delta-percent", type=float, default=1, help="Porcentaje de items modificados para la sincronización incremental")
+    parser.add_argument("--lookups", type=int, default=2000, help="Búsquedas desde la copia local")
+    parser.add_argument("--db", help="Archivo SQLite (por defecto, uno temporal)")
+    args = parser.parse_args()
+
+    catalog = [make_change(index, f"2025-01-01T00:00:00.{index:06d}") for index in range(args.items)]
+    server = start_feed_server(catalog)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    interceptor = HTTPInterceptor()
+    interceptor.base_url = base_url
+    interceptor.access_token = "benchmark-token"
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = args.db or os.path.join(temp_dir, "catalog.sqlite3")
+        mirror = CatalogMirror(db_path)
+        sync = CatalogSync(interceptor, mirror, page_size=args.page_size)
+
+        print(f"Servidor local: {base_url} | {args.items} items | páginas de {args.page_size}")
+        print(f"{'escenario':<34}{'cambios':>10}{'segundos':>10}{'items/s':>12}")
+
+        applied, elapsed = timed_sync(sync)
+        print(f"{'sincronización completa':<34}{applied:>10}{elapsed:>10.2f}{applied / elapsed:>12.0f}")
+
+        changed = random.sample(range(args.items), max(1, int(args.items * args.delta_percent / 100)))
+        server.set_catalog(catalog + [make_change(index, f"2025-01-02T00:00:00.{index:06d}") for index in changed])
+        applied, elapsed = timed_sync(sync)
+        print(f"{'sincronización incremental':<34}{applied:>10}{elapsed:>10.2f}{applied / elapsed:>12.0f}")
+
+        applied, elapsed = timed_sync(sync)
+        print(f"{'sin cambios':<34}{applied:>10}{elapsed:>10.2f}{'-':>12}")
+
+        print(f"\nCopia local: {mirror.count()} items, {os.path.getsize(db_path) / 1e6:.1f} MB")
+        print(f"{'búsqueda':<34}{'p50 ms':>10}{'p99 ms':>10}")
+        for name, make_key in (("por id", lambda index: f"BENCH{index:06d}"), ("por código de barras", lambda index: f"750{index:010d}")):
+            latencies = []
+            for index in random.choices(range(args.items), k=args.lookups):
+                start = time.perf_counter()
+                assert mirror.get_item(make_key(index), LABEL_SIZE) is not None
+                latencies.append((time.perf_counter() - start) * 1000)
+            print(f"{name:<34}{statistics.median(latencies):>10.3f}{percentile(latencies, 0.99):>10.3f}")
+
+        mirror.close()
+
+    interceptor.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# bench_http_session.py
+"""
+Compara la latencia de consultas de items con conexiones nuevas por petición (requests.request)
+contra la sesión con pool keep-alive de HTTPInterceptor, usando un servidor HTTP local que imita la API.
+
+El servidor agrega un retraso por cada conexión nueva (--connect-delay) para simular el costo del
+handshake TCP+TLS contra API_BASE_URL, y un retraso por respuesta (--response-delay).
+
+Uso:
+    python benchmarks/bench_http_session.py [--requests 100] [--connect-delay 30] [--response-delay 5] [--workers N]
+"""
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+from PyQt5.QtCore import QThread
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from api import HTTPInterceptor  # noqa: E402
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Necesario para mantener la conexión abierta entre peticiones
+    disable_nagle_algorithm = True  # Encabezados y cuerpo se escriben por separado; sin esto cada respuesta espera el ACK diferido
+
+    def setup(self):
+        super().setup()
+        # Costo de establecer la conexión (se paga una sola vez por conexión)
+        time.sleep(self.server.connect_delay)
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        time.sleep(self.server.response_delay)
+        inventory_id = self.path.split("?", 1)[0].rsplit("/", 1)[-1]
+        self._send_json({"inventory_id": inventory_id, "label": "^XA^FO10,10^BCN,80,Y,N^FD" + inventory_id + "^FS^PQ1,0,1,Y^XZ"})
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._send_json({"access_token": "benchmark-token"})
+
+    def _send_json(self, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stand_in_server(connect_delay, response_delay):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.daemon_threads = True
+    server.connect_delay = connect_delay
+    server.response_delay = response_delay
+    server.connections = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_lookups(lookup, total, workers):
+    """Ejecuta `total` consultas (secuenciales si workers == 1) y retorna la latencia de cada una en ms."""
+
+    def timed_lookup(index):
+        start = time.perf_counter()
+        response = lookup(f"/mercadolibre/items/BENCH{index:04d}")
+        assert response is not None and response.status_code == 200
+        return (time.perf_counter() - start) * 1000
+
+    if workers == 1:
+        return [timed_lookup(index) for index in range(total)]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(timed_lookup, range(total)))
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100, help="Consultas por escenario")
+    parser.add_argument("--connect-delay", type=float, default=30, help="Retraso por conexión nueva, en ms")
+    parser.add_argument("--response-delay", type=float, default=5, help="Retraso por respuesta, en ms")
+    # Igual que MainWindow: hilos del QThreadPool más los de precarga
+    parser.add_argument("--workers", type=int, default=QThread.idealThreadCount() + 2, help="Hilos para el escenario concurrente")
+    args = parser.parse_args()
+
+    server = start_stand_in_server(args.connect_delay / 1000, args.response_delay / 1000)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    interceptor = HTTPInterceptor(pool_size=args.workers)
+    interceptor.base_url = base_url
+    interceptor.access_token = "benchmark-token"
+    workers = interceptor.pool_size
+
+    def lookup_without_session(endpoint):
+        return requests.request("GET", f"{base_url}{endpoint}", headers={"Authorization": "Bearer benchmark-token"}, timeout=interceptor.timeout)
+
+    def lookup_with_session(endpoint):
+        return interceptor.request("GET", endpoint, params={"label_size": "4_x_2_5"})
+
+    print(f"Servidor local: {base_url} | conexión +{args.connect_delay} ms | respuesta +{args.response_delay} ms | pool: {workers}")
+    print(f"{'escenario':<36}{'p50 ms':>10}{'p99 ms':>10}{'conexiones':>12}")
+    for name, lookup in (("sin sesión", lookup_without_session), ("sesión con pool", lookup_with_session)):
+        for mode, mode_workers in (("secuencial", 1), ("concurrente", workers)):
+            connections_before = server.connections
+            latencies = run_lookups(lookup, args.requests, mode_workers)
+            label = f"{name}, {mode}"
+            print(f"{label:<36}{statistics.median(latencies):>10.1f}{percentile(latencies, 0.99):>10.1f}{server.connections - connections_before:>12}")
+
+    interceptor.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
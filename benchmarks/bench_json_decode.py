@@ -0,0 +1,73 @@
+# bench_json_decode.py
+"""
+Compara el costo de decodificar respuestas de items grandes:
+    - response.json() de requests (detecta la codificación, copia el cuerpo a texto y usa json de la biblioteca estándar),
+    - json.loads sobre los bytes de la respuesta,
+    - json_backend.loads (orjson si está instalado; si no, equivale al anterior).
+
+Por defecto usa items sintéticos con 10, 100 y 500 relaciones, con la forma de GET /mercadolibre/items/{id}
+(cada relación trae el tecneu_item anidado con imágenes y ubicaciones). Con --payloads se usan en cambio las
+respuestas grabadas (*.json) de una carpeta.
+
+Uso:
+    python benchmarks/bench_json_decode.py [--relationships 10 100 500] [--payloads carpeta] [--repeat 200]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from api import json_backend  # noqa: E402
+from mock_backend import make_item  # noqa: E402
+
+
+def load_payloads(args):
+    if args.payloads:
+        return [(path.name, path.read_bytes()) for path in sorted(Path(args.payloads).glob("*.json"))]
+    return [(f"{count} relaciones", json.dumps(make_item(count), ensure_ascii=False).encode("utf-8")) for count in args.relationships]
+
+
+def response_json(body):
+    # Igual que una respuesta real sin charset en Content-Type
+    response = requests.models.Response()
+    response._content = body
+    response.encoding = None
+    return response.json()
+
+
+def timed(function, body, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(body)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--relationships", type=int, nargs="+", default=[10, 100, 500], help="Relaciones de cada item sintético")
+    parser.add_argument("--payloads", help="Carpeta con respuestas grabadas (*.json)")
+    parser.add_argument("--repeat", type=int, default=200, help="Decodificaciones por medición")
+    args = parser.parse_args()
+
+    decoders = [("response.json()", response_json), ("json.loads(bytes)", json.loads)]
+    if json_backend.BACKEND != "json":
+        decoders.append((f"{json_backend.BACKEND}.loads(bytes)", json_backend.loads))
+    else:
+        print("orjson no está instalado: json_backend usa json (pip install orjson para compararlo)")
+
+    print(f"{'payload':<20}{'KB':>8}" + "".join(f"{name:>22}" for name, _ in decoders) + "   (mediana, ms)")
+    for name, body in load_payloads(args):
+        results = [timed(decoder, body, args.repeat) for _, decoder in decoders]
+        print(f"{name:<20}{len(body) / 1024:>8.1f}" + "".join(f"{result:>22.3f}" for result in results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+# bench_print_engine.py
+"""
+Mide el ciclo de impresión de PrintThread contra una impresora simulada (sin win32print ni zebra):
+
+1. Rendimiento: etiquetas por segundo del ciclo (sin esperas entre etiquetas) y las efectivas, limitadas por la
+   velocidad de la impresora simulada; CPU por etiqueta.
+2. Memoria: crecimiento (tracemalloc) al imprimir --labels etiquetas.
+3. Detener y pausar: cuánto tarda el hilo en detenerse/pausarse y cuántas etiquetas salen después de pedirlo,
+   con la espera real entre etiquetas del slider (--slider).
+
+Cada medición se hace en los dos modos del slider: una etiqueta a la vez (delay < MAX_DELAY) y todas de una vez
+(delay == MAX_DELAY, un solo trabajo con ^PQ de todas las copias).
+
+La impresora simulada tarda --spool-latency en aceptar cada trabajo (como la cola de impresión) e imprime a
+--speed pulgadas por segundo: los trabajos se encolan en la impresora, que sigue imprimiendo aunque el hilo termine.
+
+Con --graphic-kb la etiqueta lleva un gráfico (^GFA) de ese tamaño, como las etiquetas con logotipos o imágenes.
+Con --console la salida de PrintThread (print y logging) no se descarta, para medir lo que cuesta en el ciclo;
+el logging de la aplicación se escribe en la carpeta de logs habitual, con el nivel de LOG_LEVEL.
+
+Uso:
+    python benchmarks/bench_print_engine.py [--labels 10000] [--spool-latency 0.002] [--speed 6] [--slider 49] [--trials 5]
+                                            [--graphic-kb 0] [--console]
+"""
+import argparse
+import contextlib
+import math
+import os
+import re
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from config import MAX_DELAY  # noqa: E402
+from print_thread import PrintThread  # noqa: E402
+
+LABEL_ZPL = "^XA^PW406^LL203^FO20,20^A0N,30,30^FDRefacción TEC-00001^FS^FO20,70^BCN,80,Y,N^FDTEC-00001^FS^PQ1,0,1,Y^XZ"
+PRINTER_DPI = 203
+ONE_AT_A_TIME = "una a la vez"
+ALL_AT_ONCE = "todas de una vez"
+MODES = {ONE_AT_A_TIME: 1, ALL_AT_ONCE: MAX_DELAY}  # Valor del slider de cada modo
+
+
+class SimulatedPrinter:
+    """Transporte para PrintThread (método `output`) que simula la cola de impresión y la velocidad de la impresora."""
+
+    def __init__(self, spool_latency, speed_ips):
+        self.spool_latency = spool_latency
+        self.speed_ips = speed_ips
+        self.lock = threading.Lock()
+        self.jobs = 0
+        self.labels = 0
+        self.last_output = 0.0
+        self.busy_until = 0.0  # Momento en que la impresora termina todo lo encolado
+
+    def output(self, zpl):
+        time.sleep(self.spool_latency)
+        copies = sum(int(match) for match in re.findall(r"\^PQ(\d+)", zpl, flags=re.IGNORECASE)) or 1
+        length_match = re.search(r"\^LL(\d+)", zpl, flags=re.IGNORECASE)
+        length_inches = int(length_match.group(1)) / PRINTER_DPI if length_match else 1.0
+        now = time.perf_counter()
+        with self.lock:
+            self.busy_until = max(now, self.busy_until) + copies * length_inches / self.speed_ips
+            self.jobs += 1
+            self.labels += copies
+            self.last_output = now
+
+
+class BenchPrintThread(PrintThread):
+    """PrintThread con la espera entre etiquetas configurable (None: la del slider, como en la aplicación)."""
+
+    def __init__(self, *args, inter_label_wait=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.inter_label_wait = inter_label_wait
+
+    def wait_with_delay(self):
+        if self.inter_label_wait is None:
+            super().wait_with_delay()
+            return
+        with self.condition:
+            self.condition.wait(self.inter_label_wait)
+
+
+def slider_wait(slider):
+    """Espera entre etiquetas (s) para un valor del slider, como en PrintThread.wait_with_delay."""
+    return PrintThread.calculate_inverse_delay(None, math.log(slider, 1.05), 0.5, 80)
+
+
+def label_zpl(graphic_kb):
+    """La etiqueta del benchmark, con un gráfico ^GFA de `graphic_kb` KB (en hexadecimal) si se pide."""
+    if not graphic_kb:
+        return LABEL_ZPL
+    row_bytes = 50
+    data_bytes = graphic_kb * 1024 // 2 // row_bytes * row_bytes
+    graphic = f"^FO20,120^GFA,{data_bytes},{data_bytes},{row_bytes},{'A5' * data_bytes}^FS"
+    return LABEL_ZPL.replace("^PQ1", graphic + "^PQ1")
+
+
+def new_thread(mode, copies, printer, args, slider=None, inter_label_wait=0.0):
+    delay = MODES[mode] if mode == ALL_AT_ONCE or slider is None else slider
+    return BenchPrintThread(copies, delay, label_zpl(args.graphic_kb), "simulada", transport=printer, inter_label_wait=inter_label_wait)
+
+
+def measure_throughput(mode, labels, args):
+    printer = SimulatedPrinter(args.spool_latency, args.speed)
+    thread = new_thread(mode, labels, printer, args)
+    started, cpu_started = time.perf_counter(), time.process_time()
+    thread.start()
+    thread.wait()
+    wall, cpu = time.perf_counter() - started, time.process_time() - cpu_started
+    printed_at = max(wall, printer.busy_until - started)
+    return {"ciclo (etiq/s)": labels / wall, "efectivas (etiq/s)": labels / printed_at, "CPU/etiqueta (µs)": cpu / labels * 1e6, "trabajos": printer.jobs}
+
+
+def measure_memory(mode, labels, args):
+    printer = SimulatedPrinter(0.0, args.speed)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    thread = new_thread(mode, labels, printer, args)
+    thread.start()
+    thread.wait()
+    del thread
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"crecimiento (KB)": (after - before) / 1024, "pico (KB)": (peak - before) / 1024}
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.perf_counter() + timeout
+    while not condition() and time.perf_counter() < deadline:
+        time.sleep(0.001)
+
+
+def measure_stop(mode, args):
+    printer = SimulatedPrinter(args.spool_latency, args.speed)
+    thread = new_thread(mode, args.labels, printer, args, slider=args.slider, inter_label_wait=None)
+    thread.start()
+    wait_for(lambda: printer.jobs >= (3 if mode == ONE_AT_A_TIME else 1))
+    requested_at = time.perf_counter()
+    labels_before = printer.labels
+    thread.stop_printing()
+    latency = time.perf_counter() - requested_at
+    # Lo que ya se envió a la impresora se sigue imprimiendo después de detener el hilo
+    return latency * 1000, printer.labels - labels_before, max(0.0, printer.busy_until - requested_at)
+
+
+def measure_pause(mode, args):
+    printer = SimulatedPrinter(args.spool_latency, args.speed)
+    thread = new_thread(mode, args.labels, printer, args, slider=args.slider, inter_label_wait=None)
+    thread.start()
+    wait_for(lambda: printer.jobs >= (3 if mode == ONE_AT_A_TIME else 1))
+    requested_at = time.perf_counter()
+    labels_before = printer.labels
+    thread.toggle_pause()
+    # Se observa más que una espera entre etiquetas: la pausa se revisa al terminar la espera en curso
+    time.sleep(slider_wait(args.slider) + 0.3)
+    last_output = printer.last_output
+    labels_after = printer.labels - labels_before
+    printer_tail = max(0.0, printer.busy_until - requested_at)
+    thread.stop_printing()
+    return (last_output - requested_at) * 1000 if labels_after else 0.0, labels_after, printer_tail
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--labels", type=int, default=10_000, help="Etiquetas por medición de rendimiento y memoria")
+    parser.add_argument("--spool-latency", type=float, default=0.002, help="Tiempo de la cola de impresión por trabajo (s)")
+    parser.add_argument("--speed", type=float, default=6.0, help="Velocidad de la impresora (pulgadas/s)")
+    parser.add_argument("--slider", type=int, default=MAX_DELAY - 1, help="Valor del slider para detener/pausar (una a la vez)")
+    parser.add_argument("--trials", type=int, default=5, help="Repeticiones de detener/pausar")
+    parser.add_argument("--graphic-kb", type=int, default=0, help="Tamaño del gráfico ^GFA de la etiqueta (KB)")
+    parser.add_argument("--console", action="store_true", help="No descartar la salida de PrintThread")
+    args = parser.parse_args()
+
+    # Sin --console la salida de PrintThread se descarta para no medir la terminal
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(sys.stdout if args.console else devnull):
+        results = {}
+        for mode in MODES:
+            results[mode] = {
+                **measure_throughput(mode, args.labels, args),
+                **measure_memory(mode, args.labels, args),
+                "stop": [measure_stop(mode, args) for _ in range(args.trials)],
+                "pause": [measure_pause(mode, args) for _ in range(args.trials)],
+            }
+
+    wait = slider_wait(args.slider)
+    print(f"{args.labels} etiquetas de {len(label_zpl(args.graphic_kb)) / 1024:.1f} KB, cola {args.spool_latency * 1000:.1f} ms/trabajo, impresora {args.speed} pulg/s;"
+          f" detener/pausar con slider {args.slider} ({wait:.2f} s entre etiquetas)")
+    for mode, result in results.items():
+        stops, pauses = result["stop"], result["pause"]
+        print(f"\n{mode}")
+        print(f"  ciclo {result['ciclo (etiq/s)']:.0f} etiq/s, efectivas {result['efectivas (etiq/s)']:.1f} etiq/s,"
+              f" CPU {result['CPU/etiqueta (µs)']:.0f} µs/etiqueta, {result['trabajos']} trabajos")
+        print(f"  memoria: crecimiento {result['crecimiento (KB)']:.1f} KB, pico {result['pico (KB)']:.1f} KB")
+        print(f"  detener (el hilo termina): mediana {statistics.median(stop[0] for stop in stops):.1f} ms, máx {max(stop[0] for stop in stops):.1f} ms;"
+              f" etiquetas después {max(stop[1] for stop in stops)}; la impresora sigue {max(stop[2] for stop in stops):.1f} s")
+        print(f"  pausar (última etiqueta enviada): mediana {statistics.median(pause[0] for pause in pauses):.1f} ms, máx {max(pause[0] for pause in pauses):.1f} ms;"
+              f" etiquetas después {max(pause[1] for pause in pauses)}; la impresora sigue {max(pause[2] for pause in pauses):.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+# bench_scan_to_ready.py
+"""
+Mide la latencia de un escaneo hasta "listo para imprimir": MainWindow.execute_search -> SearchWorker ->
+handle_search_result -> validate_and_update_copies_from_zpl (tras el debounce del editor) -> vista previa
+de la etiqueta y miniaturas del carrusel, contra la API simulada de mock_backend.py (API, imágenes y Labelary).
+
+Corre sin pantalla con la plataforma offscreen de Qt (o con un servidor X virtual: xvfb-run python ...).
+La caché en disco, la copia local del catálogo y QSettings se redirigen a una carpeta temporal, así que no se
+tocan los datos ni el token del usuario.
+
+Etapas reportadas (ms desde el escaneo):
+    api            el resultado de la búsqueda llega al hilo de la UI (handle_search_result)
+    zpl            el editor procesó la etiqueta (validate_and_update_copies_from_zpl)
+    preview        la vista previa de la etiqueta está en pantalla
+    carousel_first primera miniatura del carrusel en pantalla
+    carousel       todas las miniaturas en pantalla
+    ready          vista previa y carrusel completos
+
+Uso:
+    python benchmarks/bench_scan_to_ready.py [--scans 300] [--latency 0.03] [--render-latency 0.08] [--output resultados.json] [--baseline anterior.json]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT / "src"), str(Path(__file__).resolve().parent)]
+
+from mock_backend import MockBackend  # noqa: E402
+
+STAGES = ["api", "zpl", "preview", "carousel_first", "carousel", "ready"]
+SCAN_TIMEOUT = 15.0  # s; el escaneo se registra como incompleto si no termina antes
+
+
+class ScanClock:
+    """Marca de tiempo de cada etapa del escaneo en curso (la primera marca de cada etapa es la que cuenta)."""
+
+    def __init__(self):
+        self.started_at = None
+        self.marks = {}
+        self.expected_images = 0
+        self.loaded_images = 0
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self.marks = {}
+        self.expected_images = 0
+        self.loaded_images = 0
+
+    def mark(self, stage):
+        if self.started_at is not None and stage not in self.marks:
+            self.marks[stage] = (time.perf_counter() - self.started_at) * 1000
+
+    @property
+    def ready(self):
+        carousel_done = "carousel" in self.marks or ("zpl" in self.marks and self.expected_images == 0)
+        if "preview" in self.marks and carousel_done:
+            self.mark("ready")
+            return True
+        return False
+
+
+def instrument(window, clock):
+    """Engancha el reloj a MainWindow sin cambiar su comportamiento."""
+    handle_search_result = window.handle_search_result
+
+    def timed_search_result(item, token=None):
+        clock.mark("api")
+        handle_search_result(item, token)
+
+    window.handle_search_result = timed_search_result
+
+    # Se conecta después del slot de MainWindow, así que se ejecuta cuando la etiqueta ya fue procesada
+    def editor_processed():
+        if "api" in clock.marks:
+            clock.expected_images = len(window.carousel.images) if window.carousel.is_visible else 0
+            clock.mark("zpl")
+
+    window.zpl_textedit.textChangedDelayed.connect(editor_processed)
+
+    show_image = window.labelViewer._show_image
+
+    def timed_show_image(image):
+        show_image(image)
+        clock.mark("preview")
+
+    window.labelViewer._show_image = timed_show_image
+
+    handle_reply = window.carousel.handle_reply
+
+    def timed_handle_reply(reply):
+        handle_reply(reply)
+        clock.loaded_images += 1
+        clock.mark("carousel_first")
+        if clock.loaded_images >= len(window.carousel.images):
+            clock.mark("carousel")
+
+    window.carousel.handle_reply = timed_handle_reply
+
+
+def wait_until(app, condition, timeout):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            return False
+        app.processEvents()
+        time.sleep(0.001)
+    return True
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else None
+
+
+def summarize(scans):
+    summary = {}
+    for stage in STAGES:
+        values = [scan[stage] for scan in scans if stage in scan]
+        if values:
+            summary[stage] = {
+                "count": len(values),
+                "mean": sum(values) / len(values),
+                "p50": percentile(values, 0.50),
+                "p95": percentile(values, 0.95),
+                "p99": percentile(values, 0.99),
+                "max": max(values),
+            }
+    return summary
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_summary(summary, baseline=None):
+    print(f"{'etapa':<16}{'n':>6}{'p50':>10}{'p95':>10}{'p99':>10}{'máx':>10}" + ("   p50 vs base   p95 vs base" if baseline else "") + "   (ms)")
+    for stage in STAGES:
+        stats = summary.get(stage)
+        if stats is None:
+            continue
+        line = f"{stage:<16}{stats['count']:>6}{stats['p50']:>10.1f}{stats['p95']:>10.1f}{stats['p99']:>10.1f}{stats['max']:>10.1f}"
+        base = (baseline or {}).get(stage)
+        if base:
+            line += "".join(f"{(stats[key] - base[key]) / base[key]:>+14.0%}" if base[key] else f"{'-':>14}" for key in ("p50", "p95"))
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scans", type=int, default=300, help="Escaneos medidos")
+    parser.add_argument("--warmup", type=int, default=5, help="Escaneos previos que no se miden")
+    parser.add_argument("--distinct", type=int, default=0, help="Ids distintos a escanear en ciclo (0: todos distintos, sin caché)")
+    parser.add_argument("--latency", type=float, default=0.03, help="Latencia de la API simulada (s)")
+    parser.add_argument("--jitter", type=float, default=0.01, help="Variación de la latencia (± s)")
+    parser.add_argument("--render-latency", type=float, default=0.08, help="Latencia de Labelary simulado (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fracción de peticiones de items que responden 503")
+    parser.add_argument("--relationships", type=int, default=10, help="Relaciones de cada item")
+    parser.add_argument("--output", help="Archivo JSON donde guardar los resultados")
+    parser.add_argument("--baseline", help="Resultados JSON anteriores para comparar")
+    args = parser.parse_args()
+
+    backend = MockBackend(
+        relationships=args.relationships,
+        latency=args.latency,
+        jitter=args.jitter,
+        render_latency=args.render_latency,
+        error_rate=args.error_rate,
+        catalog_size=0,
+    ).start()
+
+    # Antes de importar config: la aplicación apunta a la API simulada y guarda sus cachés en una carpeta temporal
+    data_dir = tempfile.mkdtemp(prefix="scan_to_ready_")
+    os.environ["API_BASE_URL"] = backend.base_url
+    os.environ["LABELARY_URL"] = backend.base_url
+    os.environ["LOCALAPPDATA"] = data_dir
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    from PyQt5.QtCore import QSettings
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication(sys.argv[:1])
+
+    from api import http_interceptor
+    from ui import main_window
+
+    # El token y las preferencias del usuario no se leen ni se tocan: la ventana y la API usan un archivo temporal
+    def temporary_settings(*args):
+        return QSettings(os.path.join(data_dir, "settings.ini"), QSettings.IniFormat)
+
+    main_window.QSettings = http_interceptor.QSettings = temporary_settings
+
+    window = main_window.MainWindow()
+    window.catalog_sync_timer.stop()
+    window.show()
+
+    clock = ScanClock()
+    instrument(window, clock)
+    scans = []
+    incomplete = 0
+    for index in range(args.warmup + args.scans):
+        scan_id = f"SCAN-{index % args.distinct if args.distinct else index:05d}"
+        clock.start()
+        window.execute_search(scan_id)
+        completed = wait_until(app, lambda: clock.ready, SCAN_TIMEOUT)
+        if index < args.warmup:
+            continue
+        if not completed:
+            incomplete += 1
+        scans.append({"id": scan_id, "completed": completed, **clock.marks})
+
+    summary = summarize(scans)
+    results = {
+        "benchmark": "scan_to_ready",
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "revision": git_revision(),
+        "platform": f"{platform.system()} {platform.release()} / Python {platform.python_version()} / {os.environ['QT_QPA_PLATFORM']}",
+        "settings": vars(args),
+        "backend_requests": dict(backend.stats),
+        "incomplete": incomplete,
+        "summary": summary,
+        "scans": scans,
+    }
+
+    baseline = None
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))["summary"]
+    print(f"{len(scans)} escaneos ({incomplete} incompletos), revisión {results['revision']}")
+    print_summary(summary, baseline)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"Resultados guardados en {args.output}")
+
+    window.close()
+    backend.stop()
+    return 1 if incomplete else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+# bench_transfer_bytes.py
+"""
+Mide los bytes que se ahorran por búsqueda (scan) con la compresión de la API y con las miniaturas de imágenes.
+
+1. API: sirve desde un servidor local un item (sintético, con N relaciones, o uno grabado con --item) y lo pide
+   con HTTPInterceptor sin compresión y con cada compresión aceptada (gzip; br si brotli está instalado).
+2. Imágenes (requiere acceso a internet, --images): descarga cada imagen del item (carrusel y relaciones)
+   como imagen completa y como miniatura de MercadoLibre, y compara los bytes.
+
+Uso:
+    python benchmarks/bench_transfer_bytes.py [--relationships 20] [--item respuesta.json] [--images]
+"""
+import argparse
+import gzip
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from api import HTTPInterceptor  # noqa: E402
+from api.http_interceptor import ACCEPT_ENCODING, HAS_BROTLI  # noqa: E402
+from custom_widgets.image_loader import thumbnail_url  # noqa: E402
+from mock_backend import make_item  # noqa: E402
+
+if HAS_BROTLI:
+    try:
+        import brotli
+    except ImportError:
+        import brotlicffi as brotli
+
+
+class ItemHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        body = self.server.body
+        accepted = self.headers.get("Accept-Encoding", "")
+        encoding = None
+        if HAS_BROTLI and "br" in accepted:
+            body, encoding = brotli.compress(body), "br"
+        elif "gzip" in accepted:
+            body, encoding = gzip.compress(body), "gzip"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def image_urls(item):
+    urls = [picture["url"] for picture in item.get("pictures", [])]
+    for relationship in item.get("tecneu_item_relationships", []):
+        pictures = relationship.get("tecneu_item", {}).get("pictures", [])
+        if pictures:
+            urls.append(pictures[0]["url"])  # La ventana de relaciones muestra solo la primera
+    return urls
+
+
+def measure_api(body):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ItemHandler)
+    server.daemon_threads = True
+    server.body = body
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    interceptor = HTTPInterceptor()
+    interceptor.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    interceptor.access_token = "benchmark-token"
+    results = []
+    for accept_encoding in ("identity", ACCEPT_ENCODING):
+        response = interceptor.request("GET", "/mercadolibre/items/BENCH", headers={"Accept-Encoding": accept_encoding})
+        content = response.content
+        results.append((accept_encoding, response.headers.get("Content-Encoding", "-"), response.raw.tell(), len(content)))
+    interceptor.close()
+    server.shutdown()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--relationships", type=int, default=20, help="Relaciones del item sintético")
+    parser.add_argument("--item", help="Respuesta grabada de GET /mercadolibre/items/{id} (JSON)")
+    parser.add_argument("--images", action="store_true", help="Descarga las imágenes del item para comparar miniatura y original")
+    args = parser.parse_args()
+
+    body = Path(args.item).read_bytes() if args.item else json.dumps(make_item(args.relationships), ensure_ascii=False).encode("utf-8")
+    item = json.loads(body)
+
+    print("API (respuesta de item)")
+    print(f"{'Accept-Encoding':<34}{'Content-Encoding':>18}{'bytes red':>12}{'bytes JSON':>12}")
+    results = measure_api(body)
+    for accept_encoding, content_encoding, wire, decoded in results:
+        print(f"{accept_encoding:<34}{content_encoding:>18}{wire:>12}{decoded:>12}")
+    print(f"Ahorro por búsqueda: {results[0][2] - results[1][2]} bytes ({1 - results[1][2] / results[0][2]:.0%})")
+
+    if not args.images:
+        print("\nImágenes: usa --images (con acceso a internet) para comparar miniaturas contra originales.")
+        return
+
+    print("\nImágenes (carrusel + relaciones)")
+    full_total = thumb_total = 0
+    with requests.Session() as session:
+        for url in image_urls(item):
+            try:
+                full = len(session.get(url, timeout=10).content)
+                thumb = len(session.get(thumbnail_url(url), timeout=10).content)
+            except requests.RequestException as e:
+                print(f"  {url}: {e}")
+                continue
+            full_total += full
+            thumb_total += thumb
+            print(f"  {url.rsplit('/', 1)[-1]:<50}{full:>10}{thumb:>10}")
+    if full_total:
+        print(f"Ahorro por búsqueda: {full_total - thumb_total} bytes ({1 - thumb_total / full_total:.0%}); completas {full_total}, miniaturas {thumb_total}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+# mock_backend.py
+"""
+Servidor local que reemplaza a la API, a las imágenes de MercadoLibre y a Labelary, para probar y medir la
+aplicación (HTTPInterceptor, SearchWorker, carrusel y vista previa) sin el backend real ni internet.
+
+Sirve:
+    POST /auth/login                       JWT que vencen a los --token-ttl segundos (los GET con token vencido: 401)
+    GET  /mercadolibre/items/{id}          item grabado ({id}.json en --payloads) o sintético; respeta `fields`
+    POST /mercadolibre/items/batch         varios items en una petición
+    GET  /mercadolibre/items/changes       feed de cambios del catálogo (todos los items conocidos)
+    GET  /images/{nombre}                  imágenes PNG (las de los items apuntan aquí)
+    POST /v1/printers/{dpmm}/labels/{w}x{h}/0   PNG del tamaño de la etiqueta, como Labelary
+
+Con --latency/--jitter cada respuesta se retrasa, y con --error-rate una fracción de las peticiones de items
+responde 503. Las respuestas JSON se comprimen con gzip si el cliente lo acepta.
+
+Uso:
+    python benchmarks/mock_backend.py [--port 8765] [--latency 0.05] [--error-rate 0.02] [--token-ttl 300] [--payloads carpeta]
+
+y en otra terminal, apuntando la aplicación al servidor:
+    API_BASE_URL=http://127.0.0.1:8765 LABELARY_URL=http://127.0.0.1:8765 python src/main.py
+
+Desde un benchmark o prueba se usa como context manager:
+    with MockBackend(latency=0.03) as backend:
+        interceptor.base_url = backend.base_url
+"""
+import argparse
+import base64
+import gzip
+import json
+import random
+import re
+import struct
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+__all__ = ["MockBackend", "make_item", "make_png"]
+
+LABEL_DPMM = {"6dpmm": 6, "8dpmm": 8, "12dpmm": 12, "24dpmm": 24}
+IMAGE_SIZE = 500  # Lado (px) de las imágenes de los items; las miniaturas (-I) miden la quinta parte
+MAX_LABEL_PIXELS = 2400  # Lado máximo de las vistas previas generadas
+CATALOG_UPDATED_AT = "2024-01-01T00:00:00.000Z"
+
+
+def make_png(width, height, noise=None):
+    """
+    PNG RGB de `width`x`height`. Con `noise` (random.Random) una de cada 8 filas es ruido, para que pese
+    aproximadamente lo que una foto de MercadoLibre del mismo tamaño; si no, franjas (como una etiqueta).
+    """
+    if noise is not None:
+        plain = b"\x00" + b"\xee" * (width * 3)
+        rows = b"".join(b"\x00" + noise.randbytes(width * 3) if y % 8 == 0 else plain for y in range(height))
+    else:
+        row = b"\x00" + b"".join(b"\x00\x00\x00" if (x // 4) % 3 == 0 else b"\xff\xff\xff" for x in range(width))
+        rows = row * height
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(rows, 6)) + chunk(b"IEND", b"")
+
+
+def make_jwt(ttl):
+    """JWT sin firma válida (la aplicación solo lee `exp` e `iat`)."""
+    now = time.time()
+
+    def encode(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode("utf-8")).rstrip(b"=").decode("ascii")
+
+    return f"{encode({'alg': 'HS256', 'typ': 'JWT'})}.{encode({'iat': now, 'exp': now + ttl, 'sub': 'mock'})}.mock"
+
+
+def make_item(relationships):
+    """Item sintético con la forma de GET /mercadolibre/items/{id} y `relationships` relaciones."""
+    def tecneu_item(index):
+        return {
+            "_id": f"65f0c1d2e3a4b5c6d7e8{index:04d}",
+            "title": f"Refacción compatible modelo {index} — juego completo con accesorios",
+            "pictures": [{"url": f"https://http2.mlstatic.com/D_NQ_NP_{index}{picture}-MLM.webp", "id": f"{index}-{picture}"} for picture in range(4)],
+            "tecneu_warehouse_bins": [{"warehouse": "CDMX", "bin": f"A-{index % 40:02d}-{bin_index}", "quantity": index % 9} for bin_index in range(2)],
+            "sku": f"TEC-{index:05d}",
+        }
+
+    return {
+        "_id": "65f0c1d2e3a4b5c6d7e80000",
+        "label": "^XA^PW320^LL200" + "".join(f"^FO20,{20 + 30 * line}^A0N,24,24^FDLínea {line} ñ áéí^FS" for line in range(6)) + "^FO20,200^BCN,80,Y,N^FDTEC-00000^FS^PQ1,0,1,Y^XZ",
+        "pictures": [{"url": f"https://http2.mlstatic.com/D_NQ_NP_0{picture}-MLM.webp"} for picture in range(8)],
+        "tecneu_item_relationships": [{"quantity": 1 + index % 3, "tecneu_item": tecneu_item(index + 1)} for index in range(relationships)],
+        "variations": [{"id": index, "attributes": [{"name": "Color", "value": "Rojo"}, {"name": "Talla", "value": "M"}]} for index in range(10)],
+    }
+
+
+class MockBackendHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        backend = self.server.backend
+        path = urlsplit(self.path).path
+        query = parse_qs(urlsplit(self.path).query)
+        if path.startswith("/images/"):
+            backend.count("image")
+            backend.delay()
+            self._send(200, backend.image(path.rsplit("/", 1)[-1]), "image/png")
+            return
+        if not path.startswith("/mercadolibre/items/"):
+            self._send_json(404, {"message": "not found"})
+            return
+        if not self._authorized():
+            return
+        if path == "/mercadolibre/items/changes":
+            backend.count("changes")
+            backend.delay()
+            self._send_json(200, backend.changes(query.get("updated_after", [""])[0], int(query.get("limit", ["500"])[0])))
+            return
+
+        backend.count("item")
+        backend.delay()
+        if backend.inject_error():
+            self._send_json(503, {"message": "error inyectado"}, {"Retry-After": "0"})
+            return
+        item = backend.item(path.rsplit("/", 1)[-1], query.get("fields", [None])[0])
+        if item is None:
+            self._send_json(404, {"message": "not found"})
+        else:
+            self._send(200, item, "application/json")
+
+    def do_POST(self):
+        backend = self.server.backend
+        path = urlsplit(self.path).path
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if path == "/auth/login":
+            backend.count("login")
+            backend.delay()
+            self._send_json(200, {"access_token": backend.issue_token()})
+            return
+        match = re.match(r"/v1/printers/(\w+)/labels/([\d.]+)x([\d.]+)/\d+$", path)
+        if match:
+            backend.count("render")
+            time.sleep(backend.render_latency)
+            self._send(200, backend.label_png(*match.groups()), "image/png", compress=False)
+            return
+        if path == "/mercadolibre/items/batch":
+            if not self._authorized():
+                return
+            backend.count("batch")
+            backend.delay()
+            if backend.inject_error():
+                self._send_json(503, {"message": "error inyectado"}, {"Retry-After": "0"})
+                return
+            fields = parse_qs(urlsplit(self.path).query).get("fields", [None])[0]
+            items = {}
+            for inventory_id in json.loads(body or b"{}").get("inventory_ids", []):
+                item = backend.item(inventory_id, fields)
+                if item is not None:
+                    items[inventory_id] = json.loads(item)
+            self._send_json(200, {"items": items})
+            return
+        self._send_json(404, {"message": "not found"})
+
+    def _authorized(self):
+        if self.server.backend.token_is_valid(self.headers.get("Authorization", "").removeprefix("Bearer ")):
+            return True
+        self.server.backend.count("unauthorized")
+        self._send_json(401, {"message": "token expirado"})
+        return False
+
+    def _send_json(self, status, data, headers=None):
+        self._send(status, json.dumps(data, ensure_ascii=False).encode("utf-8"), "application/json", headers=headers)
+
+    def _send(self, status, body, content_type, headers=None, compress=True):
+        compress = compress and content_type == "application/json" and "gzip" in self.headers.get("Accept-Encoding", "")
+        if compress:
+            body = gzip.compress(body, 6)
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            if compress:
+                self.send_header("Content-Encoding", "gzip")
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except OSError:
+            pass  # El cliente cerró la conexión (petición cancelada)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockBackend:
+    """
+    Servidor de la API simulada (en un hilo propio). Las respuestas de items salen de `payloads_dir`
+    ({inventory_id}.json, respuestas grabadas de GET /mercadolibre/items/{id}) o, si no está el archivo,
+    se generan con `relationships` relaciones. Con `payloads_dir` y `synthetic=False`, los ids sin archivo dan 404.
+
+    Inyección de fallas:
+        latency, jitter   segundos de retraso de cada respuesta (latency ± jitter)
+        render_latency    retraso de las vistas previas (Labelary suele ser más lento que la API)
+        error_rate        fracción de peticiones de items que responden 503
+        token_ttl         vida de los tokens emitidos; `expire_tokens()` invalida los ya emitidos
+    """
+
+    def __init__(self, port=0, payloads_dir=None, synthetic=True, relationships=10, latency=0.0, jitter=0.0,
+                 render_latency=0.0, error_rate=0.0, token_ttl=3600, catalog_size=100, seed=0):
+        self.payloads_dir = Path(payloads_dir) if payloads_dir else None
+        self.synthetic = synthetic
+        self.relationships = relationships
+        self.latency = latency
+        self.jitter = jitter
+        self.render_latency = render_latency
+        self.error_rate = error_rate
+        self.token_ttl = token_ttl
+        self.catalog_size = catalog_size
+        self.stats = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._images = {}
+        self._tokens_valid_after = 0.0
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), MockBackendHandler)
+        self._server.daemon_threads = True
+        self._server.backend = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="MockBackend", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def count(self, kind):
+        with self._lock:
+            self.stats[kind] += 1
+
+    def delay(self):
+        if self.latency or self.jitter:
+            with self._lock:
+                offset = self._random.uniform(-self.jitter, self.jitter)
+            time.sleep(max(0.0, self.latency + offset))
+
+    def inject_error(self):
+        with self._lock:
+            failed = self.error_rate > 0 and self._random.random() < self.error_rate
+            if failed:
+                self.stats["injected_error"] += 1
+        return failed
+
+    def issue_token(self):
+        return make_jwt(self.token_ttl)
+
+    def expire_tokens(self):
+        """Invalida los tokens ya emitidos: las siguientes peticiones reciben 401 hasta que la aplicación renueve el login."""
+        self._tokens_valid_after = time.time()
+
+    def token_is_valid(self, token):
+        try:
+            payload = token.split(".")[1]
+            claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        except (IndexError, ValueError):
+            return False
+        return claims.get("exp", 0) > time.time() and claims.get("iat", 0) >= self._tokens_valid_after
+
+    def item(self, inventory_id, fields=None):
+        """Cuerpo JSON (bytes) del item, proyectado a `fields` si se pidió, o None si no existe."""
+        path = self.payloads_dir / f"{inventory_id}.json" if self.payloads_dir else None
+        if path is not None and path.is_file():
+            body = path.read_bytes()
+        elif self.synthetic:
+            body = json.dumps(self.synthetic_item(inventory_id), ensure_ascii=False).encode("utf-8")
+        else:
+            return None
+        if fields:
+            item = json.loads(body)
+            body = json.dumps({key: value for key, value in item.items() if key in fields.split(",")}, ensure_ascii=False).encode("utf-8")
+        return body
+
+    def synthetic_item(self, inventory_id):
+        item = make_item(self.relationships)
+        item["_id"] = inventory_id
+        item["label"] = item["label"].replace("TEC-00000", inventory_id)
+        # Las imágenes se sirven desde este mismo servidor
+        for picture in item["pictures"] + [picture for rel in item["tecneu_item_relationships"] for picture in rel["tecneu_item"]["pictures"]]:
+            picture["url"] = f"{self.base_url}/images/{picture['url'].rsplit('/', 1)[-1].replace('.webp', '.png')}"
+        return item
+
+    def catalog_ids(self):
+        if self.payloads_dir:
+            return sorted(path.stem for path in self.payloads_dir.glob("*.json"))
+        return [f"MOCK-{index:05d}" for index in range(1, self.catalog_size + 1)]
+
+    def changes(self, updated_after, limit):
+        """Feed de cambios: todos los items tienen la misma fecha, así que tras la primera descarga no hay cambios."""
+        if updated_after >= CATALOG_UPDATED_AT:
+            return {"changes": [], "cursor": updated_after, "has_more": False}
+        inventory_ids = self.catalog_ids()
+        offset = int(updated_after.rsplit("#", 1)[-1]) if "#" in updated_after else 0
+        page = inventory_ids[offset:offset + limit]
+        has_more = offset + limit < len(inventory_ids)
+        # Mientras hay más páginas el cursor lleva la posición; la última deja la fecha del catálogo
+        cursor = f"#{offset + limit}" if has_more else CATALOG_UPDATED_AT
+        changes = [{"inventory_id": inventory_id, "updated_at": CATALOG_UPDATED_AT, "keys": [], "item": json.loads(self.item(inventory_id))} for inventory_id in page]
+        return {"changes": changes, "cursor": cursor, "has_more": has_more}
+
+    def image(self, name):
+        # Variante de tamaño de MercadoLibre: la letra antes de la extensión (-I: miniatura)
+        size = IMAGE_SIZE // 5 if re.search(r"-I\.\w+$", name) else IMAGE_SIZE
+        with self._lock:
+            image = self._images.get(size)
+            if image is None:
+                image = self._images[size] = make_png(size, size, random.Random(size))
+        return image
+
+    def label_png(self, density, width_inches, height_inches):
+        dots_per_inch = LABEL_DPMM.get(density, 8) * 25.4
+        width = min(MAX_LABEL_PIXELS, max(1, round(float(width_inches) * dots_per_inch)))
+        height = min(MAX_LABEL_PIXELS, max(1, round(float(height_inches) * dots_per_inch)))
+        key = ("label", width, height)
+        with self._lock:
+            image = self._images.get(key)
+            if image is None:
+                image = self._images[key] = make_png(width, height)
+        return image
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--payloads", help="Carpeta con respuestas grabadas ({inventory_id}.json)")
+    parser.add_argument("--only-payloads", action="store_true", help="Responder 404 a los ids sin respuesta grabada")
+    parser.add_argument("--relationships", type=int, default=10, help="Relaciones de los items sintéticos")
+    parser.add_argument("--latency", type=float, default=0.0, help="Retraso de cada respuesta (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Variación aleatoria del retraso (± s)")
+    parser.add_argument("--render-latency", type=float, default=0.0, help="Retraso de las vistas previas (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fracción de peticiones de items que responden 503")
+    parser.add_argument("--token-ttl", type=float, default=3600, help="Vida de los tokens emitidos (s)")
+    args = parser.parse_args()
+
+    backend = MockBackend(
+        port=args.port,
+        payloads_dir=args.payloads,
+        synthetic=not args.only_payloads,
+        relationships=args.relationships,
+        latency=args.latency,
+        jitter=args.jitter,
+        render_latency=args.render_latency,
+        error_rate=args.error_rate,
+        token_ttl=args.token_ttl,
+    )
+    backend.start()
+    print(f"API simulada en {backend.base_url} (Ctrl+C para terminar)")
+    print(f"    API_BASE_URL={backend.base_url} LABELARY_URL={backend.base_url} python src/main.py")
+    try:
+        while True:
+            time.sleep(60)
+            print(f"Peticiones: {dict(backend.stats)}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        backend.stop()
+
+
+if __name__ == "__main__":
+    main()
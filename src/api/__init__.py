@@ -1,3 +1,10 @@
 # api/__init__.py
+from .async_client import ApiBatch, ApiFuture, AsyncApiClient
+from .catalog_mirror import CatalogMirror, CatalogSync
 from .endpoints import APIEndpoints
 from .http_interceptor import HTTPInterceptor  # Importa la clase principal del paquete
+from .item_cache import ItemCache
+from .lazy_json import LazyJsonObject
+from .single_flight import SingleFlight
+from .request_tracker import RequestToken, RequestTracker
+from .retry_policy import BreakerStateNotifier, CircuitBreaker, RetryPolicy
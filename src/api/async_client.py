@@ -0,0 +1,308 @@
+import asyncio
+import logging
+import threading
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from .endpoints import BATCH_SIZE
+from .http_interceptor import ACCEPT_ENCODING, GIVE_UP, RENEW_TOKEN, RETRY, RequestAttempts
+from .lazy_json import LazyJsonObject
+from .transfer_stats import API, transfer_stats
+
+try:
+    import httpx
+except ImportError:  # httpx es opcional: sin él las peticiones usan el HTTPInterceptor en hilos del loop
+    httpx = None
+
+# async_client.py
+__all__ = ["AsyncApiClient", "ApiFuture", "ApiBatch"]
+
+MAX_CONCURRENT_REQUESTS = 100
+
+
+class ApiFuture(QObject):
+    """
+    Resultado pendiente de una petición del AsyncApiClient, visto desde la interfaz.
+    `finished` se emite en el hilo de la interfaz (conexión en cola) con el resultado, o None si falló;
+    no se emite si la petición fue cancelada.
+    """
+
+    finished = pyqtSignal(object)
+
+    def __init__(self, future, parent=None):
+        super().__init__(parent)
+        self._future = future
+        future.add_done_callback(self._on_done)
+
+    def _on_done(self, future):
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            logging.error(f"Error en petición asíncrona: {error!r}")
+            self.finished.emit(None)
+        else:
+            self.finished.emit(future.result())
+
+    def cancel(self):
+        """Cancela la petición (si sigue en curso, la tarea se cancela en el loop)."""
+        return self._future.cancel()
+
+    def cancelled(self):
+        return self._future.cancelled()
+
+    def done(self):
+        return self._future.done()
+
+    def result(self, timeout=None):
+        """Espera el resultado de forma bloqueante (para scripts y pruebas; no usar en el hilo de la interfaz)."""
+        return self._future.result(timeout)
+
+
+class ApiBatch(QObject):
+    """
+    Búsqueda en lote del AsyncApiClient, vista desde la interfaz.
+    `item_ready(inventory_id, item)` se emite por cada item a medida que llega (item es None si falló) y
+    `finished` al terminar el lote; ninguna se emite después de cancelar.
+    """
+
+    item_ready = pyqtSignal(str, object)
+    finished = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._future = None
+        self._cancelled = False
+
+    def _emit_item(self, inventory_id, item):
+        if not self._cancelled:
+            self.item_ready.emit(inventory_id, item)
+
+    def _attach(self, future):
+        self._future = future
+        future.add_done_callback(self._on_done)
+
+    def _on_done(self, future):
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            logging.error(f"Error en búsqueda en lote: {error!r}")
+        self.finished.emit()
+
+    def cancel(self):
+        """Cancela el lote: las peticiones pendientes se abortan y no se emiten más items."""
+        self._cancelled = True
+        return self._future.cancel()
+
+    def cancelled(self):
+        return self._cancelled
+
+    def done(self):
+        return self._future.done()
+
+    def result(self, timeout=None):
+        """Espera el fin del lote de forma bloqueante (para scripts y pruebas; no usar en el hilo de la interfaz)."""
+        return self._future.result(timeout)
+
+
+class AsyncApiClient:
+    """
+    Cliente asíncrono para APIEndpoints sobre un event loop de asyncio en un hilo dedicado.
+
+    Las búsquedas comparten la caché de items, la aplicación local de la cantidad y el single-flight de
+    APIEndpoints (también con las búsquedas en hilos); dentro del loop, además, cada llave tiene una sola tarea.
+    Con httpx instalado, cientos de peticiones concurrentes corren en el único hilo del loop (con las mismas reglas
+    por intento que el HTTPInterceptor); sin httpx, cada petición usa el HTTPInterceptor en un hilo del executor
+    del loop, de todos modos fuera del QThreadPool de la interfaz.
+    """
+
+    def __init__(self, api, max_concurrency=MAX_CONCURRENT_REQUESTS):
+        self.api = api
+        self.max_concurrency = max_concurrency
+        self.loop = asyncio.new_event_loop()
+        self._semaphore = None  # Se crea dentro del loop
+        self._http_client = None
+        self._in_flight = {}  # cache_key -> [asyncio.Task, cantidad de interesados]
+        self._thread = threading.Thread(target=self._run_loop, name="AsyncApiClient", daemon=True)
+        self._thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coroutine, parent=None):
+        """Programa una corrutina en el loop del cliente y retorna su ApiFuture."""
+        return ApiFuture(asyncio.run_coroutine_threadsafe(coroutine, self.loop), parent)
+
+    def get_item(self, inventory_id, query_params, parent=None):
+        """Equivalente asíncrono de APIEndpoints.get_mercadolibre_item; retorna un ApiFuture."""
+        return self.submit(self.fetch_item(inventory_id, query_params), parent)
+
+    def get_items(self, inventory_ids, query_params, on_item=None, parent=None):
+        """
+        Equivalente asíncrono de APIEndpoints.get_mercadolibre_items; retorna un ApiBatch que emite cada item al llegar.
+        `on_item` se conecta a `item_ready` antes de empezar, para no perder los items que ya estaban en caché.
+        """
+        batch = ApiBatch(parent)
+        if on_item is not None:
+            batch.item_ready.connect(on_item)
+        batch._attach(asyncio.run_coroutine_threadsafe(self.fetch_items(inventory_ids, query_params, batch._emit_item), self.loop))
+        return batch
+
+    async def fetch_items(self, inventory_ids, query_params, on_item):
+        """
+        Busca varios items y llama `on_item(inventory_id, item)` por cada uno a medida que llegan.
+        Usa el endpoint de lote si la API lo tiene; si no, pide los items por separado en el loop
+        (acotados por el semáforo del cliente, y compartiendo el single-flight con las búsquedas individuales).
+        """
+        pending = []
+        for inventory_id in dict.fromkeys(inventory_ids):
+            lookup = self.api.prepare_item_lookup(inventory_id, query_params)
+            if lookup.entry is not None:
+                on_item(inventory_id, self.api.resolve_cached_item(lookup))
+            else:
+                pending.append(lookup)
+
+        while pending and self.api.batch_supported is not False:
+            chunk = pending[:BATCH_SIZE]
+            cancel_event = threading.Event()
+            try:
+                items = await asyncio.to_thread(self.api.fetch_item_batch, chunk, cancel_event)
+            except asyncio.CancelledError:
+                cancel_event.set()
+                raise
+            if items is None:
+                break
+            for lookup in chunk:
+                on_item(lookup.inventory_id, self.api.apply_qty(items.get(lookup.inventory_id), lookup.qty))
+            pending = pending[BATCH_SIZE:]
+
+        tasks = [self.loop.create_task(self._fetch_item_pair(lookup.inventory_id, query_params)) for lookup in pending]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                on_item(*await next_done)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _fetch_item_pair(self, inventory_id, query_params):
+        try:
+            return inventory_id, await self.fetch_item(inventory_id, query_params)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.warning(f"Error al buscar el item {inventory_id}: {e!r}")
+            return inventory_id, None
+
+    async def fetch_item(self, inventory_id, query_params):
+        lookup = self.api.prepare_item_lookup(inventory_id, query_params)
+        if lookup.entry is not None:
+            return self.api.resolve_cached_item(lookup)
+
+        # Single-flight dentro del loop: la petición se cancela solo si todos los interesados cancelan
+        in_flight = self._in_flight.get(lookup.cache_key)
+        if in_flight is None:
+            task = self.loop.create_task(self._request_item(lookup))
+            in_flight = self._in_flight[lookup.cache_key] = [task, 0]
+            task.add_done_callback(lambda _task, key=lookup.cache_key: self._in_flight.pop(key, None))
+        task = in_flight[0]
+        in_flight[1] += 1
+        try:
+            item = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if in_flight[1] == 1:
+                task.cancel()
+            raise
+        finally:
+            in_flight[1] -= 1
+        return self.api.apply_qty(item, lookup.qty)
+
+    async def _request_item(self, lookup):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            if httpx is None:
+                # Si la tarea se cancela, el evento aborta la petición que corre en el hilo del executor
+                cancel_event = threading.Event()
+                try:
+                    return await asyncio.to_thread(self.api.fetch_item, lookup, cancel_event)
+                except asyncio.CancelledError:
+                    cancel_event.set()
+                    raise
+            # Mismo single-flight que las búsquedas en hilos: un escaneo y una precarga del mismo item hacen una petición
+            return await self.api.item_requests.do_async(lookup.cache_key, self._request_item_httpx, lookup)
+
+    async def _request_item_httpx(self, lookup):
+        """
+        Petición del item con httpx en el loop. Las reglas de cada intento (breaker, reintentos, 401, métricas y span)
+        son las de HTTPInterceptor.request, vía RequestAttempts; además el token vencido se renueva antes de enviar.
+        Las esperas del backoff y el login no ocupan el hilo del loop.
+        """
+        interceptor = self.api.interceptor
+        if self._http_client is None:
+            limits = httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency)
+            self._http_client = httpx.AsyncClient(
+                base_url=interceptor.base_url,
+                timeout=interceptor.timeout,
+                limits=limits,
+                headers={"Accept": "application/json", "Accept-Encoding": ACCEPT_ENCODING},
+            )
+
+        attempts = RequestAttempts(interceptor, "GET", f"/mercadolibre/items/{lookup.inventory_id}")
+        while True:
+            if not attempts.admit():
+                return None
+            try:
+                # Token ya vencido: se renueva antes de enviar (login bloqueante y compartido, fuera del hilo del loop)
+                await asyncio.to_thread(interceptor._ensure_fresh_token)
+                headers = attempts.headers(self.api.conditional_headers(lookup))
+                try:
+                    # httpx descarga el cuerpo junto con la respuesta (los items son pequeños)
+                    with attempts.measure() as span:
+                        response = await self._http_client.get(attempts.endpoint, params=lookup.request_params, headers=headers)
+                        span.set(status=response.status_code)
+                except httpx.TransportError as e:
+                    if attempts.after_transport_error(isinstance(e, httpx.TimeoutException)) == RETRY:
+                        await asyncio.sleep(attempts.retry_delay)
+                        continue
+                    break
+                except httpx.HTTPError as e:
+                    print(f"Error en la petición: {e}")
+                    break
+
+                action = attempts.after_response(response.status_code, response.headers.get("Retry-After"))
+                if action == RENEW_TOKEN:
+                    action = attempts.after_login(await asyncio.to_thread(interceptor.login, attempts.token))
+                if action == RETRY:
+                    await asyncio.sleep(attempts.retry_delay)
+                    continue
+                if action == GIVE_UP:
+                    break
+
+                item = self.api.store_item_response(lookup, response.status_code, lambda: LazyJsonObject(response.content), response.headers.get("ETag"))
+                if response.content:
+                    transfer_stats.record(API, response.num_bytes_downloaded, len(response.content))
+                return item
+            finally:
+                attempts.end_attempt()
+
+        attempts.log_failure()
+        return None
+
+    def close(self, timeout=2):
+        """Cancela lo pendiente, cierra el cliente HTTP y detiene el loop."""
+
+        async def shutdown():
+            for task, _ in list(self._in_flight.values()):
+                task.cancel()
+            if self._http_client is not None:
+                await self._http_client.aclose()
+
+        if self.loop.is_running():
+            try:
+                asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result(timeout)
+            except Exception as e:
+                logging.warning(f"Error al cerrar el cliente asíncrono: {e!r}")
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout)
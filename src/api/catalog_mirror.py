@@ -0,0 +1,211 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from . import json_backend
+from .lazy_json import LazyJsonObject
+
+# catalog_mirror.py
+__all__ = ["CatalogMirror", "CatalogSync", "CATALOG_CHANGES_ENDPOINT", "MIRROR_MAX_AGE"]
+
+CATALOG_SCHEMA_VERSION = 1
+CATALOG_CHANGES_ENDPOINT = "/mercadolibre/items/changes"
+SYNC_PAGE_SIZE = 500  # Cambios por página del feed de sincronización
+# Antigüedad máxima de la última sincronización completa para servir items de la copia con conexión:
+# el doble del intervalo de sincronización de la ventana principal (tolera una sincronización fallida)
+MIRROR_MAX_AGE = 30 * 60  # s
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    inventory_id TEXT NOT NULL,
+    label_size TEXT NOT NULL,
+    item TEXT NOT NULL,
+    updated_at TEXT,
+    PRIMARY KEY (inventory_id, label_size)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS item_keys (
+    search_key TEXT PRIMARY KEY,
+    inventory_id TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS item_keys_by_item ON item_keys (inventory_id);
+CREATE TABLE IF NOT EXISTS sync_state (
+    label_size TEXT PRIMARY KEY,
+    cursor TEXT,
+    synced_at REAL
+) WITHOUT ROWID;
+"""
+
+
+class CatalogMirror:
+    """
+    Copia local (SQLite) del catálogo de items: etiqueta, imágenes, relaciones y ubicaciones, tal como las
+    devuelve GET /mercadolibre/items/{id}, por tamaño de etiqueta.
+
+    Permite resolver una búsqueda en milisegundos y seguir trabajando sin conexión con el backend. Además del id,
+    cada item puede registrarse con llaves de búsqueda alternativas (SKU, códigos de barras) en `item_keys`.
+    La conexión se comparte entre hilos protegida por un lock; con WAL, las lecturas no esperan a la escritura
+    en disco de la sincronización.
+    """
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")  # Es una copia: basta con no corromperla
+            version = self._connection.execute("PRAGMA user_version").fetchone()[0]
+            if version != CATALOG_SCHEMA_VERSION:
+                # Esquema de otra versión: se descarta y la siguiente sincronización la reconstruye completa
+                self._connection.executescript("DROP TABLE IF EXISTS items; DROP TABLE IF EXISTS item_keys; DROP TABLE IF EXISTS sync_state;")
+                self._connection.execute(f"PRAGMA user_version = {CATALOG_SCHEMA_VERSION}")
+            self._connection.executescript(SCHEMA)
+            self._connection.commit()
+
+    def get_item(self, search_key, label_size):
+        """Retorna el item guardado para el id (o una llave alternativa) y tamaño de etiqueta, o None."""
+        search_key = str(search_key).strip()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT item FROM items WHERE inventory_id = ? AND label_size = ?"
+                " UNION ALL "
+                "SELECT items.item FROM item_keys JOIN items USING (inventory_id)"
+                " WHERE item_keys.search_key = ? AND items.label_size = ? LIMIT 1",
+                (search_key, label_size, search_key, label_size),
+            ).fetchone()
+        return LazyJsonObject(row[0]) if row is not None else None
+
+    def put_item(self, inventory_id, label_size, item, updated_at=None):
+        """Guarda (o reemplaza) un item obtenido fuera de la sincronización, p. ej. de una búsqueda normal."""
+        self.apply_changes(label_size, [{"inventory_id": inventory_id, "updated_at": updated_at, "item": item}])
+
+    def apply_changes(self, label_size, changes, cursor=None):
+        """
+        Aplica una página del feed de cambios en una sola transacción y, si se indica, guarda el cursor.
+        Cada cambio es {"inventory_id", "updated_at", "keys": [...], "item": {...}}; con "item" nulo, el item se borra.
+        """
+        upserts = []
+        deletes = []
+        keys = []
+        for change in changes:
+            inventory_id = str(change["inventory_id"])
+            item = change.get("item")
+            if item is None:
+                deletes.append((inventory_id, label_size))
+                continue
+            item_json = item.json_text() if isinstance(item, LazyJsonObject) else json_backend.dumps(item)
+            upserts.append((inventory_id, label_size, item_json, change.get("updated_at")))
+            keys.extend((str(key).strip(), inventory_id) for key in change.get("keys") or () if key)
+
+        with self._lock, self._connection:
+            if deletes:
+                self._connection.executemany("DELETE FROM items WHERE inventory_id = ? AND label_size = ?", deletes)
+            self._connection.executemany(
+                "INSERT INTO items (inventory_id, label_size, item, updated_at) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT (inventory_id, label_size) DO UPDATE SET item = excluded.item, updated_at = excluded.updated_at",
+                upserts,
+            )
+            if keys:
+                self._connection.executemany("INSERT OR REPLACE INTO item_keys (search_key, inventory_id) VALUES (?, ?)", keys)
+            if cursor is not None:
+                # El cursor avanza con cada página; `synced_at` solo cambia al terminar la sincronización (mark_synced)
+                self._connection.execute(
+                    "INSERT INTO sync_state (label_size, cursor) VALUES (?, ?)"
+                    " ON CONFLICT (label_size) DO UPDATE SET cursor = excluded.cursor",
+                    (label_size, cursor),
+                )
+
+    def sync_cursor(self, label_size):
+        """Cursor (updated_at) hasta el que el tamaño de etiqueta está sincronizado, o None si nunca se sincronizó."""
+        with self._lock:
+            row = self._connection.execute("SELECT cursor FROM sync_state WHERE label_size = ?", (label_size,)).fetchone()
+        return row[0] if row is not None else None
+
+    def mark_synced(self, label_size):
+        """Registra que el tamaño de etiqueta quedó al día con el feed (conserva el cursor)."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT INTO sync_state (label_size, cursor, synced_at) VALUES (?, NULL, ?)"
+                " ON CONFLICT (label_size) DO UPDATE SET synced_at = excluded.synced_at",
+                (label_size, time.time()),
+            )
+
+    def synced_at(self, label_size):
+        """time.time() de la última sincronización completa del tamaño de etiqueta, o None si nunca terminó una."""
+        with self._lock:
+            row = self._connection.execute("SELECT synced_at FROM sync_state WHERE label_size = ?", (label_size,)).fetchone()
+        return row[0] if row is not None else None
+
+    def count(self, label_size=None):
+        with self._lock:
+            if label_size is None:
+                return self._connection.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+            return self._connection.execute("SELECT COUNT(*) FROM items WHERE label_size = ?", (label_size,)).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class CatalogSync:
+    """
+    Sincronización incremental del CatalogMirror con la API.
+
+    Pide a CATALOG_CHANGES_ENDPOINT los items modificados después del último cursor guardado
+    (`updated_after`), de a SYNC_PAGE_SIZE por página, hasta que el feed indica que no hay más.
+    La primera sincronización (sin cursor) descarga el catálogo completo. Las peticiones pasan por el
+    HTTPInterceptor, así que comparten la sesión, la renovación del token, los reintentos y el circuit breaker.
+    """
+
+    def __init__(self, interceptor, mirror, page_size=SYNC_PAGE_SIZE, max_age=MIRROR_MAX_AGE):
+        self.interceptor = interceptor
+        self.mirror = mirror
+        self.page_size = page_size
+        self.max_age = max_age
+        self.supported = None  # False si la API no expone el feed de cambios
+
+    def is_current(self, label_size):
+        """
+        True si la copia del tamaño de etiqueta puede servir búsquedas: el feed existe y la última sincronización
+        completa tiene menos de `max_age` segundos. Sin feed, las filas son respuestas viejas que nadie actualiza.
+        """
+        if self.supported is False:
+            return False
+        synced_at = self.mirror.synced_at(label_size)
+        return synced_at is not None and time.time() - synced_at <= self.max_age
+
+    def sync(self, label_size, cancel_event=None):
+        """Descarga y aplica los cambios pendientes de un tamaño de etiqueta; retorna la cantidad de cambios aplicados."""
+        if self.supported is False:
+            return 0
+        cursor = self.mirror.sync_cursor(label_size)
+        applied = 0
+        while cancel_event is None or not cancel_event.is_set():
+            params = {"label_size": label_size, "limit": self.page_size}
+            if cursor:
+                params["updated_after"] = cursor
+            response = self.interceptor.request("GET", CATALOG_CHANGES_ENDPOINT, params=params, cancel_event=cancel_event)
+            if response is None:
+                break  # Sin conexión: se reintenta en la próxima sincronización desde el mismo cursor
+            if response.status_code == 404:
+                print("La API no tiene feed de cambios del catálogo: copia local deshabilitada.")
+                self.supported = False
+                break
+            if response.status_code != 200:
+                logging.warning(f"Error al sincronizar el catálogo: {response.status_code}")
+                break
+
+            self.supported = True
+            page = json_backend.loads(response.content)
+            changes = page.get("changes") or []
+            cursor = page.get("cursor") or cursor
+            self.mirror.apply_changes(label_size, changes, cursor)
+            applied += len(changes)
+            if not page.get("has_more") or not changes:
+                self.mirror.mark_synced(label_size)
+                break
+        return applied
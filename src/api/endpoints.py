@@ -1,28 +1,317 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import NamedTuple
+
+from config import CACHE_DIR
+from metrics import CATALOG_MIRROR, ITEM_CACHE, metrics
+from workers.executor import CACHE_REVALIDATION, executor
+from zpl import set_label_copies
+
+from . import json_backend
+from .catalog_mirror import CatalogMirror, CatalogSync
 from .http_interceptor import HTTPInterceptor
+from .item_cache import ItemCache
+from .lazy_json import LazyJsonObject
+from .single_flight import SingleFlight
+
+
+# Parámetros que resuelve el cliente y no se envían a la API: la cantidad solo se estampa en el ^PQ de la etiqueta
+LOCAL_PARAMS = ("qty",)
+
+# Proyección de la respuesta: `fields` pide a la API solo esas claves de primer nivel del item
+FIELDS_PARAM = "fields"
+LABEL_FIELDS = ("label",)
+# Lo que usa la ventana principal (etiqueta, carrusel de imágenes y relaciones con sus ubicaciones)
+DISPLAY_FIELDS = ("label", "pictures", "tecneu_item_relationships")
+
+BATCH_ITEMS_ENDPOINT = "/mercadolibre/items/batch"
+BATCH_SIZE = 50  # Items por petición al endpoint de lote
+BATCH_FANOUT = 8  # Peticiones individuales en paralelo cuando la API no tiene endpoint de lote
+BATCH_UNSUPPORTED_STATUSES = (404, 405, 501)
+
+
+class ItemLookup(NamedTuple):
+    inventory_id: str
+    request_params: dict  # Parámetros que se envían a la API
+    qty: str  # Cantidad pedida (se aplica localmente), o None
+    cache_key: tuple
+    entry: object  # CacheEntry existente, o None
 
 
 class APIEndpoints:
-    def __init__(self):
-        """Initialize the API client."""
-        self.interceptor = HTTPInterceptor()
+    def __init__(self, pool_size=None, cache_dir=CACHE_DIR, settings=None, base_url=None):
+        """Initialize the API client.
+
+        Args:
+            pool_size (int): Number of pooled keep-alive connections (defaults to the ideal thread count).
+            cache_dir (str): Folder for the item cache and the catalog mirror; None keeps both in memory only.
+            settings (QSettings): Where the access token is stored (defaults to the user's settings).
+            base_url (str): API base URL (defaults to API_BASE_URL).
+        """
+        self.interceptor = HTTPInterceptor(pool_size, settings=settings, base_url=base_url)
+        self.item_cache = ItemCache(persist_path=os.path.join(cache_dir, "items.json") if cache_dir else None)
+        # Copia local del catálogo: resuelve búsquedas sin esperar a la API (y sin conexión)
+        self.catalog_mirror = CatalogMirror(os.path.join(cache_dir, "catalog.sqlite3") if cache_dir else ":memory:")
+        self.catalog_sync = CatalogSync(self.interceptor, self.catalog_mirror)
+        self._revalidating = set()  # Llaves con una revalidación en segundo plano en curso
+        self._revalidating_lock = threading.Lock()
+        # Búsquedas concurrentes del mismo item (doble escaneo, SearchWorker + ZplWorker) comparten una sola petición
+        self.item_requests = SingleFlight()
+        # None hasta la primera petición de lote; False si la API no expone el endpoint de lote
+        self.batch_supported = None
 
-    def get_mercadolibre_item(self, inventory_id, query_params):
+    def get_mercadolibre_item(self, inventory_id, query_params, use_cache=True, cancel_event=None):
         """Example of using the interceptor for the `get_items` API endpoint.
 
+        `qty` is never sent to the backend: the label is fetched (and cached) once per (inventory_id, label_size)
+        and the requested quantity is stamped into its ^PQ locally. A stale cache entry is returned right away
+        while it is revalidated in the background, using If-None-Match when the backend sent an ETag.
+        On a cache miss, an item found in the local catalog mirror is returned the same way, as long as the mirror
+        is kept current by the changes feed (or the API is unreachable); otherwise the API is asked.
+
+        ``query_params["fields"]`` (a sequence such as ``LABEL_FIELDS``, or a comma-separated string) asks the
+        backend for only those top-level keys. A cached or mirrored full item also satisfies a projected lookup.
+
         Args:
             inventory_id (str): The ID of the item to retrieve.
-            query_params (dict): The query parameters for the request.
+            query_params (dict): The query parameters for the request (`qty` is applied locally, not sent).
+            use_cache (bool): If True, a cached response (e.g. from a prefetch) is returned without waiting for the API.
+            cancel_event (threading.Event): When set (the request was superseded), the HTTP work is aborted and None is returned.
 
         Returns:
             dict or None: The response data if successful, None otherwise.
         """
-        endpoint = f"/mercadolibre/items/{inventory_id}"
-        print(f"ENDPOINT ===========> {endpoint}")
-        response = self.interceptor.request("GET", endpoint, params=query_params)
-        if response and response.status_code == 200:
-            return response.json()
+        lookup = self.prepare_item_lookup(inventory_id, query_params)
+        if use_cache:
+            metrics.cache_access(ITEM_CACHE, lookup.entry is not None)
+        if use_cache and lookup.entry is not None:
+            return self.resolve_cached_item(lookup)
+        if use_cache:
+            item = self.mirrored_item(lookup)
+            metrics.cache_access(CATALOG_MIRROR, item is not None)
+            if item is not None:
+                self._revalidate_in_background(lookup)
+                return self.apply_qty(item, lookup.qty)
+
+        return self.apply_qty(self.fetch_item(lookup, cancel_event), lookup.qty)
+
+    def get_mercadolibre_items(self, inventory_ids, query_params, max_concurrency=BATCH_FANOUT, cancel_event=None):
+        """Look up many items at once, yielding ``(inventory_id, item)`` pairs as the results arrive.
+
+        Cached items are yielded first. The rest are requested in chunks of ``BATCH_SIZE`` from the batch
+        endpoint; if the backend does not provide one (or a batch request fails), the remaining items are
+        fetched individually with at most ``max_concurrency`` requests in flight. Every request goes through
+        the interceptor, so auth renewal, retries and the circuit breaker apply as for single lookups.
+
+        Args:
+            inventory_ids (iterable): The IDs of the items to retrieve (duplicates are looked up once).
+            query_params (dict): The query parameters shared by every lookup (`qty` is applied locally).
+            max_concurrency (int): Maximum parallel requests when falling back to individual lookups.
+            cancel_event (threading.Event): When set, pending lookups are abandoned and the generator stops.
+
+        Yields:
+            tuple: ``(inventory_id, item)``, where item is None if it could not be retrieved.
+        """
+        pending = []
+        for inventory_id in dict.fromkeys(inventory_ids):
+            lookup = self.prepare_item_lookup(inventory_id, query_params)
+            metrics.cache_access(ITEM_CACHE, lookup.entry is not None)
+            if lookup.entry is not None:
+                yield inventory_id, self.resolve_cached_item(lookup)
+            else:
+                pending.append(lookup)
+
+        while pending and self.batch_supported is not False:
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            chunk = pending[:BATCH_SIZE]
+            items = self.fetch_item_batch(chunk, cancel_event)
+            if items is None:
+                break  # Sin endpoint de lote o petición fallida: el resto se pide item por item
+            for lookup in chunk:
+                yield lookup.inventory_id, self.apply_qty(items.get(lookup.inventory_id), lookup.qty)
+            pending = pending[BATCH_SIZE:]
+
+        if not pending or (cancel_event is not None and cancel_event.is_set()):
+            return
+        executor = ThreadPoolExecutor(max_workers=min(max_concurrency, len(pending)), thread_name_prefix="ItemBatch")
+        try:
+            futures = {executor.submit(self.fetch_item, lookup, cancel_event): lookup for lookup in pending}
+            for future in as_completed(futures):
+                lookup = futures[future]
+                yield lookup.inventory_id, self.apply_qty(future.result(), lookup.qty)
+        finally:
+            # Si quien consume el generador se detiene antes, las peticiones que no empezaron se descartan
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def fetch_item_batch(self, lookups, cancel_event=None):
+        """
+        Pide varios items en una sola petición al endpoint de lote y los guarda en la caché.
+        Retorna {inventory_id: item} (sin la cantidad aplicada; los no encontrados no aparecen), o None si la API
+        no tiene endpoint de lote o la petición falló.
+        """
+        response = self.interceptor.request(
+            "POST",
+            BATCH_ITEMS_ENDPOINT,
+            params=lookups[0].request_params,
+            data={"inventory_ids": [lookup.inventory_id for lookup in lookups]},
+            cancel_event=cancel_event,
+        )
+        if response is None:
+            return None
+        if response.status_code in BATCH_UNSUPPORTED_STATUSES:
+            logging.info("La API no tiene endpoint de lote: se consultan los items individualmente.")
+            self.batch_supported = False
+            return None
+        if response.status_code != 200:
+            return None
+
+        self.batch_supported = True
+        items = json_backend.loads(response.content).get("items") or {}
+        self.interceptor.record_transfer(response)
+        for lookup in lookups:
+            item = items.get(lookup.inventory_id)
+            if item is not None:
+                self.item_cache.put(lookup.cache_key, item)
+                self._update_mirror(lookup, item)
+        self.item_cache.save_soon()
+        return items
+
+    def _update_mirror(self, lookup, item):
+        """Las respuestas de la API también actualizan la copia local (la sincronización puede estar atrasada)."""
+        label_size = self.mirror_label_size(lookup)
+        if label_size is not None:
+            self.catalog_mirror.put_item(lookup.inventory_id, label_size, item)
+
+    def prepare_item_lookup(self, inventory_id, query_params):
+        """Separa los parámetros locales, arma la llave de caché y busca la entrada existente."""
+        qty = (query_params or {}).get("qty")
+        request_params = {key: value for key, value in (query_params or {}).items() if key not in LOCAL_PARAMS}
+        fields = request_params.get(FIELDS_PARAM)
+        if fields is not None:
+            # Forma canónica, para que la misma proyección comparta la llave de caché
+            if isinstance(fields, str):
+                fields = fields.split(",")
+            request_params[FIELDS_PARAM] = ",".join(sorted(set(field.strip() for field in fields)))
+        cache_key = ItemCache.make_key(inventory_id, request_params)
+        entry = self.item_cache.lookup(cache_key)
+        if entry is None and fields is not None:
+            # El item completo en caché también sirve para una consulta proyectada
+            full_params = {key: value for key, value in request_params.items() if key != FIELDS_PARAM}
+            entry = self.item_cache.lookup(ItemCache.make_key(inventory_id, full_params))
+        return ItemLookup(inventory_id, request_params, qty, cache_key, entry)
+
+    @staticmethod
+    def mirror_label_size(lookup, projected=False):
+        """
+        Tamaño de etiqueta con el que el item se guarda en la copia local, o None si la consulta lleva otros parámetros.
+        Con `projected`, se acepta también una proyección (`fields`): la copia guarda el item completo.
+        """
+        params = set(lookup.request_params)
+        if projected:
+            params.discard(FIELDS_PARAM)
+        if params != {"label_size"}:
+            return None
+        return lookup.request_params["label_size"]
+
+    def mirrored_item(self, lookup):
+        """
+        Item de la copia local del catálogo (sin la cantidad aplicada), o None.
+        Solo se usa si la copia está al día con el feed de cambios, o sin conexión (circuit breaker abierto):
+        la revalidación en segundo plano no actualiza la interfaz, así que una fila vieja sería la etiqueta impresa.
+        """
+        label_size = self.mirror_label_size(lookup, projected=True)
+        if label_size is None:
+            return None
+        if not self.catalog_sync.is_current(label_size) and not self.interceptor.circuit_breaker.is_open:
+            return None
+        return self.catalog_mirror.get_item(lookup.inventory_id, label_size)
+
+    def resolve_cached_item(self, lookup):
+        """Retorna el item en caché (con la cantidad aplicada); si está vencido, lo revalida en segundo plano."""
+        if not self.item_cache.is_fresh(lookup.entry):
+            self._revalidate_in_background(lookup)
+        return self.apply_qty(lookup.entry.item, lookup.qty)
+
+    def conditional_headers(self, lookup):
+        """If-None-Match con el ETag de la entrada en caché, si lo hay."""
+        return {"If-None-Match": lookup.entry.etag} if lookup.entry is not None and lookup.entry.etag else None
+
+    def store_item_response(self, lookup, status_code, read_item, etag):
+        """
+        Actualiza la caché con la respuesta de la API y retorna el item (sin la cantidad aplicada), o None.
+        `read_item` se llama solo si la respuesta trae un item (200).
+        """
+        if status_code == 304 and lookup.entry is not None:
+            self.item_cache.refresh(lookup.cache_key)
+            self.item_cache.save_soon()
+            return lookup.entry.item
+        if status_code == 200:
+            item = read_item()
+            self.item_cache.put(lookup.cache_key, item, etag=etag)
+            self.item_cache.save_soon()
+            self._update_mirror(lookup, item)
+            return item
         return None
 
+    def _fetch_item(self, lookup, cancel_event=None):
+        """Pide el item a la API (condicional si la entrada en caché tiene ETag) y actualiza la caché."""
+        endpoint = f"/mercadolibre/items/{lookup.inventory_id}"
+        logging.debug(f"GET {endpoint}")
+        response = self.interceptor.request(
+            "GET", endpoint, params=lookup.request_params, headers=self.conditional_headers(lookup), cancel_event=cancel_event
+        )
+        if response is None:
+            return None
+        # El cuerpo se decodifica recién cuando alguien lee el item
+        item = self.store_item_response(lookup, response.status_code, lambda: LazyJsonObject(response.content), response.headers.get("ETag"))
+        self.interceptor.record_transfer(response)
+        return item
+
+    def fetch_item(self, lookup, cancel_event=None):
+        """
+        Petición a la API compartida con las búsquedas concurrentes del mismo item (single-flight).
+        La petición compartida solo se aborta cuando todos los interesados cancelaron.
+        """
+        return self.item_requests.do(lookup.cache_key, self._fetch_item, lookup, cancel_event=cancel_event)
+
+    def _revalidate_in_background(self, lookup):
+        """
+        Revalida una entrada vencida sin bloquear a quien la pidió (una sola revalidación por llave), en el pool
+        CACHE_REVALIDATION: con la cola llena se omite y la entrada se revalida en una próxima consulta.
+        """
+        cache_key = lookup.cache_key
+        with self._revalidating_lock:
+            if cache_key in self._revalidating:
+                return
+            self._revalidating.add(cache_key)
+
+        def revalidate():
+            try:
+                self.fetch_item(lookup._replace(entry=self.item_cache.lookup(cache_key)))
+            finally:
+                with self._revalidating_lock:
+                    self._revalidating.discard(cache_key)
+
+        if not executor.submit(CACHE_REVALIDATION, revalidate):
+            with self._revalidating_lock:
+                self._revalidating.discard(cache_key)
+
+    @staticmethod
+    def apply_qty(item, qty):
+        """Retorna el item con la cantidad pedida estampada en el ^PQ de su etiqueta (copia; el item en caché no se modifica)."""
+        if item is None or qty is None or not str(qty).isdigit() or not item.get("label"):
+            return item
+        return {**item, "label": set_label_copies(item["label"], int(qty))}
+
+    def close(self):
+        """Guarda la caché en disco y cierra las conexiones y la copia local del catálogo."""
+        self.item_cache.save()
+        self.interceptor.close()
+        self.catalog_mirror.close()
+
     # def create_item(self, data):
     #     """Example of a POST request to create a new item.
     #
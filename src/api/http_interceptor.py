@@ -1,32 +1,216 @@
+import base64
+import importlib.util
+import json
 import logging
 import os
+import threading
+import time
+from contextlib import contextmanager
 
 import requests
-from PyQt5.QtCore import QSettings
-from requests.exceptions import RequestException, Timeout
+from PyQt5.QtCore import QSettings, QThread
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, RequestException, Timeout
 
 from config import API_BASE_URL, API_EMAIL, API_PASSWORD
+from metrics import API_LATENCY, metrics
+from tracing import tracer
+
+from .retry_policy import CircuitBreaker, RetryPolicy
+from .transfer_stats import API, transfer_stats
+
+RETRY_WAIT_SLICE = 0.05  # Segundos entre revisiones de cancelación durante el backoff
+# Compresiones que se aceptan de la API: brotli solo si urllib3 puede decodificarla (paquete brotli o brotlicffi)
+HAS_BROTLI = importlib.util.find_spec("brotli") is not None or importlib.util.find_spec("brotlicffi") is not None
+ACCEPT_ENCODING = "br, gzip;q=0.9, deflate;q=0.5" if HAS_BROTLI else "gzip, deflate;q=0.5"
+TOKEN_REFRESH_MARGIN = 60  # Segundos antes del vencimiento del token en que se renueva en segundo plano
+
+
+def token_expiry(token):
+    """
+    Lee los campos `exp` e `iat` (segundos epoch) del payload de un JWT, sin verificar la firma.
+    Retorna (exp, iat); cada uno es None si el token no es un JWT o no trae el campo.
+    """
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        exp, iat = claims.get("exp"), claims.get("iat")
+        return (float(exp) if exp is not None else None, float(iat) if iat is not None else None)
+    except (AttributeError, IndexError, ValueError, TypeError):
+        return None, None
+
+
+# Qué hacer después de un intento (ver RequestAttempts)
+RETURN_RESPONSE = "return_response"  # Respuesta exitosa, o un 4xx que no cambia al reintentar (p. ej. 404)
+RETRY = "retry"  # Reintentar después de `retry_delay` segundos
+RENEW_TOKEN = "renew_token"  # 401: hacer login (con `stale_token=token`) y pasar el resultado a `after_login`
+GIVE_UP = "give_up"
+
+
+class RequestAttempts:
+    """
+    Reglas por intento de una petición a la API, compartidas por HTTPInterceptor.request (requests, en hilos) y el
+    AsyncApiClient (httpx, en el event loop): admisión y registro en el circuit breaker, reintentos según la
+    `retry_policy`, renovación del token ante un 401, latencia en las métricas y un span por intento.
+    Cada transporte solo envía la petición, espera (`retry_delay`) y hace el login a su manera.
+
+    Uso por intento: `admit()`, `headers()`, el envío dentro de `measure()`, luego `after_response` o
+    `after_transport_error`, y `end_attempt()` en un finally (libera la prueba del breaker si no hubo resultado).
+    """
+
+    def __init__(self, interceptor, method, endpoint):
+        self.interceptor = interceptor
+        self.retry_policy = interceptor.retry_policy
+        self.circuit_breaker = interceptor.circuit_breaker
+        self.method = method
+        self.endpoint = endpoint
+        self.url = f"{interceptor.base_url}{endpoint}"
+        self.attempts = 0
+        self.login_attempts = 0
+        self.token = None  # Token enviado en el intento actual
+        self.retry_delay = 0.0
+        self._outcome_recorded = True
+
+    def admit(self):
+        """Retorna False si el circuit breaker está abierto (modo offline) y la petición no debe hacerse."""
+        if not self.circuit_breaker.allow_request():
+            print(f"API no disponible (modo offline): se omite la solicitud a {self.url}")
+            return False
+        self._outcome_recorded = False
+        return True
+
+    def headers(self, extra_headers=None):
+        """Encabezados del intento: el token vigente (se lee en cada intento) más `extra_headers`."""
+        self.token = self.interceptor.access_token
+        self.attempts += 1
+        headers = {"Authorization": f"Bearer {self.token}"}
+        if extra_headers:
+            headers.update(extra_headers)
+        return headers
+
+    @contextmanager
+    def measure(self):
+        """Span y latencia del envío; el llamador agrega el código de respuesta con `span.set(status=...)`."""
+        with tracer.span("api.request", "api", method=self.method, endpoint=self.endpoint, attempt=self.attempts) as span:
+            started_at = time.perf_counter()
+            yield span
+            metrics.observe(API_LATENCY, (time.perf_counter() - started_at) * 1000)
+
+    def after_transport_error(self, timed_out):
+        """Timeout o backend inaccesible: cuenta para el breaker; retorna RETRY (con espera) o GIVE_UP."""
+        self.circuit_breaker.record_failure()
+        self._outcome_recorded = True
+        if not self.retry_policy.can_retry(self.attempts):
+            return GIVE_UP
+        error_name = "Timeout alcanzado" if timed_out else "Error de conexión"
+        logging.warning(f"{error_name}: Reintentando ({self.attempts}/{self.retry_policy.max_attempts})")
+        print(f"{error_name}: Reintentando ({self.attempts}/{self.retry_policy.max_attempts})")
+        self.retry_delay = self.retry_policy.delay(self.attempts)
+        return RETRY
+
+    def after_response(self, status_code, retry_after=None):
+        """Registra la respuesta en el breaker y decide: RETURN_RESPONSE, RETRY, RENEW_TOKEN o GIVE_UP."""
+        if status_code >= 500:
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+        self._outcome_recorded = True
+
+        if status_code == 401:
+            if self.login_attempts < 1:  # Intentar renovar el token una vez
+                print("Token expirado. Intentando renovar.")
+                return RENEW_TOKEN
+            return self.after_login(False)
+
+        if self.retry_policy.is_retryable_status(status_code):
+            if not self.retry_policy.can_retry(self.attempts):
+                return GIVE_UP
+            logging.warning(f"Error HTTP {status_code}: Reintentando ({self.attempts}/{self.retry_policy.max_attempts})")
+            print(f"Error HTTP {status_code}: Reintentando ({self.attempts}/{self.retry_policy.max_attempts})")
+            self.retry_delay = self.retry_policy.delay(self.attempts, retry_after)
+            return RETRY
+
+        return RETURN_RESPONSE
+
+    def after_login(self, logged_in):
+        """Resultado del login pedido con RENEW_TOKEN: RETRY inmediato con el token nuevo, o GIVE_UP."""
+        if not logged_in:
+            logging.error("Error: No se pudo renovar el token.")
+            print("Error: No se pudo renovar el token.")
+            return GIVE_UP
+        self.login_attempts += 1
+        self.attempts -= 1  # El reintento con el token nuevo no cuenta como falla
+        self.retry_delay = 0.0
+        return RETRY
+
+    def end_attempt(self):
+        """
+        Si el intento terminó sin registrar éxito ni falla (error de la petición, cancelación), libera la petición de
+        prueba del breaker medio abierto: si no, el breaker rechazaría todo en adelante.
+        """
+        if not self._outcome_recorded:
+            self._outcome_recorded = True
+            self.circuit_breaker.release_trial()
+
+    def log_failure(self):
+        logging.error(f"Error: La solicitud a {self.url} falló después de {self.attempts} intentos.")
+        print(f"Error: La solicitud a {self.url} falló después de {self.attempts} intentos.")
 
 
 class HTTPInterceptor:
-    def __init__(self):
-        self.settings = QSettings("Tecneu", "TecneuTagger")  # Configuración de QSettings
-        self.base_url = API_BASE_URL
+    def __init__(self, pool_size=None, settings=None, base_url=None):
+        """
+        Args:
+            pool_size (int): Conexiones keep-alive que se conservan abiertas hacia la API. Debe coincidir con la
+                cantidad de hilos que hacen peticiones en paralelo (por defecto, los del QThreadPool).
+            settings (QSettings): Donde se guarda el token (por defecto, la configuración del usuario).
+            base_url (str): URL de la API (por defecto, API_BASE_URL).
+        """
+        self.settings = settings if settings is not None else QSettings("Tecneu", "TecneuTagger")  # Configuración de QSettings
+        self.base_url = base_url or API_BASE_URL
         # self.access_token = None
         self.access_token = self.settings.value("access_token", None)  # Intentar recuperar el token existente
-        self.max_retries = 3
         self.timeout = 2.5  # Timeout en segundos
+        self.retry_policy = RetryPolicy(max_attempts=3)
+        # Compartido por todas las peticiones: si el backend está caído, se falla rápido durante el enfriamiento
+        self.circuit_breaker = CircuitBreaker()
+
+        # Login único: los hilos que encuentran el token vencido esperan la misma renovación en lugar de repetirla
+        self._login_lock = threading.Lock()
+        self._refresh_timer = None
+
+        # Sesión compartida por todos los hilos: reutiliza las conexiones TCP/TLS en lugar de abrir una por petición
+        self.pool_size = pool_size or QThread.idealThreadCount()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Connection": "keep-alive", "Accept": "application/json", "Accept-Encoding": ACCEPT_ENCODING})
 
         # Log de la configuración inicial
         # logging.debug(f"API Base URL: {self.base_url}")
         # logging.debug(f"API Email: {API_EMAIL}")
         print(f"API Base URL: {self.base_url}")
 
-    def login(self):
-        """Realiza login para obtener un nuevo access_token."""
+        self._schedule_refresh()
+
+    def login(self, stale_token=None):
+        """
+        Realiza login para obtener un nuevo access_token.
+
+        Solo un hilo hace login a la vez. `stale_token` es el token con el que el llamador obtuvo el 401 (o que vio
+        vencido): si otro hilo ya lo reemplazó mientras se esperaba el lock, se usa ese token sin volver a hacer login.
+        """
+        with self._login_lock:
+            if stale_token is not None and self.access_token != stale_token:
+                return True
+            return self._login()
+
+    def _login(self):
+        """Login con el lock tomado."""
         login_url = f"{self.base_url}/auth/login"
         try:
-            response = requests.post(
+            response = self.session.post(
                 login_url,
                 json={"email": API_EMAIL, "password": API_PASSWORD},
                 timeout=self.timeout,
@@ -38,6 +222,7 @@ class HTTPInterceptor:
                 print("Login exitoso. Nuevo token obtenido.")
                 # logging.info(f"Login exitoso. Access_token: {self.access_token}")
                 # print(self.access_token)
+                self._schedule_refresh()
                 return True
             else:
                 logging.warning(f"Error en login: {response.status_code} - {response.text}")
@@ -47,63 +232,122 @@ class HTTPInterceptor:
             print(f"Error al realizar login: {e}")
         return False
 
-    def request(self, method, endpoint, params=None, data=None):
-        """Realiza una solicitud HTTP con manejo de errores e intentos de reintento."""
-        url = f"{self.base_url}{endpoint}"
-        retries = 0
-        login_attempts = 0
+    def _refresh_margin(self, expires_at, issued_at):
+        """Anticipación de la renovación: TOKEN_REFRESH_MARGIN, o un quinto de la vida del token si es más corta."""
+        if issued_at is None:
+            return TOKEN_REFRESH_MARGIN
+        return min(TOKEN_REFRESH_MARGIN, (expires_at - issued_at) / 5)
+
+    def _schedule_refresh(self):
+        """Programa la renovación del token actual antes de su vencimiento (si es un JWT con `exp`)."""
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+            self._refresh_timer = None
+        expires_at, issued_at = token_expiry(self.access_token)
+        if expires_at is None:
+            return  # Sin vencimiento conocido: solo se renueva al recibir un 401
+
+        refresh_at = expires_at - self._refresh_margin(expires_at, issued_at)
+        token = self.access_token
+        self._refresh_timer = threading.Timer(max(0.0, refresh_at - time.time()), self._refresh_in_background, args=(token,))
+        self._refresh_timer.daemon = True
+        self._refresh_timer.start()
+
+    def _refresh_in_background(self, token):
+        print("Token por vencer. Renovando en segundo plano.")
+        self.login(stale_token=token)
 
-        while retries < self.max_retries:
-            headers = {"Authorization": f"Bearer {self.access_token}"}  # Actualiza el token en cada intento
+    def _ensure_fresh_token(self):
+        """Si el token ya venció (p. ej. la renovación en segundo plano falló), lo renueva antes de la petición."""
+        token = self.access_token
+        expires_at, _ = token_expiry(token)
+        if expires_at is not None and time.time() >= expires_at:
+            self.login(stale_token=token)
+
+    def request(self, method, endpoint, params=None, data=None, headers=None, cancel_event=None):
+        """
+        Realiza una solicitud HTTP con manejo de errores e intentos de reintento.
+        `headers` se agregan a los de autorización (p. ej. If-None-Match para peticiones condicionales).
+        `cancel_event` (threading.Event o equivalente con is_set) aborta la solicitud si otra la reemplazó:
+        se revisa antes de cada intento, durante las esperas y al recibir los encabezados, antes de descargar el cuerpo.
+
+        Los reintentos siguen `retry_policy` (solo fallas transitorias, con backoff exponencial y jitter).
+        Los 4xx no reintentables se devuelven tal cual; si el circuit breaker está abierto se falla de inmediato.
+        """
+        attempts = RequestAttempts(self, method, endpoint)
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                print(f"Solicitud a {attempts.url} cancelada.")
+                return None
+            if not attempts.admit():
+                return None
 
             try:
-                response = requests.request(
-                    method,
-                    url,
-                    headers=headers,
-                    params=params,
-                    json=data,
-                    timeout=self.timeout,
-                )
-
-                # print(f"""
-                #     {method},
-                #     {url},
-                #     {headers},
-                #     {params},
-                #     {data},
-                #     {self.timeout}""")
-                # print(response)
-
-                if response.status_code == 401:
-                    # Intentar renovar token una vez
-                    if login_attempts < 1:
-                        # logging.info("Token expirado. Intentando renovar.")
-                        print("Token expirado. Intentando renovar.")
-                        if self.login():
-                            login_attempts += 1
-                            continue
-                    logging.error("Error: No se pudo renovar el token.")
-                    print("Error: No se pudo renovar el token.")
+                self._ensure_fresh_token()
+                request_headers = attempts.headers(headers)
+                try:
+                    # Con stream=True el span termina al recibir los encabezados (el cuerpo se descarga al leerlo)
+                    with attempts.measure() as span:
+                        response = self.session.request(
+                            method,
+                            attempts.url,
+                            headers=request_headers,
+                            params=params,
+                            json=data,
+                            timeout=self.timeout,
+                            stream=cancel_event is not None,  # Permite descartar el cuerpo si la solicitud se canceló
+                        )
+                        span.set(status=response.status_code)
+                except (Timeout, ConnectionError) as e:
+                    # Falla transitoria (timeout o backend inaccesible): se reintenta con espera
+                    if attempts.after_transport_error(isinstance(e, Timeout)) == RETRY and self._wait_before_retry(attempts.retry_delay, cancel_event):
+                        continue
+                    break
+                except RequestException as e:
+                    print(f"Error en la petición: {e}")
                     break
 
-                elif 400 <= response.status_code < 500 or response.status_code >= 500:
-                    retries += 1
-                    logging.warning(f"Error HTTP {response.status_code}: Reintentando ({retries}/{self.max_retries})")
-                    print(f"Error HTTP {response.status_code}: Reintentando ({retries}/{self.max_retries})")
-                    continue
-
-                # Respuesta exitosa
-                return response
+                if cancel_event is not None and cancel_event.is_set():
+                    response.close()
+                    print(f"Solicitud a {attempts.url} cancelada.")
+                    return None
 
-            except Timeout:
-                retries += 1
-                logging.warning(f"Timeout alcanzado: Reintentando ({retries}/{self.max_retries})")
-                print(f"Timeout alcanzado: Reintentando ({retries}/{self.max_retries})")
-            except RequestException as e:
-                print(f"Error en la petición: {e}")
+                action = attempts.after_response(response.status_code, response.headers.get("Retry-After"))
+                if response.status_code >= 400:
+                    response.close()  # Libera la conexión (con stream=True el cuerpo no se leyó)
+                if action == RENEW_TOKEN:
+                    action = attempts.after_login(self.login(stale_token=attempts.token))
+                if action == RETURN_RESPONSE:
+                    return response
+                if action == RETRY and self._wait_before_retry(attempts.retry_delay, cancel_event):
+                    continue
                 break
+            finally:
+                attempts.end_attempt()
 
-        logging.error(f"Error: La solicitud a {url} falló después de {self.max_retries} intentos.")
-        print(f"Error: La solicitud a {url} falló después de {self.max_retries} intentos.")
+        attempts.log_failure()
         return None
+
+    def _wait_before_retry(self, delay, cancel_event):
+        """Espera `delay` segundos antes del siguiente intento; retorna False si la solicitud se canceló mientras tanto."""
+        deadline = time.monotonic() + delay
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                return False
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return True
+            time.sleep(min(remaining, RETRY_WAIT_SLICE))
+
+    @staticmethod
+    def record_transfer(response):
+        """Registra los bytes recibidos (comprimidos) y decodificados de una respuesta cuyo cuerpo ya se leyó."""
+        if response is None or response.raw is None or not response.content:
+            return
+        transfer_stats.record(API, response.raw.tell(), len(response.content))
+
+    def close(self):
+        """Cancela la renovación programada del token y cierra las conexiones abiertas del pool."""
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+        self.session.close()
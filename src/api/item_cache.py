@@ -0,0 +1,167 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from .lazy_json import LazyJsonObject
+
+# item_cache.py
+__all__ = ["ItemCache", "CacheEntry"]
+
+CACHE_FILE_VERSION = 1
+SAVE_DELAY = 10  # Segundos que se agrupan los cambios antes de escribir la caché en disco
+# Una etiqueta vencida se muestra mientras se revalida, pero la interfaz no se actualiza si cambió:
+# por eso solo se sirve unos minutos después de vencer (pasado eso, se espera a la API o a la copia del catálogo)
+STALE_TTL = 600
+
+
+class CacheEntry(NamedTuple):
+    item: dict
+    etag: str  # ETag de la respuesta (None si el backend no lo envía)
+    stored_at: float  # time.time() de la última vez que se obtuvo o revalidó
+
+
+class ItemCache:
+    """
+    Caché LRU (thread-safe) para las respuestas de items de la API, con persistencia opcional en disco.
+
+    La llenan tanto las búsquedas normales como la precarga (prefetch) de relaciones,
+    de modo que abrir una relación o repetir una búsqueda reciente resuelve sin red.
+    Una entrada es vigente durante `ttl` segundos; después, y hasta `stale_ttl`, puede servirse
+    mientras se revalida en segundo plano (stale-while-revalidate).
+    """
+
+    def __init__(self, max_entries=200, ttl=300, stale_ttl=STALE_TTL, persist_path=None):
+        self.max_entries = max_entries
+        self.ttl = ttl  # Segundos que una entrada se considera vigente
+        self.stale_ttl = stale_ttl  # Segundos que una entrada vencida todavía puede servirse mientras se revalida
+        self.persist_path = persist_path
+        self._entries = OrderedDict()  # key -> CacheEntry
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # Serializa las escrituras del archivo
+        self._save_timer = None
+        self._dirty = False
+        if persist_path:
+            self.load()
+
+    @staticmethod
+    def make_key(inventory_id, query_params):
+        """Construye una llave hashable a partir del id y los query params que se envían a la API."""
+        params = tuple(sorted((str(k), str(v)) for k, v in (query_params or {}).items()))
+        return str(inventory_id).strip(), params
+
+    def lookup(self, key):
+        """Retorna la CacheEntry (vigente o vencida pero aún servible), o None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry.stored_at > self.ttl + self.stale_ttl:
+                del self._entries[key]
+                self._dirty = True
+                return None
+            self._entries.move_to_end(key)  # Marcar como usado recientemente
+            return entry
+
+    def is_fresh(self, entry):
+        return time.time() - entry.stored_at <= self.ttl
+
+    def get(self, key):
+        """Retorna el item en caché si existe y no ha expirado, o None."""
+        entry = self.lookup(key)
+        if entry is None or not self.is_fresh(entry):
+            return None
+        return entry.item
+
+    def put(self, key, item, etag=None):
+        """Guarda un item, desalojando el menos usado si se excede el tamaño máximo."""
+        with self._lock:
+            self._entries[key] = CacheEntry(item, etag, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+
+    def refresh(self, key):
+        """Marca la entrada como vigente otra vez (el backend respondió 304 Not Modified)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries[key] = entry._replace(stored_at=time.time())
+                self._dirty = True
+
+    def contains(self, key):
+        return self.get(key) is not None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._dirty = True
+
+    def load(self):
+        """Carga las entradas guardadas en disco (las que ya no pueden servirse se descartan)."""
+        try:
+            with open(self.persist_path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logging.warning(f"No se pudo leer la caché de items {self.persist_path}: {e}")
+            return
+        if data.get("version") != CACHE_FILE_VERSION:
+            return
+
+        now = time.time()
+        with self._lock:
+            for inventory_id, params, stored_at, etag, item in data.get("entries", [])[-self.max_entries :]:
+                if now - stored_at <= self.ttl + self.stale_ttl:
+                    key = (inventory_id, tuple(tuple(param) for param in params))
+                    self._entries[key] = CacheEntry(item, etag, stored_at)
+
+    @staticmethod
+    def item_json(item):
+        """Texto JSON del item: el de la respuesta si llegó sin decodificar (LazyJsonObject), sin decodificarlo para guardarlo."""
+        if isinstance(item, LazyJsonObject):
+            return item.json_text()
+        return json.dumps(item, ensure_ascii=False)
+
+    def save_soon(self):
+        """Programa un guardado en disco dentro de SAVE_DELAY segundos (agrupa varias respuestas en una escritura)."""
+        if not self.persist_path:
+            return
+        with self._lock:
+            if self._save_timer is not None:
+                return
+            self._save_timer = threading.Timer(SAVE_DELAY, self.save)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def save(self):
+        """Guarda las entradas en disco (escritura atómica), solo si cambiaron desde el último guardado."""
+        if not self.persist_path:
+            return
+        with self._save_lock:
+            with self._lock:
+                if self._save_timer is not None:
+                    self._save_timer.cancel()
+                    self._save_timer = None
+                if not self._dirty:
+                    return
+                entries = [(key, entry) for key, entry in self._entries.items()]
+                self._dirty = False
+
+            temp_path = f"{self.persist_path}.tmp"
+            try:
+                os.makedirs(os.path.dirname(self.persist_path), exist_ok=True)
+                with open(temp_path, "w", encoding="utf-8") as file:
+                    file.write(f'{{"version": {CACHE_FILE_VERSION}, "entries": [')
+                    for index, (key, entry) in enumerate(entries):
+                        header = json.dumps([key[0], key[1], entry.stored_at, entry.etag], ensure_ascii=False)
+                        file.write(f"{', ' if index else ''}{header[:-1]}, {self.item_json(entry.item)}]")
+                    file.write("]}")
+                os.replace(temp_path, self.persist_path)
+            except OSError as e:
+                logging.warning(f"No se pudo guardar la caché de items {self.persist_path}: {e}")
@@ -0,0 +1,34 @@
+import json
+
+from tracing import tracer
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional: sin él se usa el módulo json de la biblioteca estándar
+    orjson = None
+
+# json_backend.py
+__all__ = ["loads", "dumps", "BACKEND"]
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+if orjson is not None:
+    _loads = orjson.loads
+
+    def dumps(value):
+        """Codifica a texto JSON compacto."""
+        return orjson.dumps(value).decode("utf-8")
+
+else:
+    # json detecta la codificación de los bytes por sí mismo
+    _loads = json.loads
+
+    def dumps(value):
+        """Codifica a texto JSON compacto."""
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def loads(data):
+    """Decodifica JSON desde bytes (o str) directamente, sin una copia intermedia como texto."""
+    with tracer.span("json.decode", "decode", backend=BACKEND, size=len(data)):
+        return _loads(data)
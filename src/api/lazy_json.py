@@ -0,0 +1,55 @@
+from collections.abc import Mapping
+
+from . import json_backend
+
+# lazy_json.py
+__all__ = ["LazyJsonObject"]
+
+
+class LazyJsonObject(Mapping):
+    """
+    Objeto JSON (p. ej. el cuerpo de una respuesta de item) que se decodifica recién al acceder a sus claves.
+
+    Las respuestas que solo se guardan (revalidaciones en segundo plano, precargas que nadie abre) pasan a la
+    caché y a la copia local del catálogo sin decodificarse ni volver a codificarse: se conserva el texto original.
+    El documento se decodifica completo en el primer acceso (con json_backend, directo desde los bytes): el
+    decodificador en C procesa el documento entero más rápido de lo que un recorrido en Python puede saltar
+    sus sub-árboles.
+    """
+
+    __slots__ = ("raw", "_data")
+
+    def __init__(self, raw):
+        self.raw = raw  # str o bytes (UTF-8) tal como llegaron
+        self._data = None
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = json_backend.loads(self.raw)
+        return self._data
+
+    @property
+    def decoded(self):
+        return self._data is not None
+
+    def json_text(self):
+        """Texto JSON del objeto, sin volver a codificarlo."""
+        return self.raw.decode("utf-8") if isinstance(self.raw, bytes) else self.raw
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def __repr__(self):
+        if self._data is None:
+            return f"LazyJsonObject(<{len(self.raw)} bytes sin decodificar>)"
+        return f"LazyJsonObject({self._data!r})"
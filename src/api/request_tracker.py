@@ -0,0 +1,53 @@
+import threading
+
+# request_tracker.py
+__all__ = ["RequestTracker", "RequestToken"]
+
+
+class RequestToken:
+    """Identifica una petición de la interfaz; `cancel_event` se activa cuando otra petición la reemplaza."""
+
+    __slots__ = ("generation", "cancel_event")
+
+    def __init__(self, generation):
+        self.generation = generation
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+
+class RequestTracker:
+    """
+    Lleva la generación de la petición vigente (p. ej. la búsqueda del item que se muestra).
+    Iniciar una petición cancela la anterior, de modo que un resultado lento que llega tarde
+    puede reconocerse como obsoleto y descartarse sin tocar la interfaz.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._current = None
+
+    def start(self):
+        """Registra una nueva petición vigente (cancelando la anterior) y retorna su token."""
+        with self._lock:
+            if self._current is not None:
+                self._current.cancel()
+            self._generation += 1
+            self._current = RequestToken(self._generation)
+            return self._current
+
+    def is_current(self, token):
+        with self._lock:
+            return token is self._current and not token.cancelled
+
+    def cancel(self):
+        """Cancela la petición vigente sin iniciar otra."""
+        with self._lock:
+            if self._current is not None:
+                self._current.cancel()
@@ -0,0 +1,146 @@
+import logging
+import random
+import threading
+import time
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+# retry_policy.py
+__all__ = ["RetryPolicy", "CircuitBreaker", "BreakerStateNotifier", "CLOSED", "OPEN", "HALF_OPEN"]
+
+# Estados del circuit breaker
+CLOSED = "closed"  # Normal: las peticiones pasan
+OPEN = "open"  # Backend caído: se falla de inmediato hasta que termine el enfriamiento
+HALF_OPEN = "half_open"  # Enfriamiento terminado: se deja pasar una petición de prueba
+
+
+class RetryPolicy:
+    """
+    Decide qué fallas se reintentan y cuánto esperar entre intentos.
+    Se reintentan timeouts, errores de conexión, 5xx, 408 y 429; el resto de los 4xx (400, 404, ...)
+    no cambian al repetirlos y se devuelven de inmediato. La espera crece exponencialmente con jitter
+    completo (un valor aleatorio entre 0 y el tope), para no sincronizar reintentos de varios clientes.
+    """
+
+    RETRYABLE_STATUSES = frozenset((408, 425, 429, 500, 502, 503, 504))
+
+    def __init__(self, max_attempts=3, base_delay=0.2, max_delay=2.0):
+        self.max_attempts = max_attempts  # Intentos totales (el primero incluido)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def is_retryable_status(self, status_code):
+        return status_code in self.RETRYABLE_STATUSES
+
+    def can_retry(self, attempt):
+        """`attempt` es el número de intentos ya realizados."""
+        return attempt < self.max_attempts
+
+    def delay(self, attempt, retry_after=None):
+        """Segundos de espera antes del intento siguiente; respeta Retry-After (en segundos) hasta max_delay."""
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), self.max_delay)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """
+    Corta las peticiones cuando el backend está caído: tras `failure_threshold` fallas seguidas
+    (timeouts, errores de conexión o 5xx) queda abierto `cooldown` segundos, durante los cuales
+    las peticiones fallan de inmediato. Luego deja pasar una petición de prueba (medio abierto):
+    si funciona se cierra, si falla vuelve a abrirse.
+    """
+
+    def __init__(self, failure_threshold=5, cooldown=30):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._listeners = []
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                return HALF_OPEN
+            return self._state
+
+    @property
+    def is_open(self):
+        return self.state == OPEN
+
+    def add_listener(self, callback):
+        """`callback(state)` se llama (desde el hilo de la petición) cada vez que cambia el estado."""
+        self._listeners.append(callback)
+
+    def allow_request(self):
+        """Retorna True si la petición puede hacerse ahora."""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN and time.monotonic() - self._opened_at < self.cooldown:
+                return False
+            # Enfriamiento terminado: una sola petición de prueba a la vez
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            changed = self._set_state(HALF_OPEN)
+        self._notify(changed)
+        return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._trial_in_flight = False
+            changed = self._set_state(CLOSED)
+        self._notify(changed)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            changed = None
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                changed = self._set_state(OPEN)
+        self._notify(changed)
+
+    def release_trial(self):
+        """
+        La petición terminó sin resultado que registrar (se canceló o falló antes de llegar al backend): si era la
+        petición de prueba, el breaker sigue medio abierto y la siguiente petición puede hacer la prueba.
+        """
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._trial_in_flight = False
+
+    def _set_state(self, state):
+        """Cambia el estado (con el lock tomado); retorna el nuevo estado si cambió, o None."""
+        if self._state == state:
+            return None
+        self._state = state
+        return state
+
+    def _notify(self, state):
+        if state is None:
+            return
+        logging.warning(f"Circuit breaker de la API: {state}")
+        print(f"Circuit breaker de la API: {state}")
+        for callback in self._listeners:
+            callback(state)
+
+
+class BreakerStateNotifier(QObject):
+    """Puente hacia la interfaz: re-emite los cambios de estado del breaker como señal (entregada en el hilo de la UI)."""
+
+    state_changed = pyqtSignal(str)
+
+    def __init__(self, circuit_breaker, parent=None):
+        super().__init__(parent)
+        circuit_breaker.add_listener(self.state_changed.emit)
@@ -0,0 +1,143 @@
+import asyncio
+import threading
+
+# single_flight.py
+__all__ = ["SingleFlight"]
+
+CANCEL_POLL_INTERVAL = 0.05  # Segundos entre revisiones de cancelación mientras se espera una llamada en curso
+
+
+class _SharedCancel:
+    """Cancelación de una llamada compartida: se activa solo cuando todos los que esperan el resultado cancelaron."""
+
+    def __init__(self):
+        self.events = []  # Un evento por interesado (None = no cancelable)
+
+    def is_set(self):
+        return bool(self.events) and all(event is not None and event.is_set() for event in self.events)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.cancel = _SharedCancel()
+        self.result = None
+        self.error = None
+        self.abandoned = False  # El líder era una tarea del loop y se canceló: quienes esperaban repiten la llamada
+        self.waiters = []  # (loop, asyncio.Future) de las corrutinas que esperan el resultado
+
+
+def _wake(waiter):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class SingleFlight:
+    """
+    Agrupa llamadas concurrentes con la misma llave en una sola ejecución (single-flight).
+
+    El primer hilo que pide una llave ejecuta la función; los que piden la misma llave mientras
+    tanto esperan y reciben el mismo resultado (o la misma excepción). Terminada la llamada,
+    la llave se libera y la siguiente petición vuelve a ejecutar la función.
+    Con `do_async`, las corrutinas de un event loop comparten las mismas llamadas que los hilos.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> _Call en curso
+
+    def do(self, key, function, *args, cancel_event=None, **kwargs):
+        """
+        Ejecuta `function(*args, **kwargs)` o espera la ejecución en curso de la misma llave.
+        Si se pasa `cancel_event`, la función recibe `cancel_event=` compartido (activo solo cuando todos
+        los interesados cancelaron) y quien cancela deja de esperar y recibe None.
+        """
+        while True:
+            call, is_leader = self._join(key, cancel_event)
+            if is_leader:
+                break
+            if cancel_event is None:
+                call.done.wait()
+            else:
+                while not call.done.wait(CANCEL_POLL_INTERVAL):
+                    if cancel_event.is_set():
+                        return None
+            if call.abandoned:
+                continue  # La tarea del loop que ejecutaba la llamada se canceló: se repite
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        if cancel_event is not None:
+            kwargs["cancel_event"] = call.cancel
+        try:
+            call.result = function(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            self._finish(key, call)
+        return call.result
+
+    async def do_async(self, key, function, *args):
+        """
+        Como `do`, desde un event loop: ejecuta `await function(*args)` o espera, sin bloquear el loop, la llamada en
+        curso de la misma llave (de un hilo o de otra corrutina). Cancelar la tarea deja de esperar; si la tarea
+        ejecutaba la llamada, los que la esperaban la repiten en lugar de recibir la cancelación.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            cancel_event = threading.Event()  # Se activa si la tarea se cancela mientras espera a un hilo
+            waiter = loop.create_future()
+            call, is_leader = self._join(key, cancel_event, (loop, waiter))
+            if is_leader:
+                break
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                cancel_event.set()
+                raise
+            if call.abandoned:
+                continue
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = await function(*args)
+        except asyncio.CancelledError:
+            call.abandoned = True
+            raise
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            self._finish(key, call)
+        return call.result
+
+    def _join(self, key, cancel_event, waiter=None):
+        """Retorna (llamada en curso de la llave, o una nueva, y si quien llama la ejecuta)."""
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = _Call()
+            elif waiter is not None:
+                call.waiters.append(waiter)
+            call.cancel.events.append(cancel_event)
+        return call, is_leader
+
+    def _finish(self, key, call):
+        with self._lock:
+            del self._calls[key]
+            waiters = call.waiters[:]
+        call.done.set()
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:
+                pass  # Loop ya cerrado: nadie espera ese resultado
+
+    def in_flight(self, key):
+        with self._lock:
+            return key in self._calls
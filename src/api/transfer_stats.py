@@ -0,0 +1,61 @@
+import logging
+import threading
+from collections import Counter
+
+# transfer_stats.py
+__all__ = ["TransferStats", "transfer_stats", "API", "THUMBNAIL", "FULL_IMAGE"]
+
+# Tipos de transferencia
+API = "api"  # Respuestas JSON de items (comprimidas con gzip/br si el servidor lo acepta)
+THUMBNAIL = "thumbnail"  # Miniaturas del carrusel y de las relaciones
+FULL_IMAGE = "full_image"  # Imágenes completas, descargadas solo para el zoom
+
+
+class TransferStats:
+    """
+    Cuenta los bytes descargados por búsqueda (scan): los recibidos por la red y, para la API,
+    los que ocuparía la respuesta sin comprimir. Al empezar cada búsqueda se registra en el log
+    el resumen de la anterior.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._scan = Counter()
+        self._totals = Counter()
+        self.scans = 0
+
+    def record(self, kind, wire_bytes, decoded_bytes=None):
+        """Registra una descarga; `decoded_bytes` es el tamaño tras descomprimir (igual a wire_bytes si se omite)."""
+        decoded_bytes = wire_bytes if decoded_bytes is None else decoded_bytes
+        with self._lock:
+            for counter in (self._scan, self._totals):
+                counter[f"{kind}_wire"] += wire_bytes
+                counter[f"{kind}_decoded"] += decoded_bytes
+                counter[f"{kind}_count"] += 1
+
+    def start_scan(self):
+        """Cierra la búsqueda anterior (si descargó algo, la registra en el log) y retorna sus contadores."""
+        with self._lock:
+            previous, self._scan = self._scan, Counter()
+            self.scans += 1
+        if previous:
+            logging.info(f"Transferencia de la búsqueda: {self.format(previous)}")
+        return previous
+
+    def totals(self):
+        with self._lock:
+            return Counter(self._totals)
+
+    @staticmethod
+    def format(counters):
+        api_saved = counters[f"{API}_decoded"] - counters[f"{API}_wire"]
+        return (
+            f"API {counters[f'{API}_wire'] / 1024:.1f} KB (sin comprimir {counters[f'{API}_decoded'] / 1024:.1f} KB,"
+            f" ahorro {api_saved / 1024:.1f} KB) | miniaturas {counters[f'{THUMBNAIL}_wire'] / 1024:.1f} KB"
+            f" ({counters[f'{THUMBNAIL}_count']}) | imágenes completas {counters[f'{FULL_IMAGE}_wire'] / 1024:.1f} KB"
+            f" ({counters[f'{FULL_IMAGE}_count']})"
+        )
+
+
+# Instancia compartida por la API y los widgets de imágenes
+transfer_stats = TransferStats()
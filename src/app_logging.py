@@ -0,0 +1,127 @@
+import atexit
+import hashlib
+import logging
+import os
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# app_logging.py
+__all__ = ["setup_logging", "queued_file_logger", "flush_logs", "RateLimitFilter", "zpl_digest"]
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 5
+LOG_QUEUE_SIZE = 10000  # Registros pendientes de escribir; si el disco no da abasto, los nuevos se descartan
+RATE_LIMIT_RECORDS = 20  # Registros por línea de código y ventana
+RATE_LIMIT_WINDOW = 1.0  # s
+
+_listeners = []
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler que nunca bloquea al hilo que registra: con la cola llena, el registro se descarta y se cuenta."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Limita cada línea de código que registra a `max_records` por ventana de `window` segundos
+    (p. ej. un mensaje por etiqueta en una impresión de miles de copias). Al reabrirse la ventana,
+    el siguiente registro indica cuántos se suprimieron.
+    """
+
+    def __init__(self, max_records=RATE_LIMIT_RECORDS, window=RATE_LIMIT_WINDOW):
+        super().__init__()
+        self.max_records = max_records
+        self.window = window
+        self._lock = threading.Lock()
+        self._sites = {}  # (archivo, línea) -> [inicio de la ventana, registros, suprimidos]
+
+    def filter(self, record):
+        now = time.monotonic()
+        key = (record.pathname, record.lineno)
+        with self._lock:
+            site = self._sites.get(key)
+            if site is None or now - site[0] >= self.window:
+                suppressed = site[2] if site is not None else 0
+                self._sites[key] = [now, 1, 0]
+            elif site[1] < self.max_records:
+                site[1] += 1
+                suppressed = 0
+            else:
+                site[2] += 1
+                return False
+        if suppressed:
+            record.msg = f"{record.getMessage()} ({suppressed} mensajes similares suprimidos)"
+            record.args = None
+        return True
+
+
+def _start_listener(handler, log_queue):
+    listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+    return listener
+
+
+def setup_logging(log_path, level=logging.INFO):
+    """
+    Configura el logging de la aplicación: los registros pasan por una cola y un hilo propio los escribe en
+    `log_path` (con rotación por tamaño), así que registrar no espera al disco. Cada línea de código se limita
+    con RateLimitFilter. No hace nada si ya hay manejadores configurados.
+    """
+    root = logging.getLogger()
+    if root.hasHandlers():
+        return
+    file_handler = RotatingFileHandler(log_path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8")
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    log_queue = queue.Queue(LOG_QUEUE_SIZE)
+    queue_handler = DroppingQueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter())
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+    _start_listener(file_handler, log_queue)
+
+
+def queued_file_logger(name, path, max_bytes=LOG_MAX_BYTES, backups=LOG_BACKUPS):
+    """Logger propio (no pasa al de la aplicación) que escribe solo el mensaje en `path`, también a través de una cola."""
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    if not logger.handlers:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        file_handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+        file_handler.setFormatter(logging.Formatter("%(message)s"))
+        log_queue = queue.Queue(LOG_QUEUE_SIZE)
+        logger.addHandler(DroppingQueueHandler(log_queue))
+        _start_listener(file_handler, log_queue)
+    return logger
+
+
+def flush_logs():
+    """Espera a que se escriban los registros que ya están en las colas."""
+    for listener in _listeners:
+        listener.queue.join()
+
+
+def zpl_digest(zpl):
+    """Huella corta del ZPL para los logs: identifica la etiqueta sin escribir el contenido (que puede pesar megabytes)."""
+    return hashlib.blake2b(zpl.encode("utf-8"), digest_size=6).hexdigest()
+
+
+@atexit.register
+def _stop_listeners():
+    # Escribe lo que quede en las colas antes de salir
+    for listener in _listeners:
+        listener.stop()
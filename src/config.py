@@ -14,6 +14,8 @@ from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from dotenv import load_dotenv
 
+from app_logging import setup_logging
+
 
 # --- Configuración de logging centralizada ---
 def get_documents_folder():
@@ -49,14 +51,9 @@ if not os.path.exists(log_dir):
 # Definir la ruta completa del archivo de log
 log_path = os.path.join(log_dir, "app.log")
 
-# Configurar logging solo si aún no se han definido manejadores (para evitar reconfiguraciones)
-if not logging.getLogger().hasHandlers():
-    logging.basicConfig(
-        level=logging.DEBUG,
-        filename=log_path,
-        filemode="a",  # Modo append para seguir registrando sin sobrescribir
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    )
+# Logging asíncrono (cola + hilo escritor) con rotación por tamaño; solo si aún no se han definido manejadores.
+# El nivel se elige con la variable de entorno LOG_LEVEL (DEBUG incluye, p. ej., el ZPL completo de cada impresión)
+setup_logging(log_path, level=getattr(logging, os.getenv("LOG_LEVEL", "INFO").upper(), logging.INFO))
 
 # --- Fin de la configuración de logging ---
 
@@ -129,6 +126,13 @@ else:
 API_EMAIL = os.getenv("API_EMAIL", "")
 API_PASSWORD = os.getenv("API_PASSWORD", "")
 API_BASE_URL = os.getenv("API_BASE_URL", "")
+# Servicio que genera las vistas previas de las etiquetas (p. ej. benchmarks/mock_backend.py para pruebas locales)
+LABELARY_URL = os.getenv("LABELARY_URL", "http://api.labelary.com")
+# Spans por etapa (ver tracing.py): TRACING_ENABLED=1 los escribe en LogTTagger/trace.log
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "").lower() in ("1", "true")
+
+# Carpeta para cachés persistentes (respuestas de la API, etc.)
+CACHE_DIR = os.path.join(os.getenv("LOCALAPPDATA") or os.path.join(Path.home(), ".cache"), "TecneuTagger", "cache")
 
 LABEL_SIZES = [
     {"title": "38x25mm", "value": "4_x_2_5"},
@@ -137,4 +141,4 @@ LABEL_SIZES = [
     {"title": "5x2.5cm", "value": "5_x_2_5"},
 ]
 
-__all__ = ["MAX_DELAY", "BASE_ASSETS_PATH", "BASE_ENV_PATH", "LABEL_SIZES", "API_EMAIL", "API_PASSWORD", "API_BASE_URL"]
+__all__ = ["MAX_DELAY", "BASE_ASSETS_PATH", "BASE_ENV_PATH", "LABEL_SIZES", "API_EMAIL", "API_PASSWORD", "API_BASE_URL", "LABELARY_URL", "TRACING_ENABLED", "CACHE_DIR"]
@@ -1,3 +1,4 @@
 # custom_widgets/__init__.py
 from .hover_zoom_window import HoverZoomWindow
 from .image_carousel import ImageCarousel
+from .image_loader import FullImageLoader, thumbnail_url
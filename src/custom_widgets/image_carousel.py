@@ -1,12 +1,16 @@
 import os
 
-from PyQt5.QtCore import QRectF, QSize, Qt, QTimer, QUrl
-from PyQt5.QtGui import QBrush, QColor, QMovie, QPainter, QPalette, QPen, QPixmap
+from PyQt5 import sip
+from PyQt5.QtCore import QEvent, QRectF, QSize, Qt, QTimer, QUrl
+from PyQt5.QtGui import QBrush, QColor, QCursor, QMouseEvent, QMovie, QPainter, QPalette, QPen, QPixmap
 from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkReply, QNetworkRequest
 from PyQt5.QtWidgets import QHBoxLayout, QLabel, QVBoxLayout, QWidget
 
+from api.transfer_stats import THUMBNAIL, transfer_stats
 from config import BASE_ASSETS_PATH
 from custom_widgets import HoverZoomWindow
+from custom_widgets.image_loader import FullImageLoader, thumbnail_url
+from tracing import tracer
 
 
 class ImageCarousel(QWidget):
@@ -41,6 +45,8 @@ class ImageCarousel(QWidget):
 
         self.setFixedHeight(150)
         self.network_manager = QNetworkAccessManager(self)
+        # Las imágenes completas (solo para el zoom) se descargan al pasar el mouse sobre la miniatura
+        self.full_image_loader = FullImageLoader(self.network_manager, self)
         self.images = []
         self.original_images = {}  # Store the original images
         self.hover_zoom_window = None
@@ -125,8 +131,9 @@ class ImageCarousel(QWidget):
         Lanza una petición GET con un QNetworkRequest y QTimer de timeout (5s).
         Almacena la información necesaria en las propiedades del reply para
         poder manejarla en handle_reply y handle_timeout.
+        Se pide la miniatura que entrega el servidor (variante reducida de la imagen), no la imagen completa.
         """
-        request = QNetworkRequest(QUrl(url))
+        request = QNetworkRequest(QUrl(thumbnail_url(url)))
         reply = self.network_manager.get(request)
 
         # Guardamos info en el QNetworkReply para recuperarla luego
@@ -134,6 +141,7 @@ class ImageCarousel(QWidget):
         reply.setProperty("label", label)
         reply.setProperty("spinner", spinner)
         reply.setProperty("attempt", attempt)
+        reply.setProperty("span", tracer.span("image.download", "image", url=url, attempt=attempt))
 
         # Creamos un QTimer de 5s para timeout
         timer = QTimer(self)
@@ -169,6 +177,7 @@ class ImageCarousel(QWidget):
         spinner = reply.property("spinner")
         attempt = reply.property("attempt")
         timer = reply.property("timer")
+        span = reply.property("span")
 
         # Detener el timer para que no dispare más
         if timer and timer.isActive():
@@ -178,11 +187,14 @@ class ImageCarousel(QWidget):
         if reply.error() == QNetworkReply.NoError:
             # print("Image loaded successfully.")
             data = reply.readAll()
+            span.end(size=data.size())
+            transfer_stats.record(THUMBNAIL, data.size())
 
             pixmap = QPixmap()
             if pixmap.loadFromData(data):
-                # Store the original image
-                self.original_images[url] = pixmap
+                # Si el servidor no tiene miniaturas, lo descargado ya es la imagen original
+                if thumbnail_url(url) == url:
+                    self.original_images[url] = pixmap
 
                 # Quitar spinner
                 if spinner:
@@ -202,6 +214,7 @@ class ImageCarousel(QWidget):
                 self.retry_or_fail(url, label, spinner, attempt, "Invalid Image")
         else:
             # Error (puede ser error real o .abort() por timeout)
+            span.end(error=int(reply.error()))
             print(f"Failed to load image from {url}, error={reply.error()}")
             self.retry_or_fail(url, label, spinner, attempt, "Failed to load")
 
@@ -253,7 +266,18 @@ class ImageCarousel(QWidget):
             # Actualiza la posición inicial de zoom
             self.update_zoom_position(event, label, img_url)
         else:
-            print("No pixmap available for zooming.")
+            # Primera vez sobre esta miniatura: se descarga la imagen completa y el zoom se abre al llegar
+            self.full_image_loader.load(img_url, lambda pixmap, lbl=label, url=img_url: self.handle_full_image(lbl, url, pixmap))
+
+    def handle_full_image(self, label, img_url, pixmap):
+        """Guarda la imagen completa descargada para el zoom y abre el zoom si el mouse sigue sobre la miniatura."""
+        if pixmap is None:
+            return
+        self.original_images[img_url] = pixmap
+        if sip.isdeleted(label) or not label.underMouse() or self.hover_zoom_window is not None:
+            return
+        event = QMouseEvent(QEvent.MouseMove, label.mapFromGlobal(QCursor.pos()), Qt.NoButton, Qt.NoButton, Qt.NoModifier)
+        self.show_zoom_window(event, label, img_url)
 
     def clear_grid_and_hide_zoom(self, label):
         """Clear the grid from the label and hide the zoom window."""
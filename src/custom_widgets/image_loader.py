@@ -0,0 +1,69 @@
+import re
+from urllib.parse import urlsplit, urlunsplit
+
+from PyQt5.QtCore import QObject, QUrl
+from PyQt5.QtGui import QPixmap
+from PyQt5.QtNetwork import QNetworkReply, QNetworkRequest
+
+from api.transfer_stats import FULL_IMAGE, transfer_stats
+from tracing import tracer
+
+# image_loader.py
+__all__ = ["FullImageLoader", "thumbnail_url", "THUMBNAIL_VARIANT"]
+
+# Las imágenes de MercadoLibre (*.mlstatic.com) tienen variantes de tamaño según la letra antes de la extensión:
+# "-O" es la original (la que devuelve la API) e "-I" la miniatura (~90 px) que el servidor ya entrega reducida
+THUMBNAIL_VARIANT = "I"
+MLSTATIC_VARIANT = re.compile(r"-[A-Z](\.(?:jpe?g|png|webp|gif))$", re.IGNORECASE)
+FULL_IMAGE_TIMEOUT = 8000  # ms
+
+
+def thumbnail_url(url, variant=THUMBNAIL_VARIANT):
+    """URL de la miniatura de una imagen de MercadoLibre; las URLs de otros servidores se devuelven sin cambios."""
+    parts = urlsplit(url)
+    if not parts.hostname or not parts.hostname.endswith("mlstatic.com"):
+        return url
+    path = MLSTATIC_VARIANT.sub(rf"-{variant}\1", parts.path)
+    return urlunsplit(parts._replace(path=path))
+
+
+class FullImageLoader(QObject):
+    """
+    Descarga bajo demanda las imágenes completas que usa el zoom (las miniaturas se piden ya reducidas).
+    Las peticiones de la misma URL en curso se agrupan; `callback(pixmap)` recibe None si la descarga falló.
+    """
+
+    def __init__(self, network_manager, parent=None):
+        super().__init__(parent)
+        self.network_manager = network_manager
+        self._pending = {}  # url -> [callbacks]
+
+    def load(self, url, callback):
+        callbacks = self._pending.get(url)
+        if callbacks is not None:
+            callbacks.append(callback)
+            return
+        self._pending[url] = [callback]
+        request = QNetworkRequest(QUrl(url))
+        request.setTransferTimeout(FULL_IMAGE_TIMEOUT)
+        reply = self.network_manager.get(request)
+        span = tracer.span("image.download", "image", url=url, full=True)
+        reply.finished.connect(lambda: self._handle_reply(url, reply, span))
+
+    def _handle_reply(self, url, reply, span):
+        callbacks = self._pending.pop(url, [])
+        pixmap = None
+        if reply.error() == QNetworkReply.NoError:
+            data = reply.readAll()
+            span.end(size=data.size())
+            transfer_stats.record(FULL_IMAGE, data.size())
+            pixmap = QPixmap()
+            if not pixmap.loadFromData(data):
+                print(f"Imagen completa inválida: {url}")
+                pixmap = None
+        else:
+            span.end(error=int(reply.error()))
+            print(f"Error al descargar la imagen completa {url}: {reply.error()}")
+        reply.deleteLater()
+        for callback in callbacks:
+            callback(pixmap)
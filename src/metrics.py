@@ -0,0 +1,153 @@
+import threading
+import time
+from collections import Counter, deque
+from typing import NamedTuple
+
+# metrics.py
+__all__ = [
+    "Metrics",
+    "LatencySummary",
+    "metrics",
+    "API_LATENCY",
+    "PREVIEW_RENDER",
+    "PRINT_SEND",
+    "ITEM_CACHE",
+    "CATALOG_MIRROR",
+    "PREVIEW_CACHE",
+    "LABELS_PRINTED",
+    "PRINTER_QUEUE",
+]
+
+# Latencias (ms)
+API_LATENCY = "api"  # Petición a la API hasta recibir los encabezados
+PREVIEW_RENDER = "preview_render"  # Vista previa generada por Labelary (sin contar la caché)
+PRINT_SEND = "print_send"  # Envío de un trabajo a la cola de impresión
+
+# Cachés (aciertos y fallos)
+ITEM_CACHE = "item_cache"  # Items de la API guardados en disco
+CATALOG_MIRROR = "catalog_mirror"  # Copia local del catálogo, consultada cuando el item no está en caché
+PREVIEW_CACHE = "preview_cache"  # Imágenes de vista previa
+
+# Eventos por minuto
+LABELS_PRINTED = "labels_printed"
+
+# Valores instantáneos
+PRINTER_QUEUE = "printer_queue"  # Etiquetas pendientes del trabajo de impresión en curso
+
+LATENCY_SAMPLES = 500  # Muestras recientes por latencia: los percentiles reflejan el comportamiento actual
+RATE_WINDOW = 60.0  # s
+
+
+class LatencySummary(NamedTuple):
+    count: int  # Muestras desde que inició la aplicación
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+class Metrics:
+    """
+    Contadores en memoria para el panel de diagnóstico: latencias (percentiles de las últimas muestras),
+    aciertos de las cachés, eventos por minuto y valores instantáneos que se leen al consultar (gauges).
+
+    Registrar es barato (un lock y un append) y se puede hacer desde cualquier hilo; los percentiles solo se
+    calculan al consultarlos, mientras el panel está visible.
+    """
+
+    def __init__(self, latency_samples=LATENCY_SAMPLES, rate_window=RATE_WINDOW):
+        self.latency_samples = latency_samples
+        self.rate_window = rate_window
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._latency_counts = Counter()
+        self._counters = Counter()
+        self._events = {}
+        self._gauges = {}
+
+    def observe(self, name, ms):
+        """Registra una latencia en milisegundos."""
+        with self._lock:
+            samples = self._latencies.get(name)
+            if samples is None:
+                samples = self._latencies[name] = deque(maxlen=self.latency_samples)
+            samples.append(ms)
+            self._latency_counts[name] += 1
+
+    def cache_access(self, name, hit):
+        """Registra un acierto (o un fallo) de la caché `name`."""
+        with self._lock:
+            self._counters[f"{name}_{'hit' if hit else 'miss'}"] += 1
+
+    def event(self, name, count=1):
+        """Registra `count` eventos ahora (p. ej. etiquetas impresas), para calcular su frecuencia por minuto."""
+        now = time.monotonic()
+        with self._lock:
+            events = self._events.get(name)
+            if events is None:
+                events = self._events[name] = deque()
+            events.append((now, count))
+            self._counters[name] += count
+            self._expire(events, now)
+
+    def set_gauge(self, name, callback):
+        """`callback()` da el valor actual de `name` cada vez que se consulta (None lo quita)."""
+        with self._lock:
+            if callback is None:
+                self._gauges.pop(name, None)
+            else:
+                self._gauges[name] = callback
+
+    def latency(self, name):
+        """Percentiles de las últimas muestras de `name` (None si no hay)."""
+        with self._lock:
+            samples = sorted(self._latencies.get(name, ()))
+            count = self._latency_counts[name]
+        if not samples:
+            return None
+
+        def percentile(fraction):
+            return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+        return LatencySummary(count, percentile(0.50), percentile(0.95), percentile(0.99), samples[-1])
+
+    def hit_rate(self, name):
+        """Fracción de aciertos de la caché `name` y el total de consultas (None si no se ha consultado)."""
+        with self._lock:
+            hits, misses = self._counters[f"{name}_hit"], self._counters[f"{name}_miss"]
+        total = hits + misses
+        return (hits / total, total) if total else (None, 0)
+
+    def per_minute(self, name):
+        """Eventos de `name` en la última ventana, escalados a un minuto."""
+        now = time.monotonic()
+        with self._lock:
+            events = self._events.get(name)
+            if not events:
+                return 0.0
+            self._expire(events, now)
+            return sum(count for _, count in events) * 60.0 / self.rate_window
+
+    def total(self, name):
+        with self._lock:
+            return self._counters[name]
+
+    def gauge(self, name):
+        with self._lock:
+            callback = self._gauges.get(name)
+        return callback() if callback is not None else None
+
+    def _expire(self, events, now):
+        while events and now - events[0][0] > self.rate_window:
+            events.popleft()
+
+    def reset(self):
+        with self._lock:
+            self._latencies.clear()
+            self._latency_counts.clear()
+            self._counters.clear()
+            self._events.clear()
+
+
+# Instancia compartida por la API, las vistas previas, la impresión y el panel de diagnóstico
+metrics = Metrics()
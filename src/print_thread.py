@@ -1,20 +1,38 @@
+import logging
 import math
 import re
 import threading
+import time
 
 from PyQt5.QtCore import QThread, pyqtSignal
-from zebra import Zebra
 
+try:
+    from zebra import Zebra
+except ImportError:
+    # Sin zebra (p. ej. en Linux) solo se puede imprimir con un transporte propio (ver `transport` en PrintThread)
+    Zebra = None
+
+from app_logging import zpl_digest
 from config import MAX_DELAY
+from metrics import LABELS_PRINTED, PRINT_SEND, metrics
+from tracing import tracer
 from utils import normalize_zpl
+from zpl import parse_zpl_document
 
 # print_thread.py
-__all__ = ["PrintThread"]
+__all__ = ["PrintThread", "PrinterUnavailableError"]
+
+
+class PrinterUnavailableError(Exception):
+    """No se pudo abrir la impresora (sin el módulo zebra o sin acceso a su cola); el mensaje es para el operador."""
 
 
 class PrintThread(QThread):
     """
     Clase para gestionar la impresión en un hilo separado.
+
+    El ZPL se envía a la impresora con `transport`, cualquier objeto con un método `output(zpl)`.
+    Por defecto es una impresora Zebra de la cola `printer_name`; los benchmarks usan una impresora simulada.
     """
 
     update_signal = pyqtSignal(str)
@@ -22,19 +40,39 @@ class PrintThread(QThread):
     error_signal = pyqtSignal(str)
     request_pause_signal = pyqtSignal()  # Nueva señal para solicitar pausa
 
-    def __init__(self, copies, delay, zpl, printer_name):
+    def __init__(self, copies, delay, zpl, printer_name, transport=None):
         super().__init__()
         self.copies = copies
         self.delay = delay
         self.zpl = zpl
         self.printer_name = printer_name
         self.lock = threading.Lock()  # Lock para proteger el acceso a self.copies
-        self.z = Zebra(self.printer_name)  # Inicializa aquí
+        self._digest = (None, None)  # (zpl, huella) del trabajo actual, para no recalcularla en cada etiqueta
         self.reset_thread_state()  # Asegurar que el estado del hilo esté correcto cada vez que se inicie run()
+        self.z = transport if transport is not None else self.open_printer()
+
+    def open_printer(self):
+        """
+        Abre la impresora Zebra de la cola `printer_name`.
+        Lanza PrinterUnavailableError si no se puede: desde el constructor nadie está conectado aún a `error_signal`.
+        """
+        if Zebra is None:
+            raise PrinterUnavailableError("No se puede imprimir: el módulo zebra no está instalado.")
+        z = Zebra(self.printer_name)  # Inicializa aquí
         try:
-            self.z.setqueue(self.printer_name)
+            z.setqueue(self.printer_name)
         except Exception as e:
-            self.error_signal.emit(f"Error al establecer la cola de la impresora{': ' if str(e) else ''}{e}.")
+            raise PrinterUnavailableError(f"Error al establecer la cola de la impresora{': ' if str(e) else ''}{e}.") from e
+        return z
+
+    def document_digest(self):
+        """Huella del ZPL del trabajo para los logs; se calcula una vez por trabajo."""
+        zpl, digest = self._digest
+        if zpl is not self.zpl:
+            zpl = self.zpl
+            digest = zpl_digest(zpl)
+            self._digest = (zpl, digest)
+        return digest
 
     def reset_thread_state(self):
         """
@@ -85,23 +123,45 @@ class PrintThread(QThread):
         # Normalizar ZPL antes de realizar modificaciones
         normalized_zpl = normalize_zpl(self.zpl)
 
-        if self.delay == MAX_DELAY:  # Supongamos que MAX_DELAY es el valor máximo del slider
+        document = parse_zpl_document(self.zpl)
+        if document.is_multi_label:
+            # Documento con varias etiquetas: cada bloque conserva su propio ^PQ y
+            # `copies` cuenta las pasadas del documento completo
+            if self.delay == MAX_DELAY:
+                passes = max(self.copies, 1)
+                labels = passes * document.total_labels
+                zpl_to_print = "\n".join([normalized_zpl] * passes)
+                with self.lock:
+                    self.copies = 0
+            else:
+                labels = document.total_labels
+                zpl_to_print = normalized_zpl
+                with self.lock:
+                    self.copies -= 1
+        elif self.delay == MAX_DELAY:  # Supongamos que MAX_DELAY es el valor máximo del slider
             # Modifica ZPL para imprimir todas las etiquetas restantes
+            labels = self.copies
             all_copies_zpl = re.sub(r"\^PQ[0-9]+", f"^PQ{self.copies}", normalized_zpl, flags=re.IGNORECASE)
             zpl_to_print = all_copies_zpl
             with self.lock:
                 self.copies = 0  # Asegurar la operación atómica sobre self.copies
         else:
             # Modifica ZPL para imprimir una copia a la vez
+            labels = 1
             single_copy_zpl = re.sub(r"\^PQ[0-9]+", "^PQ1", normalized_zpl, flags=re.IGNORECASE)
             zpl_to_print = single_copy_zpl
             with self.lock:
                 self.copies -= 1  # Asegurar la operación atómica sobre self.copies
 
         try:
-            self.z.output(zpl_to_print)
-            print("Impresión realizada")
-            print(zpl_to_print)
+            with tracer.span("print.send", "print", size=len(zpl_to_print), remaining=self.copies):
+                started_at = time.perf_counter()
+                self.z.output(zpl_to_print)
+            metrics.observe(PRINT_SEND, (time.perf_counter() - started_at) * 1000)
+            metrics.event(LABELS_PRINTED, labels)
+            # Solo la huella del ZPL: el contenido completo (que con gráficos pesa megabytes) se registra en DEBUG
+            logging.info(f"Impresión realizada: zpl {self.document_digest()}, {len(zpl_to_print)} bytes, quedan {self.copies}")
+            logging.debug("ZPL impreso:\n%s", zpl_to_print)
         except Exception as e:
             self.error_signal.emit(f"Error al imprimir{': ' if str(e) else ''}{e}.")
 
@@ -125,7 +185,7 @@ class PrintThread(QThread):
             with self.lock:
                 self.copies -= 1  # Asegurar la operación atómica sobre self.copies
             self.update_signal.emit(str(self.copies))
-            print(f"self.copies_single: {self.copies}.")
+            logging.debug(f"Etiqueta individual impresa, quedan {self.copies}")
             if self.copies > 0:
                 self.pause = True
                 self.request_pause_signal.emit()  # Emite una señal para que la UI maneje la pausa
@@ -133,13 +193,13 @@ class PrintThread(QThread):
                 with self.condition:
                     self.stopped = True  # Detiene el hilo si no quedan más copias
                     self.condition.notify_all()  # Asegúrate de despertar el hilo si está esperando.
-                print("Finalización emitida desde print_and_pause después de la última etiqueta.")
+                logging.debug("Finalización emitida desde print_and_pause después de la última etiqueta")
 
     def set_copies_and_zpl(self, copies, zpl):
         with self.lock:
             self.copies = copies
-            print("set_copies_and_zpl")
-            print(zpl)
+            logging.info(f"Nuevo trabajo: {copies} copias, zpl {zpl_digest(zpl)}, {len(zpl)} bytes")
+            logging.debug("ZPL del trabajo:\n%s", zpl)
             self.zpl = zpl
             self.pause = False  # Reinicia la pausa para asegurar que no esté pausada al cambiar de trabajo
 
@@ -188,7 +248,7 @@ class PrintThread(QThread):
         """
         Método para pausar o reanudar la impresión.
         """
-        print("toggle_pause called")
+        logging.debug(f"Impresión {'reanudada' if self.pause else 'pausada'}")
         self.pause = not self.pause
         if not self.pause:  # Si se está reanudando la impresión
             with self.condition:
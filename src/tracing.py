@@ -0,0 +1,202 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from app_logging import queued_file_logger
+from config import TRACING_ENABLED, log_dir
+
+# tracing.py
+__all__ = ["Tracer", "Span", "tracer"]
+
+TRACE_LOG_FILE = os.path.join(log_dir, "trace.log")
+TRACE_EXPORT_DIR = os.path.join(log_dir, "traces")
+TRACE_LOG_MAX_BYTES = 5 * 1024 * 1024
+TRACE_LOG_BACKUPS = 3
+MAX_SPANS = 20000  # Spans recientes que se conservan en memoria para exportar
+SLOW_SCAN_MS = 2000  # Las búsquedas más lentas se exportan solas como trace de Chrome/Perfetto
+
+
+class _NullSpan:
+    """Span que no hace nada: es lo que se obtiene con el tracing deshabilitado (un solo objeto compartido)."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **args):
+        pass
+
+    def end(self, **args):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """
+    Intervalo medido de una etapa. Se usa como context manager (`with tracer.span(...)`) o, para operaciones
+    asíncronas como las descargas de QNetworkAccessManager, se guarda y se cierra con `end()` al terminar.
+    """
+
+    __slots__ = ("tracer", "name", "category", "args", "scan", "thread_id", "thread_name", "start_ns", "end_ns")
+
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.scan = tracer.current_scan
+        thread = threading.current_thread()
+        self.thread_id = thread.ident
+        self.thread_name = thread.name
+        self.end_ns = None
+        self.start_ns = time.perf_counter_ns()
+
+    @property
+    def duration_ms(self):
+        return ((self.end_ns or time.perf_counter_ns()) - self.start_ns) / 1e6
+
+    def set(self, **args):
+        self.args.update(args)
+
+    def end(self, **args):
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.perf_counter_ns()
+        self.args.update(args)
+        self.tracer.record(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args["error"] = repr(exc)
+        self.end()
+        return False
+
+
+class Tracer:
+    """
+    Spans por etapa del flujo de búsqueda e impresión (petición a la API, decodificación JSON, parseo del ZPL,
+    vista previa, descarga de imágenes y envío a la impresora).
+
+    Deshabilitado (por defecto; se activa con TRACING_ENABLED=1), `span()` retorna un span compartido que no
+    mide nada, así que las etapas instrumentadas solo pagan una llamada. Habilitado, cada span terminado se
+    escribe como una línea JSON en un archivo rotativo (trace.log, junto al log de la aplicación) y queda en
+    memoria para exportarlo como trace de Chrome/Perfetto (chrome://tracing o ui.perfetto.dev). Los spans
+    llevan el número de la búsqueda (scan) en curso; las búsquedas que tardan más de `slow_scan_ms` se exportan
+    solas, al empezar la siguiente (así el trace incluye la vista previa y las imágenes).
+    """
+
+    def __init__(self, enabled=False, log_file=TRACE_LOG_FILE, export_dir=TRACE_EXPORT_DIR, slow_scan_ms=SLOW_SCAN_MS):
+        self.enabled = enabled
+        self.log_file = log_file
+        self.export_dir = export_dir
+        self.slow_scan_ms = slow_scan_ms
+        self.current_scan = None
+        self._scan_span = None
+        self._slow_scan = None  # Búsqueda lenta pendiente de exportar
+        self._scans = 0
+        self._spans = deque(maxlen=MAX_SPANS)
+        self._lock = threading.Lock()
+        self._logger = None
+
+    def span(self, name, category="app", **args):
+        """Abre un span (o el span nulo si el tracing está deshabilitado)."""
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, category, args)
+
+    def start_scan(self, search_text):
+        """Empieza una búsqueda: cierra la anterior y, si fue lenta, exporta su trace."""
+        if not self.enabled:
+            return
+        self.end_scan(replaced=True)
+        self.export_slow_scan()
+        with self._lock:
+            self._scans += 1
+            self.current_scan = self._scans
+        self._scan_span = Span(self, "scan", "scan", {"search": search_text})
+
+    def end_scan(self, **args):
+        """El resultado de la búsqueda ya se muestra; las etapas posteriores (vista previa, imágenes) siguen en el scan."""
+        span, self._scan_span = self._scan_span, None
+        if span is None:
+            return
+        span.end(**args)
+        if span.duration_ms >= self.slow_scan_ms:
+            self._slow_scan = span.scan
+
+    def export_slow_scan(self):
+        scan, self._slow_scan = self._slow_scan, None
+        if scan is not None:
+            path = self.export_chrome_trace(scan=scan)
+            logging.warning(f"Búsqueda lenta: trace exportado en {path}")
+            print(f"Búsqueda lenta: trace exportado en {path}")
+
+    def record(self, span):
+        with self._lock:
+            self._spans.append(span)
+        self._log(span)
+
+    def _log(self, span):
+        if self._logger is None:
+            # Los spans no van al log de la aplicación; se escriben desde el hilo de la cola
+            self._logger = queued_file_logger(f"tracing.{id(self)}", self.log_file, TRACE_LOG_MAX_BYTES, TRACE_LOG_BACKUPS)
+        self._logger.info(
+            json.dumps(
+                {"name": span.name, "cat": span.category, "scan": span.scan, "thread": span.thread_name, "ms": round(span.duration_ms, 3), **span.args},
+                ensure_ascii=False,
+                default=str,
+            )
+        )
+
+    def spans(self, scan=None):
+        with self._lock:
+            return [span for span in self._spans if scan is None or span.scan == scan]
+
+    def export_chrome_trace(self, path=None, scan=None):
+        """Escribe los spans en memoria (o solo los de una búsqueda) en formato Trace Event de Chrome; retorna la ruta."""
+        pid = os.getpid()
+        events = []
+        threads = {}
+        for span in self.spans(scan):
+            threads[span.thread_id] = span.thread_name
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": span.start_ns / 1000,
+                    "dur": (span.end_ns - span.start_ns) / 1000,
+                    "pid": pid,
+                    "tid": span.thread_id,
+                    "args": {"scan": span.scan, **span.args},
+                }
+            )
+        events.extend({"name": "thread_name", "ph": "M", "pid": pid, "tid": thread_id, "args": {"name": name}} for thread_id, name in threads.items())
+
+        if path is None:
+            path = os.path.join(self.export_dir, f"scan-{scan if scan is not None else 'all'}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as trace_file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, trace_file, ensure_ascii=False, default=str)
+        return path
+
+    def close(self):
+        """Exporta la última búsqueda si fue lenta (al cerrar la aplicación)."""
+        self.end_scan()
+        self.export_slow_scan()
+
+
+# Instancia compartida por todas las etapas instrumentadas
+tracer = Tracer(enabled=TRACING_ENABLED)
@@ -1,8 +1,9 @@
 from PyQt5.QtCore import QEasingCurve, QEvent, QObject, QPropertyAnimation, QRect, Qt, QTimer, pyqtProperty, pyqtSignal
-from PyQt5.QtGui import QBrush, QColor, QFont, QIntValidator, QKeySequence, QPainter, QTextDocument
-from PyQt5.QtWidgets import QApplication, QComboBox, QFrame, QHBoxLayout, QLabel, QLineEdit, QListView, QPushButton, QTableWidget, QTextEdit, QWidget
+from PyQt5.QtGui import QBrush, QColor, QFont, QIntValidator, QKeySequence, QPainter, QTextCharFormat, QTextCursor, QTextDocument
+from PyQt5.QtWidgets import QApplication, QComboBox, QFrame, QHBoxLayout, QLabel, QLineEdit, QListView, QPushButton, QTableWidget, QTextEdit, QToolTip, QWidget
 
 from font_config import FontManager
+from zpl import ERROR, IncrementalZplTokens
 
 # ui/custom_widgets.py
 __all__ = ["CustomTextEdit", "SpinBoxWidget", "CustomSearchBar", "CustomComboBox", "CustomTableWidget", "TransparentOverlayFrame"]
@@ -28,6 +29,13 @@ class CustomTextEdit(QTextEdit):
         # Conectar textChanged al método interno
         self.textChanged.connect(self.handle_text_changed)
 
+        # Tokens ZPL del contenido, actualizados por cada edición (solo se re-tokeniza el rango modificado)
+        self.zpl_tokens = IncrementalZplTokens()
+        self.document().contentsChange.connect(self.handle_contents_change)
+
+        # Diagnósticos del validador ZPL, subrayados en el texto y con su mensaje como tooltip
+        self.diagnostics = []
+
     def insertFromMimeData(self, source):
         if source.hasText():
             text = source.text().strip().strip('"')  # Eliminar espacios y comillas
@@ -43,6 +51,58 @@ class CustomTextEdit(QTextEdit):
         else:
             self.update_timer.start()  # Iniciar temporizador para cambios manuales
 
+    def handle_contents_change(self, position, chars_removed, chars_added):
+        """
+        Replica la edición en `zpl_tokens`. Si el rango informado no es coherente con la copia
+        (Qt a veces informa el documento completo), se re-sincroniza con el texto completo.
+        """
+        document = self.document()
+        text_length = document.characterCount() - 1  # Sin el separador final de párrafo
+        if position + chars_removed > len(self.zpl_tokens.text) or position + chars_added > text_length:
+            self.zpl_tokens.reset(self.toPlainText())
+            return
+
+        cursor = QTextCursor(document)
+        cursor.setPosition(position)
+        cursor.setPosition(position + chars_added, QTextCursor.KeepAnchor)
+        inserted_text = cursor.selectedText().replace("\u2029", "\n").replace("\u2028", "\n").replace("\xa0", " ")
+        self.zpl_tokens.apply_change(position, chars_removed, inserted_text)
+
+        if len(self.zpl_tokens.text) != text_length:
+            self.zpl_tokens.reset(self.toPlainText())
+
+    def set_diagnostics(self, diagnostics):
+        """
+        Subraya (ondulado) los fragmentos señalados por el validador: rojo para errores, naranja para advertencias.
+        """
+        self.diagnostics = diagnostics
+        text_length = self.document().characterCount() - 1
+        selections = []
+        for diagnostic in diagnostics:
+            if diagnostic.start >= text_length:
+                continue
+            selection = QTextEdit.ExtraSelection()
+            selection.format = QTextCharFormat()
+            selection.format.setUnderlineStyle(QTextCharFormat.WaveUnderline)
+            selection.format.setUnderlineColor(QColor("#BD2A2E" if diagnostic.severity == ERROR else "#E08A00"))
+            selection.cursor = QTextCursor(self.document())
+            selection.cursor.setPosition(diagnostic.start)
+            selection.cursor.setPosition(min(max(diagnostic.end, diagnostic.start + 1), text_length), QTextCursor.KeepAnchor)
+            selections.append(selection)
+        self.setExtraSelections(selections)
+
+    def event(self, event):
+        # Mostrar el mensaje del diagnóstico que está bajo el mouse
+        if event.type() == QEvent.ToolTip and self.diagnostics:
+            position = self.cursorForPosition(self.viewport().mapFromGlobal(event.globalPos())).position()
+            messages = [diagnostic.message for diagnostic in self.diagnostics if diagnostic.start <= position <= diagnostic.end]
+            if messages:
+                QToolTip.showText(event.globalPos(), "\n".join(messages), self)
+            else:
+                QToolTip.hideText()
+            return True
+        return super().event(event)
+
     def emit_text_changed_delayed(self):
         """
         Emitir la señal `textChangedDelayed` después del retraso.
@@ -0,0 +1,126 @@
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QFont
+from PyQt5.QtWidgets import QLabel, QVBoxLayout, QWidget
+
+from api.retry_policy import CLOSED, HALF_OPEN, OPEN
+from metrics import API_LATENCY, CATALOG_MIRROR, ITEM_CACHE, LABELS_PRINTED, PREVIEW_CACHE, PREVIEW_RENDER, PRINT_SEND, PRINTER_QUEUE, metrics
+from workers.executor import executor
+
+__all__ = ["DiagnosticsPanel", "diagnostics_report"]
+
+REFRESH_INTERVAL = 1000  # ms; solo mientras el panel está visible
+PANEL_WIDTH = 540
+
+BREAKER_STATES = {CLOSED: "en línea", OPEN: "caída (modo offline)", HALF_OPEN: "probando conexión"}
+
+
+def _latency_line(title, name):
+    summary = metrics.latency(name)
+    if summary is None:
+        return f"{title}: sin datos"
+    return f"{title}: p50 {summary.p50_ms:.0f} | p95 {summary.p95_ms:.0f} | p99 {summary.p99_ms:.0f} | máx {summary.max_ms:.0f} ms ({summary.count})"
+
+
+def _hit_rate_line(title, name):
+    rate, total = metrics.hit_rate(name)
+    return f"{title}: {'sin datos' if rate is None else f'{rate:.0%} aciertos'} ({total})"
+
+
+def diagnostics_report(breaker_state=None):
+    """Texto del panel: latencias, cachés, impresión y pools de hilos, leídos de los contadores en memoria."""
+    lines = ["API"]
+    if breaker_state is not None:
+        lines.append(f"  estado: {BREAKER_STATES.get(breaker_state, breaker_state)}")
+    lines.append("  " + _latency_line("latencia", API_LATENCY))
+
+    lines.append("Cachés")
+    lines.append("  " + _hit_rate_line("items", ITEM_CACHE))
+    lines.append("  " + _hit_rate_line("catálogo local", CATALOG_MIRROR))
+    lines.append("  " + _hit_rate_line("vistas previas", PREVIEW_CACHE))
+
+    lines.append("Vista previa")
+    lines.append("  " + _latency_line("render", PREVIEW_RENDER))
+
+    pending = metrics.gauge(PRINTER_QUEUE)
+    lines.append("Impresión")
+    lines.append(f"  {metrics.per_minute(LABELS_PRINTED):.0f} etiquetas/min ({metrics.total(LABELS_PRINTED)} en total)")
+    lines.append(f"  pendientes: {pending if pending is not None else 0}")
+    lines.append("  " + _latency_line("envío", PRINT_SEND))
+
+    lines.append("Pools de hilos")
+    for stats in executor.stats():
+        lines.append(
+            f"  {stats.name}: {stats.active}/{stats.max_threads} activos, {stats.queued} en cola,"
+            f" {stats.dropped + stats.rejected} descartadas, espera p95 {stats.wait_p95_ms:.0f} ms"
+        )
+    return "\n".join(lines)
+
+
+class DiagnosticsPanel(QWidget):
+    """
+    Panel de diagnóstico junto a la ventana principal (Ctrl+D): latencias de la API y de las vistas previas,
+    aciertos de las cachés, etiquetas por minuto, etiquetas pendientes y la cola de cada pool de hilos.
+
+    Solo lee contadores en memoria (metrics, executor y el circuit breaker), así que actualizarlo no hace
+    peticiones ni espera a otros hilos; el timer corre únicamente mientras el panel está visible. No toma el foco,
+    para que el lector de códigos siga escribiendo en la ventana principal.
+    """
+
+    def __init__(self, circuit_breaker=None, parent=None):
+        super().__init__(parent)
+        self.setWindowFlags(Qt.FramelessWindowHint | Qt.Window | Qt.WindowDoesNotAcceptFocus)
+        self.setAttribute(Qt.WA_ShowWithoutActivating)
+        self.circuit_breaker = circuit_breaker
+
+        self._is_visible = False
+
+        self.report_label = QLabel()
+        self.report_label.setTextFormat(Qt.PlainText)
+        self.report_label.setAlignment(Qt.AlignLeft | Qt.AlignTop)
+        font = QFont("Consolas")
+        font.setStyleHint(QFont.Monospace)
+        font.setPointSize(9)
+        self.report_label.setFont(font)
+        self.setStyleSheet("background-color: rgba(0, 0, 0, 204); color: white;")
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(10, 10, 10, 10)
+        layout.addWidget(self.report_label)
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(REFRESH_INTERVAL)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    @property
+    def is_visible(self):
+        """Retorna si el panel está visible."""
+        return self._is_visible
+
+    def toggle_visibility(self, parent_geometry=None):
+        if self._is_visible:
+            self.hide_panel()
+        else:
+            self.show_panel(parent_geometry)
+
+    def show_panel(self, parent_geometry=None):
+        if not self._is_visible:
+            if parent_geometry:
+                self.configure_geometry(parent_geometry)
+            self.refresh()
+            self.show()
+            self.refresh_timer.start()
+            self._is_visible = True
+
+    def hide_panel(self):
+        if self._is_visible:
+            self.refresh_timer.stop()
+            self.hide()
+            self._is_visible = False
+
+    def configure_geometry(self, parent_geometry):
+        """A la derecha de la ventana principal, con su misma altura."""
+        self.setGeometry(parent_geometry.x() + parent_geometry.width(), parent_geometry.y(), PANEL_WIDTH, parent_geometry.height())
+
+    def refresh(self):
+        breaker_state = self.circuit_breaker.state if self.circuit_breaker is not None else None
+        self.report_label.setText(diagnostics_report(breaker_state))
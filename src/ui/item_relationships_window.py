@@ -1,13 +1,17 @@
 import os
 
-from PyQt5.QtCore import QRectF, QSize, Qt, QTimer, QUrl
-from PyQt5.QtGui import QBrush, QColor, QMovie, QPainter, QPalette, QPen, QPixmap
+from PyQt5 import sip
+from PyQt5.QtCore import QEvent, QRectF, QSize, Qt, QTimer, QUrl
+from PyQt5.QtGui import QBrush, QColor, QCursor, QMouseEvent, QMovie, QPainter, QPalette, QPen, QPixmap
 from PyQt5.QtMultimedia import QMediaContent, QMediaPlayer
 from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkReply, QNetworkRequest
 from PyQt5.QtWidgets import QAbstractItemView, QApplication, QHBoxLayout, QHeaderView, QLabel, QTableWidgetItem, QVBoxLayout, QWidget
 
+from api.transfer_stats import THUMBNAIL, transfer_stats
 from config import BASE_ASSETS_PATH
 from custom_widgets.hover_zoom_window import HoverZoomWindow
+from custom_widgets.image_loader import FullImageLoader, thumbnail_url
+from tracing import tracer
 from utils import show_temporary_message
 
 from .custom_widgets import CustomTableWidget
@@ -72,6 +76,8 @@ class ItemRelationshipsWindow(QWidget):
 
         # Manager para descargas
         self.network_manager = QNetworkAccessManager(self)
+        # Las miniaturas se piden ya reducidas; la imagen completa se descarga solo para el zoom
+        self.full_image_loader = FullImageLoader(self.network_manager, self)
         self.original_images = {}
         self.hover_zoom_window = None
 
@@ -518,7 +524,7 @@ class ItemRelationshipsWindow(QWidget):
     # Manejo de descarga de imágenes (similar a ImageCarousel)
     # ------------------------------------------------------------------------
     def download_image(self, url, label, spinner, attempt=1, max_attempts=3):
-        request = QNetworkRequest(QUrl(url))
+        request = QNetworkRequest(QUrl(thumbnail_url(url)))
         reply = self.network_manager.get(request)
 
         # Metemos propiedades para recuperarlas en el manejador
@@ -527,6 +533,7 @@ class ItemRelationshipsWindow(QWidget):
         reply.setProperty("spinner", spinner)
         reply.setProperty("attempt", attempt)
         reply.setProperty("max_attempts", max_attempts)
+        reply.setProperty("span", tracer.span("image.download", "image", url=url, attempt=attempt))
 
         # Timer para timeout (4s)
         timer = QTimer(self)
@@ -553,6 +560,7 @@ class ItemRelationshipsWindow(QWidget):
         attempt = reply.property("attempt")
         max_attempts = reply.property("max_attempts")
         timer = reply.property("timer")
+        span = reply.property("span")
 
         if timer and timer.isActive():
             timer.stop()
@@ -562,10 +570,13 @@ class ItemRelationshipsWindow(QWidget):
         if reply.error() == QNetworkReply.NoError:
             # Éxito
             data = reply.readAll()
+            span.end(size=data.size())
+            transfer_stats.record(THUMBNAIL, data.size())
             pixmap = QPixmap()
             if pixmap.loadFromData(data):
-                # Guardamos el pixmap original
-                self.original_images[url] = pixmap
+                # Si el servidor no tiene miniaturas, lo descargado ya es la imagen original
+                if thumbnail_url(url) == url:
+                    self.original_images[url] = pixmap
 
                 # Quitar spinner
                 if spinner:
@@ -583,6 +594,7 @@ class ItemRelationshipsWindow(QWidget):
                 self.retry_or_fail(url, label, spinner, attempt, max_attempts, "Imagen inválida")
         else:
             # Error en descarga o abort
+            span.end(error=int(reply.error()))
             print(f"[ItemRelationships] Error al descargar: {url}")
             self.retry_or_fail(url, label, spinner, attempt, max_attempts, "Error descarga")
 
@@ -622,7 +634,17 @@ class ItemRelationshipsWindow(QWidget):
             # Actualiza la posición inicial de zoom
             self.update_zoom_position(event, label, img_url)
         else:
-            print("[ItemRelationships] No pixmap para zoom")
+            # Se descarga la imagen completa; el zoom se abre al llegar si el mouse sigue encima
+            self.full_image_loader.load(img_url, lambda pixmap, lbl=label, url=img_url: self.handle_full_image(lbl, url, pixmap))
+
+    def handle_full_image(self, label, img_url, pixmap):
+        if pixmap is None:
+            return
+        self.original_images[img_url] = pixmap
+        if sip.isdeleted(label) or not label.underMouse() or self.hover_zoom_window is not None:
+            return
+        event = QMouseEvent(QEvent.MouseMove, label.mapFromGlobal(QCursor.pos()), Qt.NoButton, Qt.NoButton, Qt.NoModifier)
+        self.show_zoom_window(event, label, img_url)
 
     def clear_grid_and_hide_zoom(self, label):
         self.restore_original_pixmap(label)
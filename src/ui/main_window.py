@@ -1,11 +1,13 @@
 import ctypes
 import json
+import logging
 import os
 import re
 import sys
+import threading
 from ctypes import wintypes
 
-from PyQt5.QtCore import QSettings, QSize, Qt, QThreadPool, QTimer, QUrl
+from PyQt5.QtCore import QSettings, QSize, Qt, QTimer, QUrl
 from PyQt5.QtGui import QColor, QIcon, QKeySequence, QMovie, QPixmap, QStandardItem, QStandardItemModel
 from PyQt5.QtMultimedia import QMediaContent, QMediaPlayer
 from PyQt5.QtWidgets import (
@@ -28,41 +30,58 @@ from PyQt5.QtWidgets import (
     QWidget,
 )
 
-from api.endpoints import APIEndpoints
+from api.async_client import AsyncApiClient
+from api.endpoints import DISPLAY_FIELDS, APIEndpoints
+from api.request_tracker import RequestTracker
+from api.retry_policy import CLOSED, OPEN, BreakerStateNotifier
+from api.transfer_stats import transfer_stats
 from config import BASE_ASSETS_PATH, LABEL_SIZES, MAX_DELAY
 from custom_widgets import ImageCarousel
 from font_config import FontManager
-from print_thread import PrintThread
+from metrics import PRINTER_QUEUE, metrics
+from print_thread import PrinterUnavailableError, PrintThread
+from tracing import tracer
 from utils import GlobalKeyEventFilter, OverlayMessage, list_printers_to_json, show_message_overlay
+from workers.catalog_sync_worker import CatalogSyncWorker
+from workers.executor import BACKGROUND_PREFETCH, CACHE_REVALIDATION, CATALOG_SYNC, INTERACTIVE_API, PRINTING_IO, ZPL_LINT, executor
+from workers.prefetch_worker import PrefetchWorker
 from workers.search_by_zpl_worker import ZplWorker
 from workers.search_worker import SearchWorker
+from workers.zpl_lint_worker import ZplLintWorker
+from zpl import parse_zpl_document
 
 from .custom_widgets import CustomComboBox, CustomSearchBar, CustomTextEdit, SpinBoxWidget, ToggleSwitch, TransparentOverlayFrame
+from .diagnostics_panel import DiagnosticsPanel
 from .item_relationships_window import ItemRelationshipsWindow
-from .zpl_preview import LabelViewer
-
-user32 = ctypes.windll.user32
-
-# Declaramos la firma de SetWindowPos
-# https://docs.microsoft.com/en-us/windows/win32/api/winuser/nf-winuser-setwindowpos
-SetWindowPos = user32.SetWindowPos
-SetWindowPos.argtypes = [
-    wintypes.HWND,  # hWnd
-    wintypes.HWND,  # hWndInsertAfter
-    wintypes.INT,  # X
-    wintypes.INT,  # Y
-    wintypes.INT,  # cx
-    wintypes.INT,  # cy
-    wintypes.UINT,  # uFlags
-]
-SetWindowPos.restype = wintypes.BOOL
-
-HWND_TOPMOST = -1
-HWND_NOTOPMOST = -2
-
-SWP_NOMOVE = 0x0002
-SWP_NOSIZE = 0x0001
-SWP_NOACTIVATE = 0x0010
+from .zpl_preview import LabelViewer, build_preview_zpl
+
+if sys.platform == "win32":
+    user32 = ctypes.windll.user32
+
+    # Declaramos la firma de SetWindowPos
+    # https://docs.microsoft.com/en-us/windows/win32/api/winuser/nf-winuser-setwindowpos
+    SetWindowPos = user32.SetWindowPos
+    SetWindowPos.argtypes = [
+        wintypes.HWND,  # hWnd
+        wintypes.HWND,  # hWndInsertAfter
+        wintypes.INT,  # X
+        wintypes.INT,  # Y
+        wintypes.INT,  # cx
+        wintypes.INT,  # cy
+        wintypes.UINT,  # uFlags
+    ]
+    SetWindowPos.restype = wintypes.BOOL
+
+    HWND_TOPMOST = -1
+    HWND_NOTOPMOST = -2
+
+    SWP_NOMOVE = 0x0002
+    SWP_NOSIZE = 0x0001
+    SWP_NOACTIVATE = 0x0010
+
+# Máximo de relaciones que se precargan por SKU
+MAX_PREFETCH_ITEMS = 20
+CATALOG_SYNC_INTERVAL = 15 * 60 * 1000  # ms entre sincronizaciones de la copia local del catálogo
 
 __all__ = ["MainWindow"]
 
@@ -77,10 +96,32 @@ class MainWindow(QWidget):
     def __init__(self):
         super().__init__()
         self.settings = QSettings("Tecneu", "TecneuTagger")
-        self.api = APIEndpoints()
 
-        # Para gestionar tareas en segundo plano
-        self.threadpool = QThreadPool()
+        # Tareas en segundo plano: pools con nombre (búsquedas, precarga, sincronización, vistas previas, impresión),
+        # cada uno con sus propios hilos, para que la precarga no retrase la búsqueda del operador
+        self.executor = executor
+        self.prefetch_cancel_event = threading.Event()
+
+        # Una conexión keep-alive por cada hilo que puede consultar la API al mismo tiempo
+        api_pools = (INTERACTIVE_API, BACKGROUND_PREFETCH, CATALOG_SYNC, CACHE_REVALIDATION)
+        self.api = APIEndpoints(pool_size=sum(self.executor.max_threads(name) for name in api_pools))
+        # Cliente asíncrono (event loop en un hilo propio) para las búsquedas en lote, como la precarga de relaciones
+        self.async_api = AsyncApiClient(self.api)
+        self.prefetch_futures = []
+        # Estado del circuit breaker de la API: con el backend caído se avisa que se trabaja en modo offline
+        self.api_state_notifier = BreakerStateNotifier(self.api.interceptor.circuit_breaker, self)
+        self.api_state_notifier.state_changed.connect(self.handle_api_state_changed)
+
+        # Sincronización periódica de la copia local del catálogo (un solo hilo, para no competir con las búsquedas)
+        self.catalog_sync_cancel_event = threading.Event()
+        self.catalog_sync_timer = QTimer(self)
+        self.catalog_sync_timer.setInterval(CATALOG_SYNC_INTERVAL)
+        self.catalog_sync_timer.timeout.connect(self.start_catalog_sync)
+        self.catalog_sync_timer.start()
+        QTimer.singleShot(0, self.start_catalog_sync)
+
+        # Generación de la búsqueda vigente (SearchWorker/ZplWorker): los resultados de búsquedas reemplazadas se descartan
+        self.item_request_tracker = RequestTracker()
 
         # Crea un overlay pero no lo muestres aún
         self.loading_overlay = None
@@ -133,6 +174,11 @@ class MainWindow(QWidget):
         self.shortcut_clear_focus.setContext(Qt.ApplicationShortcut)
         self.shortcut_clear_focus.activated.connect(self.clear_focus)
 
+        # Creamos el shortcut Ctrl+D
+        self.shortcut_diagnostics = QShortcut(QKeySequence("Ctrl+D"), self)
+        self.shortcut_diagnostics.setContext(Qt.ApplicationShortcut)
+        self.shortcut_diagnostics.activated.connect(self.toggle_diagnostics_panel)
+
     def apply_new_delay(self):
         # Aplica el nuevo delay al hilo de impresión
         new_delay = self.delay_slider.value()
@@ -524,6 +570,7 @@ class MainWindow(QWidget):
         self.zpl_textedit = CustomTextEdit()
         self.zpl_textedit.setPlaceholderText("Ingrese el ZPL aquí...")
         self.zpl_textedit.textChangedDelayed.connect(self.validate_and_update_copies_from_zpl)
+        self.zpl_textedit.textChangedDelayed.connect(self.start_zpl_lint)
         self.zpl_textedit.textPasted.connect(lambda: self.search_bar.setText(""))  # Conectar la señal al método adecuado
         zpl_layout.addWidget(self.zpl_textedit)
 
@@ -640,6 +687,9 @@ class MainWindow(QWidget):
 
         self.carousel = ImageCarousel(self)
         self.relationships_window = ItemRelationshipsWindow(self)
+        # Panel de diagnóstico (Ctrl+D): latencias, cachés, impresión y pools de hilos
+        self.diagnostics_panel = DiagnosticsPanel(self.api.interceptor.circuit_breaker, self)
+        metrics.set_gauge(PRINTER_QUEUE, self.pending_labels)
 
         self.setLayout(main_layout)
 
@@ -683,26 +733,38 @@ class MainWindow(QWidget):
         query_params = {
             "label_size": label_size,
             "qty": copies_str,
+            "fields": DISPLAY_FIELDS,  # Solo lo que muestra la ventana (sin variaciones, etc.)
         }
 
+        # El operador cambió de SKU: la precarga de las relaciones anteriores ya no es útil
+        self.cancel_prefetch()
+
         self.reset_all(False)
 
         # 1) Muestra overlay + spinner
         self.show_loading_overlay()
 
-        # 2) Crea el worker
-        worker = SearchWorker(self.api, search_text, query_params)
+        # 2) Crea el worker (la nueva búsqueda reemplaza y aborta la anterior, si sigue en curso)
+        token = self.item_request_tracker.start()
+        transfer_stats.start_scan()  # Registra los bytes descargados por la búsqueda anterior
+        tracer.start_scan(search_text)
+        worker = SearchWorker(self.api, search_text, query_params, token)
 
         # 3) Conecta la señal finished a la función que procesa el resultado
-        worker.signals.finished.connect(self.handle_search_result)
+        worker.signals.finished.connect(lambda item, token=token: self.handle_search_result(item, token))
 
-        # 4) Inicia el worker en el pool
-        self.threadpool.start(worker)
+        # 4) Inicia el worker en el pool de búsquedas
+        self.executor.submit(INTERACTIVE_API, worker)
 
-    def handle_search_result(self, item):
+    def handle_search_result(self, item, token=None):
         """Se llama cuando la tarea en segundo plano termina."""
+        # Resultado de una búsqueda ya reemplazada: no se toca la interfaz (evita mostrar la etiqueta de otro item)
+        if token is not None and not self.item_request_tracker.is_current(token):
+            return
+
         # Oculta el overlay
         self.hide_loading_overlay()
+        tracer.end_scan(found=bool(item and "label" in item))
 
         if item and "label" in item:
             # 1) Guardamos el item por si luego lo usamos
@@ -789,6 +851,13 @@ class MainWindow(QWidget):
         else:
             self.status_timer.stop()
 
+    def handle_api_state_changed(self, state):
+        """Muestra el modo offline mientras el circuit breaker de la API esté abierto."""
+        if state == OPEN:
+            self.set_status_message("Sin conexión con el servidor: modo offline (se usan datos en caché)", color="#BD2A2E")
+        elif state == CLOSED:
+            self.set_status_message("Conexión con el servidor restablecida.", duration=3, color="#28A745")
+
     def clear_status_message(self):
         """
         Limpia el mensaje de estado y detiene el temporizador si no es indefinido.
@@ -876,7 +945,8 @@ class MainWindow(QWidget):
 
         self.updating_copies = True
 
-        zpl_text = self.zpl_textedit.toPlainText().strip()
+        # Copia del editor mantenida por sus tokens incrementales (evita convertir todo el documento en cada cambio)
+        zpl_text = self.zpl_textedit.zpl_tokens.text.strip()
 
         if self.print_thread:
             self.print_thread.set_zpl(zpl_text)
@@ -932,6 +1002,11 @@ class MainWindow(QWidget):
             self.updating_copies = False
             return
 
+        zpl_document = self.zpl_document(zpl_text)
+        if zpl_document.is_multi_label:
+            self.show_multi_label_document(zpl_document)
+            return
+
         # En este punto, el ZPL es válido. Extraemos ^PQ y el barcode
         pq_index = zpl_text.find("^PQ")
         if pq_index != -1:
@@ -947,9 +1022,23 @@ class MainWindow(QWidget):
                 self.copies_entry.setValue(copies_str)
 
             # Ajusta el ZPL para previsualizar con 1 copia
-            new_zpl_text = zpl_text[:start_index] + "1,0,1,Y^XZ"
+            new_zpl_text = build_preview_zpl(zpl_text)
             self.labelViewer.preview_label(new_zpl_text)
 
+    def show_multi_label_document(self, zpl_document):
+        """
+        Muestra un documento con varias etiquetas (p. ej. exportado del ERP): vista previa paginada
+        y el contador de copias representa las pasadas del documento completo (cada bloque conserva su ^PQ).
+        """
+        self.copies_entry.setValue("1")
+        self.labelViewer.preview_document([build_preview_zpl(block.text) or block.text for block in zpl_document.blocks])
+        self.set_status_message(
+            f"Documento con {len(zpl_document.blocks)} etiquetas ({zpl_document.total_labels} por pasada)",
+            duration=5,
+            color="#28A745",
+        )
+        self.updating_copies = False
+
     def use_item_data(self, item):
         """
         Maneja la información del 'item' obtenido. Por ejemplo,
@@ -998,6 +1087,7 @@ class MainWindow(QWidget):
             self.relationships_window.set_relationships_data(relationships)
             self.relationships_window.show_relationships(parent_geometry=self.geometry())
             self.clear_focus()
+            self.start_relationship_prefetch(relationships)
         else:
             self.set_status_message(
                 "No se encontraron relaciones del producto",
@@ -1007,6 +1097,79 @@ class MainWindow(QWidget):
             )
             # self.relationships_window.hide_relationships()
 
+    def start_relationship_prefetch(self, relationships):
+        """
+        Precarga en segundo plano los datos y la vista previa de los items relacionados,
+        para que al buscarlos (doble clic -> pegar) se muestren de inmediato.
+        """
+        self.cancel_prefetch()
+
+        index = self.label_size_selector.currentIndex()
+        label_size = self.label_size_selector.itemData(index, Qt.UserRole)
+        # Mismos parámetros que usa execute_search al buscar un _id pegado
+        query_params = {
+            "label_size": label_size,
+            "qty": "0",
+            "fields": DISPLAY_FIELDS,
+        }
+
+        item_ids = []
+        for rel in relationships:
+            item_id = rel.get("tecneu_item", {}).get("_id", "")
+            if item_id and item_id not in item_ids:
+                item_ids.append(item_id)
+
+        # Los items se piden en lote en el loop del cliente asíncrono (sin ocupar hilos) y se emiten al llegar;
+        # las vistas previas se generan en el pool de precarga
+        batch = self.async_api.get_items(item_ids[:MAX_PREFETCH_ITEMS], query_params, on_item=self.prefetch_label_preview)
+        self.prefetch_futures.append(batch)
+
+    def prefetch_label_preview(self, inventory_id, item):
+        # Resultado de una tanda ya cancelada (la señal estaba en cola): se descarta
+        if self.sender() not in self.prefetch_futures:
+            return
+        if item and item.get("label"):
+            self.executor.submit(BACKGROUND_PREFETCH, PrefetchWorker(item["label"], self.prefetch_cancel_event))
+
+    def cancel_prefetch(self):
+        """Cancela la precarga en curso: cancela las peticiones pendientes, descarta las tareas en cola y avisa a las que ya se ejecutan."""
+        for future in self.prefetch_futures:
+            future.cancel()
+        self.prefetch_futures = []
+
+        self.prefetch_cancel_event.set()
+        self.executor.clear(BACKGROUND_PREFETCH)
+        self.prefetch_cancel_event = threading.Event()
+
+    def start_catalog_sync(self):
+        """Trae a la copia local los cambios del catálogo (todos los tamaños de etiqueta), si no hay una sincronización en curso."""
+        if self.executor.pending(CATALOG_SYNC) > 0:
+            return
+        label_sizes = [size["value"] for size in LABEL_SIZES]
+        worker = CatalogSyncWorker(self.api.catalog_sync, label_sizes, self.catalog_sync_cancel_event)
+        worker.signals.finished.connect(self.handle_catalog_sync_finished)
+        self.executor.submit(CATALOG_SYNC, worker)
+
+    def handle_catalog_sync_finished(self, applied):
+        if applied:
+            logging.info(f"Copia local del catálogo actualizada: {applied} cambios.")
+
+    def start_zpl_lint(self):
+        """Valida el ZPL del editor en segundo plano; los diagnósticos se subrayan en el editor al terminar."""
+        zpl_tokens = self.zpl_textedit.zpl_tokens
+        if not zpl_tokens.text.strip():
+            self.zpl_textedit.set_diagnostics([])
+            return
+        worker = ZplLintWorker(zpl_tokens.tokens(), zpl_tokens.version)
+        worker.signals.finished.connect(self.handle_zpl_lint_result)
+        self.executor.submit(ZPL_LINT, worker)
+
+    def handle_zpl_lint_result(self, generation, diagnostics):
+        # Descarta el resultado si el texto cambió mientras se validaba (ya hay otra validación en camino)
+        if generation != self.zpl_textedit.zpl_tokens.version:
+            return
+        self.zpl_textedit.set_diagnostics(diagnostics)
+
     def process_zpl_text_and_call_api_if_needed(self, zpl_text):
         """
         Si el ZPL está bien formado y necesitamos más datos del API,
@@ -1027,6 +1190,15 @@ class MainWindow(QWidget):
             self.updating_copies = False
             return
 
+        # Un documento con varias etiquetas no se reemplaza con la respuesta del API (traería una sola etiqueta)
+        zpl_document = self.zpl_document(zpl_text)
+        if zpl_document.is_multi_label:
+            self.cancel_prefetch()
+            self.cancel_item_request()
+            self.show_multi_label_document(zpl_document)
+            self.last_inventory_id = self.extract_barcode(zpl_document.blocks[0].text)
+            return
+
         inventory_id = self.extract_barcode(zpl_text)
         # En este punto, el ZPL es válido. Extraemos ^PQ y el barcode
         pq_index = zpl_text.find("^PQ")
@@ -1043,7 +1215,7 @@ class MainWindow(QWidget):
                 self.copies_entry.setValue(copies_str)
 
             # Ajusta el ZPL para previsualizar con 1 copia
-            new_zpl_text = zpl_text[:start_index] + "1,0,1,Y^XZ"
+            new_zpl_text = build_preview_zpl(zpl_text)
 
             if self.last_inventory_id and inventory_id == self.last_inventory_id:
                 self.labelViewer.preview_label(zpl_text)
@@ -1056,28 +1228,45 @@ class MainWindow(QWidget):
             query_params = {
                 "label_size": label_size,
                 "qty": copies_str if copies_str.isdigit() else "0",
+                "fields": DISPLAY_FIELDS,
             }
 
             # Falta ubicar cuando viene previsamente de un execute_search, y cuando entra unicamente a validate_and_update (Por modificar directamente el ZPL)
             self.reset_all(True, False)
 
+            # El ZPL editado corresponde a otro SKU: cancelamos la precarga anterior
+            self.cancel_prefetch()
+
             # Muestra overlay + spinner antes de iniciar el worker
             self.show_loading_overlay()
 
-            # Crea el worker
-            worker = ZplWorker(self.api, inventory_id, query_params, new_zpl_text)
+            # Crea el worker (reemplaza y aborta la búsqueda anterior, si sigue en curso)
+            token = self.item_request_tracker.start()
+            transfer_stats.start_scan()
+            tracer.start_scan(inventory_id)
+            worker = ZplWorker(self.api, inventory_id, query_params, new_zpl_text, token)
 
             # Conecta la señal finished a la función que procesa el resultado
-            worker.signals.finished.connect(self.handle_zpl_worker_result)
+            worker.signals.finished.connect(lambda item, final_zpl, token=token: self.handle_zpl_worker_result(item, final_zpl, token))
 
-            # Ejecuta en el pool de hilos
-            self.threadpool.start(worker)
+            # Ejecuta en el pool de búsquedas
+            self.executor.submit(INTERACTIVE_API, worker)
 
         self.last_inventory_id = inventory_id
 
-    def handle_zpl_worker_result(self, item, new_zpl_text):
+    def cancel_item_request(self):
+        """Aborta la búsqueda en curso sin iniciar otra (su resultado se descartará) y oculta el overlay."""
+        self.item_request_tracker.cancel()
+        self.hide_loading_overlay()
+
+    def handle_zpl_worker_result(self, item, new_zpl_text, token=None):
         """Se llama cuando el ZplWorker termina."""
+        # Resultado de una búsqueda ya reemplazada: no se toca la interfaz
+        if token is not None and not self.item_request_tracker.is_current(token):
+            return
+
         self.hide_loading_overlay()
+        tracer.end_scan(found=bool(item))
 
         if not item:
             # Manejar error al obtener el item
@@ -1107,6 +1296,11 @@ class MainWindow(QWidget):
         :param zpl_text: ZPL content as a string.
         :return: Extracted barcode or None if not found.
         """
+        # Si es el contenido del editor, se usan sus tokens (ya actualizados de forma incremental)
+        editor_tokens = self.zpl_textedit.zpl_tokens
+        if editor_tokens.text.strip() == zpl_text:
+            return editor_tokens.extract_barcode()
+
         # Patrón para encontrar el bloque ^BCN seguido de ^FD...^FS
         pattern = r"\^BCN.*?\^FD(.*?)\^FS"
 
@@ -1125,6 +1319,11 @@ class MainWindow(QWidget):
         self.updating_zpl = True
         copies_text = self.copies_entry.text()
 
+        # En documentos con varias etiquetas las copias son pasadas del documento; no se reescribe ningún ^PQ
+        if self.zpl_document(self.zpl_textedit.toPlainText().strip()).is_multi_label:
+            self.updating_zpl = False
+            return
+
         if copies_text == "":
             zpl_text = self.zpl_textedit.toPlainText().strip()
             pq_index = zpl_text.find("^PQ")
@@ -1252,6 +1451,13 @@ class MainWindow(QWidget):
         elif key == Qt.Key_Escape:
             self.clear_focus()
             return True
+        elif key in (Qt.Key_PageUp, Qt.Key_PageDown):
+            # Paginar la vista previa de documentos con varias etiquetas
+            if key == Qt.Key_PageUp:
+                self.labelViewer.previous_page()
+            else:
+                self.labelViewer.next_page()
+            return True
         elif key in (Qt.Key_Up, Qt.Key_Down):
             if event.key() == Qt.Key_Up:
                 self.increment()
@@ -1273,6 +1479,8 @@ class MainWindow(QWidget):
         self.space_press_count = 0
         if self.print_thread is None or not self.print_thread.isRunning():
             self.start_printing(True)  # Start printing with flag
+            if self.print_thread is None:
+                return  # No se pudo iniciar (validación o impresora no disponible); el motivo ya se mostró
             self.print_thread.print_and_pause()
             self.is_paused = True
             self.print_thread.pause = True
@@ -1293,12 +1501,20 @@ class MainWindow(QWidget):
 
     def is_valid_zpl(self, zpl_text):
         """
-        Verifica si el texto proporcionado es un ZPL válido.
+        Verifica si el texto proporcionado es un ZPL válido: uno o varios bloques ^XA...^XZ.
         Esta función es básica y podría necesitar una lógica más compleja para validar ZPL de manera exhaustiva.
         """
-        if re.search(r"^\^XA.*\^XZ$", zpl_text, re.DOTALL):
-            return True
-        return False
+        return self.zpl_document(zpl_text.strip()).is_valid
+
+    def zpl_document(self, zpl_text):
+        """
+        Documento ZPL del texto. Si es el contenido del editor se usa su tokenización incremental,
+        evitando volver a parsear todo el texto en cada validación.
+        """
+        editor_tokens = self.zpl_textedit.zpl_tokens
+        if editor_tokens.text.strip() == zpl_text:
+            return editor_tokens.document()
+        return parse_zpl_document(zpl_text)
 
     def control_printing(self):
         # print("self.print_thread.isRunning():")
@@ -1380,7 +1596,11 @@ class MainWindow(QWidget):
 
         # Crea el hilo de impresión si no existe
         if self.print_thread is None:
-            self.print_thread = PrintThread(copies, delay, zpl_text, self.selected_printer_name)
+            try:
+                self.print_thread = PrintThread(copies, delay, zpl_text, self.selected_printer_name)
+            except PrinterUnavailableError as e:
+                self.show_error_message(str(e))
+                return
             self.print_thread.update_signal.connect(self.update_status)
             self.print_thread.finished_signal.connect(self.printing_finished)
             self.print_thread.error_signal.connect(self.show_error_message)
@@ -1399,7 +1619,7 @@ class MainWindow(QWidget):
 
         # Inicia el hilo de impresión si no está en ejecución
         if not self.print_thread.isRunning():
-            self.print_thread.start()
+            self.print_thread.start(self.executor.thread_priority(PRINTING_IO))
 
     def update_status(self, message):
         if self.print_thread and self.print_thread.isRunning():
@@ -1441,6 +1661,16 @@ class MainWindow(QWidget):
 
         self.clear_focus()
 
+    def toggle_diagnostics_panel(self):
+        """Muestra u oculta el panel de diagnóstico junto a la ventana principal."""
+        self.diagnostics_panel.toggle_visibility(parent_geometry=self.geometry())
+
+    def pending_labels(self):
+        """Etiquetas que faltan por enviar a la impresora en el trabajo en curso (para el panel de diagnóstico)."""
+        if self.print_thread is None or not self.print_thread.isRunning():
+            return 0
+        return max(self.print_thread.copies, 0)
+
     def toggle_always_on_top(self, checked, play_sound=True):
         """
         Aplica el modo 'Always on Top' en Windows con llamadas nativas.
@@ -1481,6 +1711,17 @@ class MainWindow(QWidget):
             self.show()
 
     def closeEvent(self, event):
+        self.cancel_prefetch()
+        self.item_request_tracker.cancel()
+        self.catalog_sync_timer.stop()
+        self.catalog_sync_cancel_event.set()
+        self.executor.wait_for_done(CATALOG_SYNC, 2000)
+        self.async_api.close()
+        self.api.close()
+        tracer.close()
+        self.diagnostics_panel.hide_panel()
+        metrics.set_gauge(PRINTER_QUEUE, None)
+
         # Guardar el nombre de la impresora seleccionada
         self.settings.setValue("printer_name", self.printer_selector.currentText())
 
@@ -1494,6 +1735,10 @@ class MainWindow(QWidget):
         if self.relationships_window.is_visible:
             self.relationships_window._configure_geometry(parent_geometry=self.geometry())
 
+    def update_diagnostics_position(self):
+        if self.diagnostics_panel.is_visible:
+            self.diagnostics_panel.configure_geometry(self.geometry())
+
     def update_carousel_position(self):
         """Update the carousel position to align with the main window."""
         if self.carousel.is_visible:
@@ -1503,6 +1748,7 @@ class MainWindow(QWidget):
         """Update the carousel's position when the main window moves."""
         self.update_carousel_position()
         self.update_relationships_position()
+        self.update_diagnostics_position()
         if self.loading_overlay is not None:
             self.loading_overlay.setGeometry(self.rect())
         super().moveEvent(event)
@@ -1511,6 +1757,7 @@ class MainWindow(QWidget):
         """Update the carousel's position when the main window resizes."""
         self.update_carousel_position()
         self.update_relationships_position()
+        self.update_diagnostics_position()
         if self.loading_overlay is not None:
             self.loading_overlay.setGeometry(self.rect())
         super().resizeEvent(event)  # Mantiene el comportamiento original
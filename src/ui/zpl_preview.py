@@ -1,14 +1,28 @@
 import os
 import re
 import threading
+import time
+from collections import OrderedDict
+from functools import partial
 
 import requests
 from PyQt5.QtCore import QEvent, QSize, Qt, QTimer, pyqtSignal
-from PyQt5.QtGui import QMovie, QPixmap
-from PyQt5.QtWidgets import QApplication, QLabel, QStackedLayout, QVBoxLayout, QWidget
+from PyQt5.QtGui import QImage, QMovie, QPixmap
+from PyQt5.QtWidgets import QApplication, QHBoxLayout, QLabel, QPushButton, QSizePolicy, QStackedLayout, QVBoxLayout, QWidget
 
-from config import BASE_ASSETS_PATH
+from config import BASE_ASSETS_PATH, LABELARY_URL
+from metrics import PREVIEW_CACHE, PREVIEW_RENDER, metrics
+from tracing import tracer
 from utils import normalize_zpl
+from workers.executor import RENDERING, executor
+
+# Número máximo de vistas previas (PNG) que se mantienen en memoria
+PREVIEW_CACHE_SIZE = 64
+# Imágenes ya decodificadas (tamaño original) y variantes escaladas que guarda cada LabelViewer
+DECODED_IMAGE_CACHE_SIZE = 4
+SCALED_IMAGE_CACHE_SIZE = 16
+# Prioridad en el pool de vistas previas: decodificar/escalar (rápido) se adelanta a las llamadas a Labelary
+DECODE_PRIORITY = 1
 
 
 class LabelViewer(QWidget):
@@ -24,6 +38,19 @@ class LabelViewer(QWidget):
         self.last_load_successful = False
         # Último pixmap generado con éxito
         self.last_pixmap = None
+        # Páginas (un ZPL por bloque ^XA...^XZ) cuando el documento tiene varias etiquetas
+        self.pages = []
+        self.current_page = 0
+        # QImage decodificadas por ZPL y sus variantes escaladas por tamaño del widget,
+        # para que redimensionar la ventana no vuelva a decodificar el PNG
+        self.decoded_images = OrderedDict()  # zpl_key -> QImage original
+        self.scaled_images = OrderedDict()  # (zpl_key, width, height) -> QImage escalada
+
+        # Al redimensionar esperamos a que el usuario termine antes de reescalar
+        self.resize_timer = QTimer(self)
+        self.resize_timer.setInterval(150)
+        self.resize_timer.setSingleShot(True)
+        self.resize_timer.timeout.connect(self.rescale_current_image)
 
     def init_ui(self):
         self.setWindowTitle("Label Preview")
@@ -33,6 +60,8 @@ class LabelViewer(QWidget):
         self.layout = QStackedLayout()
         self.label = QLabel(self)
         self.label.setAlignment(Qt.AlignCenter)  # Asegurar que la imagen esté centrada
+        # La imagen se escala al área disponible, por lo que no debe forzar el tamaño del widget
+        self.label.setSizePolicy(QSizePolicy.Ignored, QSizePolicy.Ignored)
 
         # self.button = QPushButton('Generate Label Preview', self)
 
@@ -51,9 +80,29 @@ class LabelViewer(QWidget):
         # button_container.addWidget(self.button)
         # button_container.addStretch()
 
+        # Barra de paginación para documentos con varias etiquetas (oculta para una sola etiqueta)
+        self.page_bar = QWidget(self)
+        page_layout = QHBoxLayout(self.page_bar)
+        page_layout.setContentsMargins(0, 0, 0, 0)
+        self.prev_page_button = QPushButton("◀")
+        self.prev_page_button.setFixedSize(30, 24)
+        self.prev_page_button.clicked.connect(self.previous_page)
+        self.page_label = QLabel("")
+        self.page_label.setAlignment(Qt.AlignCenter)
+        self.next_page_button = QPushButton("▶")
+        self.next_page_button.setFixedSize(30, 24)
+        self.next_page_button.clicked.connect(self.next_page)
+        page_layout.addStretch()
+        page_layout.addWidget(self.prev_page_button)
+        page_layout.addWidget(self.page_label)
+        page_layout.addWidget(self.next_page_button)
+        page_layout.addStretch()
+        self.page_bar.setVisible(False)
+
         # La disposición principal de la ventana ahora incluye el stack y el contenedor del botón
         main_layout = QVBoxLayout()
         main_layout.addLayout(self.layout)
+        main_layout.addWidget(self.page_bar)
         # main_layout.addLayout(button_container)
         self.setLayout(main_layout)
 
@@ -72,18 +121,82 @@ class LabelViewer(QWidget):
         Si el ZPL (sin ^PQ) es igual al último cargado y la última carga fue exitosa,
         se reutiliza la imagen anterior para evitar llamar de nuevo a Labelary.
         """
+        self._set_pages([])
+        self._preview_zpl(zpl_label)
+
+    def preview_document(self, page_zpls):
+        """
+        Previsualiza un documento con varias etiquetas, una página por bloque.
+        Solo se genera la imagen de la página visible; las demás se cargan al paginar.
+        """
+        if not page_zpls:
+            self.clear_preview()
+            return
+        self._set_pages(page_zpls)
+        self._preview_zpl(self.pages[0])
+
+    def next_page(self):
+        self.show_page(self.current_page + 1)
+
+    def previous_page(self):
+        self.show_page(self.current_page - 1)
+
+    def show_page(self, page_index):
+        if not self.pages or not 0 <= page_index < len(self.pages) or page_index == self.current_page:
+            return
+        self.current_page = page_index
+        self._update_page_bar()
+        self._preview_zpl(self.pages[page_index])
+
+    def _set_pages(self, page_zpls):
+        self.pages = list(page_zpls)
+        self.current_page = 0
+        self._update_page_bar()
+
+    def _update_page_bar(self):
+        is_paged = len(self.pages) > 1
+        self.page_bar.setVisible(is_paged)
+        if is_paged:
+            self.page_label.setText(f"{self.current_page + 1} / {len(self.pages)}")
+            self.prev_page_button.setEnabled(self.current_page > 0)
+            self.next_page_button.setEnabled(self.current_page < len(self.pages) - 1)
+
+    def _preview_zpl(self, zpl_label):
         current_zpl = self._strip_pq(zpl_label)  # Obtener ZPL sin información de cantidad
+        target_size = self._target_image_size()
         # 1) Comprobamos si es el mismo ZPL que ya se cargó exitosamente
         if current_zpl == self.last_zpl and self.last_load_successful and self.last_pixmap is not None:
             # Asegurarnos de ocultar el spinner
             self.hide_spinner()
             # Reutilizar la última imagen
             self.label.setPixmap(self.last_pixmap)
-            self.label.adjustSize()
             return
 
-        # 2) Si es un ZPL nuevo o la última carga falló, procedemos a llamar a la API
+        # 2) Si la vista previa ya fue generada (p. ej. por una precarga), la mostramos sin llamar a Labelary
         self.last_zpl = current_zpl
+        scaled_image = self._get_cached_image(self.scaled_images, (current_zpl, *target_size))
+        if scaled_image is not None:
+            self.timer.stop()
+            self.hide_spinner()
+            self.last_load_successful = True
+            self.imageLoaded.emit(True, "Imagen cargada correctamente.")
+            self._show_image(scaled_image)
+            return
+
+        cached_image = preview_cache.get(current_zpl)
+        if cached_image is not None:
+            # Mientras se decodifica no debe quedar a la vista (ni reutilizarse) la etiqueta anterior;
+            # la carga se marca exitosa cuando llega la imagen decodificada
+            self.last_load_successful = False
+            self.last_pixmap = None
+            self.label.clear()
+            self.imageLoaded.emit(True, "Imagen cargada correctamente.")
+            # La decodificación se hace fuera del hilo de la UI
+            decoded_image = self._get_cached_image(self.decoded_images, current_zpl)
+            executor.submit(RENDERING, partial(self.decode_image, current_zpl, cached_image, decoded_image, target_size), DECODE_PRIORITY)
+            return
+
+        # 3) Si es un ZPL nuevo o la última carga falló, procedemos a llamar a la API
         self._start_loading(zpl_label)
 
     def _start_loading(self, zpl_label):
@@ -104,65 +217,111 @@ class LabelViewer(QWidget):
         # Limpiar la etiqueta anterior
         self.label.clear()
 
-        # Iniciar un thread que cargue la imagen
-        threading.Thread(target=self.load_image, args=(zpl_label,), daemon=True).start()
+        # Cargar la imagen en el pool de vistas previas (el tamaño destino se toma aquí, en el hilo de la UI)
+        executor.submit(RENDERING, partial(self.load_image, zpl_label, self._target_image_size()))
 
     def _strip_pq(self, zpl_code):
         """
         Elimina la parte de ^PQ...,...,...,... para normalizar el ZPL
         y así comparar si el contenido relevante ha cambiado.
         """
-        # Captura ^PQ con uno o más dígitos, seguidos de coma, etc.
-        # Ejemplo: ^PQ10,0,0,N
-        return re.sub(r"\^PQ\d+,\d+,\d+,\w", "", zpl_code)
+        return strip_pq(zpl_code)
 
-    def load_image(self, zpl_label):
+    def load_image(self, zpl_label, target_size=(0, 0)):
         """
         Llama a la API de Labelary (o similar) para obtener la imagen PNG de un ZPL.
         Luego, postea un evento custom con los datos obtenidos para actualizar la UI.
         """
-        zpl_label = normalize_zpl(zpl_label)
-        dimensions = self.estimate_zpl_dimensions(zpl_label)
-        label_size = f"{round(dimensions[0], 2)}x{round(dimensions[1], 2)}"
-        image_data = get_image_from_zpl(zpl_label, label_size)
+        image_data = render_label_png(zpl_label)
+        # El éxito o la falla se registra en customEvent, al llegar la imagen (o su ausencia) al hilo de la UI
         if image_data:
-            # Marcamos que sí fue exitosa
-            self.last_load_successful = True
             self.imageLoaded.emit(True, "Imagen cargada correctamente.")
         else:
-            # Si la carga falla, preparamos para un nuevo intento
-            self.last_load_successful = False
             self.imageLoaded.emit(False, "Error al cargar la imagen.")
+            QApplication.instance().postEvent(self, ImageLoadedEvent(None, strip_pq(zpl_label)))
+            return
 
-        # PostEvent para que la carga del pixmap se haga en el hilo principal
-        QApplication.instance().postEvent(self, ImageLoadedEvent(image_data))
+        self.decode_image(strip_pq(zpl_label), image_data, None, target_size)
+
+    def decode_image(self, zpl_key, image_data, decoded_image, target_size):
+        """
+        Decodifica el PNG a QImage y lo reduce al tamaño de visualización (se ejecuta fuera del hilo de la UI).
+        Si ya se tiene la imagen decodificada solo se reescala. El resultado se postea al hilo principal.
+        """
+        with tracer.span("preview.decode", "preview", size=len(image_data), cached=decoded_image is not None):
+            if decoded_image is None:
+                decoded_image = QImage.fromData(image_data, "PNG")
+            scaled_image = scale_label_image(decoded_image, target_size) if not decoded_image.isNull() else None
+        QApplication.instance().postEvent(self, ImageLoadedEvent(image_data, zpl_key, decoded_image, scaled_image, target_size))
 
     def customEvent(self, event):
         """
-        Recibe la imagen en el hilo principal y actualiza la interfaz.
+        Recibe la imagen ya decodificada en el hilo principal y actualiza la interfaz.
         """
         if isinstance(event, ImageLoadedEvent):
-            print("ENTRA POR ACA ============")
-            print(event)
-            if event.image_data:
-                # pixmap = QPixmap()
-                # self.last_pixmap = pixmap  # Guardar el QPixmap para reuso
-                # self.label.setPixmap(pixmap)
-                # self.label.adjustSize()
-                pixmap = QPixmap()
-                # Cargar los bytes de la imagen en el QPixmap
-                if pixmap.loadFromData(event.image_data):
-                    self.last_pixmap = pixmap  # Guardar el QPixmap para reuso
-                    self.label.setPixmap(pixmap)
-                    self.label.adjustSize()
+            # Descarta imágenes de un ZPL anterior que terminaron de cargar tarde
+            if event.zpl_key is not None and event.zpl_key != self.last_zpl:
+                return
+            if event.image_data is not None:
+                if event.scaled_image is not None:
+                    self._put_cached_image(self.decoded_images, event.zpl_key, event.decoded_image, DECODED_IMAGE_CACHE_SIZE)
+                    self._put_cached_image(self.scaled_images, (event.zpl_key, *event.target_size), event.scaled_image, SCALED_IMAGE_CACHE_SIZE)
+                    self.last_load_successful = True
+                    self.hide_spinner()
+                    self._show_image(event.scaled_image)
                 else:
                     # Si por alguna razón no se pudo decodificar la imagen
+                    self.last_load_successful = False
                     self.last_pixmap = None
                     self.label.setText("Error al decodificar la imagen.")
             else:
+                self.last_load_successful = False
                 self.last_pixmap = None
                 self.label.setText("Error al cargar la imagen.")
 
+    def _show_image(self, image):
+        # QPixmap.fromImage solo convierte (no decodifica), por lo que es barato en el hilo de la UI
+        pixmap = QPixmap.fromImage(image)
+        self.last_pixmap = pixmap  # Guardar el QPixmap para reuso
+        self.label.setPixmap(pixmap)
+
+    def _target_image_size(self):
+        """Tamaño disponible para la imagen (área del stack), o (0, 0) si aún no se conoce."""
+        size = self.label.size()
+        if size.width() <= 0 or size.height() <= 0:
+            return (0, 0)
+        return (size.width(), size.height())
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self.last_load_successful and self.last_zpl:
+            self.resize_timer.start()
+
+    def rescale_current_image(self):
+        """Ajusta la imagen visible al nuevo tamaño, reutilizando variantes escaladas o la imagen ya decodificada."""
+        target_size = self._target_image_size()
+        scaled_image = self._get_cached_image(self.scaled_images, (self.last_zpl, *target_size))
+        if scaled_image is not None:
+            self._show_image(scaled_image)
+            return
+        decoded_image = self._get_cached_image(self.decoded_images, self.last_zpl)
+        if decoded_image is not None:
+            executor.submit(RENDERING, partial(self.decode_image, self.last_zpl, b"", decoded_image, target_size), DECODE_PRIORITY)
+
+    @staticmethod
+    def _get_cached_image(cache, key):
+        image = cache.get(key)
+        if image is not None:
+            cache.move_to_end(key)
+        return image
+
+    @staticmethod
+    def _put_cached_image(cache, key, image, max_entries):
+        cache[key] = image
+        cache.move_to_end(key)
+        while len(cache) > max_entries:
+            cache.popitem(last=False)
+
     def clear_preview(self):
         """
         Limpia la vista previa, reseteando la etiqueta y mostrando un texto básico.
@@ -170,6 +329,7 @@ class LabelViewer(QWidget):
         self.label.clear()
         self.label.setText("No preview available.")
         self.layout.setCurrentWidget(self.label)
+        self._set_pages([])
         # self.last_zpl = ""
         # self.last_load_successful = False
         # self.last_pixmap = None
@@ -184,42 +344,7 @@ class LabelViewer(QWidget):
         """
         Heurística para estimar dimensiones en pulgadas en base a algunos comandos ZPL.
         """
-        max_x = max_y = 0
-        min_x = min_y = float("inf")
-
-        # Coordenadas de inicio
-        for match in re.finditer(r"\^FO(\d+),(\d+)", zpl_code):
-            x, y = int(match.group(1)), int(match.group(2))
-            min_x = min(min_x, x)
-            max_x = max(max_x, x)
-            min_y = min(min_y, y)
-            max_y = max(max_y, y)
-
-        # Considerar altura de los códigos de barras
-        for match in re.finditer(r"\^BC\w+,\s*(\d+)", zpl_code):
-            barcode_height = int(match.group(1))
-            max_y += barcode_height  # Asumiendo que el código de barras comienza en el último Y encontrado
-
-        # Considerar ancho de campos de bloque y códigos de barras
-        for match in re.finditer(r"\^FB(\d+)", zpl_code):
-            block_width = int(match.group(1))
-            max_x = max(max_x, block_width)  # Asumir que el campo de bloque comienza en el último X encontrado
-
-        # Considerar el ancho definido en los campos de bloque `^FB`
-        for match in re.finditer(r"\^FB(\d+),", zpl_code):
-            block_width = int(match.group(1))
-            # El ancho real utilizado será el máximo entre el definido por `^FO` y `^FB`
-            max_x = max(max_x, min_x + block_width)
-
-        for match in re.finditer(r"\^BY(\d+)", zpl_code):
-            barcode_module_width = int(match.group(1))
-            max_x += barcode_module_width * 10  # Aproximación del ancho del código de barras
-
-        # Convertir puntos a pulgadas usando 203 DPI
-        width_in_inches = ((max_x - min_x) / 203) + 0.02
-        height_in_inches = (max_y - min_y) / 203
-        # print("Estimated Dimensions (Width x Height in inches):", width_in_inches, height_in_inches)
-        return (width_in_inches, height_in_inches)
+        return estimate_zpl_dimensions(zpl_code)
 
 
 def get_image_from_zpl(zpl_label, label_size):
@@ -228,7 +353,7 @@ def get_image_from_zpl(zpl_label, label_size):
     Retorna los bytes de la imagen si es exitoso, o None si falla.
     """
     print_density = "8dpmm"  # 203 dpi
-    url = f"http://api.labelary.com/v1/printers/{print_density}/labels/{label_size}/0"
+    url = f"{LABELARY_URL}/v1/printers/{print_density}/labels/{label_size}/0"
     headers = {
         "Accept": "image/png",
         "Content-Type": "application/x-www-form-urlencoded",
@@ -242,6 +367,133 @@ def get_image_from_zpl(zpl_label, label_size):
         return None
 
 
+def estimate_zpl_dimensions(zpl_code):
+    """
+    Heurística para estimar dimensiones en pulgadas en base a algunos comandos ZPL.
+    """
+    max_x = max_y = 0
+    min_x = min_y = float("inf")
+
+    # Coordenadas de inicio
+    for match in re.finditer(r"\^FO(\d+),(\d+)", zpl_code):
+        x, y = int(match.group(1)), int(match.group(2))
+        min_x = min(min_x, x)
+        max_x = max(max_x, x)
+        min_y = min(min_y, y)
+        max_y = max(max_y, y)
+
+    # Considerar altura de los códigos de barras
+    for match in re.finditer(r"\^BC\w+,\s*(\d+)", zpl_code):
+        barcode_height = int(match.group(1))
+        max_y += barcode_height  # Asumiendo que el código de barras comienza en el último Y encontrado
+
+    # Considerar ancho de campos de bloque y códigos de barras
+    for match in re.finditer(r"\^FB(\d+)", zpl_code):
+        block_width = int(match.group(1))
+        max_x = max(max_x, block_width)  # Asumir que el campo de bloque comienza en el último X encontrado
+
+    # Considerar el ancho definido en los campos de bloque `^FB`
+    for match in re.finditer(r"\^FB(\d+),", zpl_code):
+        block_width = int(match.group(1))
+        # El ancho real utilizado será el máximo entre el definido por `^FO` y `^FB`
+        max_x = max(max_x, min_x + block_width)
+
+    for match in re.finditer(r"\^BY(\d+)", zpl_code):
+        barcode_module_width = int(match.group(1))
+        max_x += barcode_module_width * 10  # Aproximación del ancho del código de barras
+
+    # Convertir puntos a pulgadas usando 203 DPI
+    width_in_inches = ((max_x - min_x) / 203) + 0.02
+    height_in_inches = (max_y - min_y) / 203
+    # print("Estimated Dimensions (Width x Height in inches):", width_in_inches, height_in_inches)
+    return (width_in_inches, height_in_inches)
+
+
+def scale_label_image(image, target_size):
+    """
+    Reduce la imagen para que quepa en `target_size` (ancho, alto) manteniendo la relación de aspecto.
+    Nunca la agranda. Puede llamarse fuera del hilo de la UI (trabaja con QImage, no con QPixmap).
+    """
+    width, height = target_size
+    if width <= 0 or height <= 0 or (image.width() <= width and image.height() <= height):
+        return image
+    return image.scaled(width, height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+
+def strip_pq(zpl_code):
+    """
+    Elimina la parte de ^PQ...,...,...,... para normalizar el ZPL
+    y así comparar si el contenido relevante ha cambiado.
+    """
+    # Captura ^PQ con uno o más dígitos, seguidos de coma, etc.
+    # Ejemplo: ^PQ10,0,0,N
+    return re.sub(r"\^PQ\d+,\d+,\d+,\w", "", zpl_code)
+
+
+def build_preview_zpl(zpl_text):
+    """
+    Ajusta el ZPL para previsualizar con 1 copia (reemplaza todo lo que sigue a ^PQ).
+    Retorna None si el ZPL no contiene ^PQ.
+    """
+    pq_index = zpl_text.find("^PQ")
+    if pq_index == -1:
+        return None
+    return zpl_text[: pq_index + 3] + "1,0,1,Y^XZ"
+
+
+def render_label_png(zpl_label):
+    """
+    Genera (o recupera de la caché) la imagen PNG de un ZPL. Es bloqueante: debe llamarse fuera del hilo de la UI.
+    Retorna los bytes de la imagen o None si falla.
+    """
+    cache_key = strip_pq(zpl_label)
+    image_data = preview_cache.get(cache_key)
+    metrics.cache_access(PREVIEW_CACHE, image_data is not None)
+    if image_data is not None:
+        return image_data
+
+    normalized_zpl = normalize_zpl(zpl_label)
+    dimensions = estimate_zpl_dimensions(normalized_zpl)
+    label_size = f"{round(dimensions[0], 2)}x{round(dimensions[1], 2)}"
+    with tracer.span("preview.render", "preview", label_size=label_size) as span:
+        started_at = time.perf_counter()
+        image_data = get_image_from_zpl(normalized_zpl, label_size)
+        metrics.observe(PREVIEW_RENDER, (time.perf_counter() - started_at) * 1000)
+        span.set(size=len(image_data or b""))
+    if image_data:
+        preview_cache.put(cache_key, image_data)
+    return image_data
+
+
+class PreviewCache:
+    """
+    Caché LRU (thread-safe) de imágenes PNG de vistas previas, indexada por el ZPL sin ^PQ.
+    """
+
+    def __init__(self, max_entries=PREVIEW_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            image_data = self._entries.get(key)
+            if image_data is not None:
+                self._entries.move_to_end(key)
+            return image_data
+
+    def put(self, key, image_data):
+        with self._lock:
+            self._entries[key] = image_data
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+# Caché compartida entre el LabelViewer y la precarga en segundo plano
+preview_cache = PreviewCache()
+
+
 class ImageLoadedEvent(QEvent):
     """
     Evento personalizado para transportar la imagen desde el hilo de carga
@@ -250,6 +502,10 @@ class ImageLoadedEvent(QEvent):
 
     EVENT_TYPE = QEvent.Type(QEvent.registerEventType())
 
-    def __init__(self, image_data):
+    def __init__(self, image_data, zpl_key=None, decoded_image=None, scaled_image=None, target_size=(0, 0)):
         super().__init__(ImageLoadedEvent.EVENT_TYPE)
         self.image_data = image_data
+        self.zpl_key = zpl_key  # ZPL (sin ^PQ) al que corresponde la imagen
+        self.decoded_image = decoded_image  # QImage en tamaño original
+        self.scaled_image = scaled_image  # QImage lista para mostrar (None si no se pudo decodificar)
+        self.target_size = target_size
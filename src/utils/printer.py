@@ -2,7 +2,11 @@ import json
 import string
 import unicodedata
 
-import win32print
+try:
+    import win32print
+except ImportError:
+    # Fuera de Windows (pruebas y benchmarks en Linux) no hay impresoras de Windows que listar
+    win32print = None
 
 # printer.py
 __all__ = ["list_printers_to_json", "normalize_zpl"]
@@ -13,6 +17,8 @@ def is_thermal_printer(printer_name):
     """
     Verifica si una impresora es térmica basada en su controlador, procesador de impresión o nombre del puerto.
     """
+    if win32print is None:
+        return False
     try:
         printer_handle = win32print.OpenPrinter(printer_name)
         printer_info = win32print.GetPrinter(printer_handle, 2)  # Nivel 2 tiene detalles del controlador
@@ -53,6 +59,9 @@ def list_printers_to_json():
     """
     Función que lista las impresoras disponibles y devuelve una cadena JSON con los detalles.
     """
+    if win32print is None:
+        return json.dumps([], indent=4)
+
     # Enumerar las impresoras instaladas
     printers = win32print.EnumPrinters(win32print.PRINTER_ENUM_LOCAL | win32print.PRINTER_ENUM_CONNECTIONS)
 
@@ -0,0 +1,37 @@
+# catalog_sync_worker.py
+import logging
+
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal, pyqtSlot
+
+
+class CatalogSyncSignals(QObject):
+    # Cantidad de cambios aplicados a la copia local del catálogo
+    finished = pyqtSignal(int)
+
+
+class CatalogSyncWorker(QRunnable):
+    """
+    Sincroniza en segundo plano (en un pool de baja prioridad) la copia local del catálogo con la API,
+    para cada tamaño de etiqueta. Se detiene entre páginas si se activa `cancel_event`.
+    """
+
+    def __init__(self, catalog_sync, label_sizes, cancel_event):
+        super().__init__()
+        self.catalog_sync = catalog_sync
+        self.label_sizes = label_sizes
+        self.cancel_event = cancel_event
+        self.signals = CatalogSyncSignals()
+
+    @pyqtSlot()
+    def run(self):
+        """Método que se ejecuta en segundo plano."""
+        applied = 0
+        try:
+            for label_size in self.label_sizes:
+                if self.cancel_event.is_set():
+                    break
+                applied += self.catalog_sync.sync(label_size, self.cancel_event)
+        except Exception as e:
+            logging.error(f"Error al sincronizar el catálogo: {e!r}")
+            print(f"Error al sincronizar el catálogo: {e!r}")
+        self.signals.finished.emit(applied)
@@ -0,0 +1,221 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import NamedTuple
+
+from PyQt5.QtCore import QRunnable, QThread, QThreadPool
+
+# executor.py
+__all__ = [
+    "WorkloadExecutor",
+    "PoolSpec",
+    "PoolStats",
+    "executor",
+    "INTERACTIVE_API",
+    "BACKGROUND_PREFETCH",
+    "CATALOG_SYNC",
+    "RENDERING",
+    "PRINTING_IO",
+    "ZPL_LINT",
+    "CACHE_REVALIDATION",
+]
+
+# Pools con nombre: cada tipo de trabajo tiene sus propios hilos, así la precarga no le quita hilos a la búsqueda
+INTERACTIVE_API = "interactive_api"  # Búsquedas del operador (SearchWorker, ZplWorker)
+BACKGROUND_PREFETCH = "background_prefetch"  # Vistas previas especulativas de las relaciones
+CATALOG_SYNC = "catalog_sync"  # Sincronización de la copia local del catálogo (tareas largas, de a una)
+RENDERING = "rendering"  # Vistas previas de etiquetas: Labelary, decodificación y escalado del PNG
+PRINTING_IO = "printing_io"  # E/S corta con la impresora
+ZPL_LINT = "zpl_lint"  # Validación del ZPL del editor: aparte, para que sus envíos frecuentes no desalojen búsquedas en cola
+CACHE_REVALIDATION = "cache_revalidation"  # Revalidación de items vencidos de la caché (stale-while-revalidate)
+
+WAIT_SAMPLES = 256  # Esperas en cola que se guardan por pool para calcular percentiles
+
+
+class PoolSpec(NamedTuple):
+    max_threads: int
+    thread_priority: QThread.Priority = QThread.NormalPriority
+    queue_limit: int = 0  # Tareas que pueden esperar en cola (0: sin límite)
+    drop_oldest: bool = True  # Con la cola llena: descarta la tarea en espera más vieja (True) o rechaza la nueva (False)
+
+
+class PoolStats(NamedTuple):
+    name: str
+    max_threads: int
+    active: int
+    queued: int
+    submitted: int
+    completed: int
+    dropped: int  # Descartadas de la cola (por una tarea más nueva o con clear)
+    rejected: int  # No aceptadas por tener la cola llena
+    wait_p50_ms: float
+    wait_p95_ms: float
+    wait_max_ms: float
+
+
+DEFAULT_POOLS = {
+    INTERACTIVE_API: PoolSpec(4, QThread.HighPriority, queue_limit=8),
+    RENDERING: PoolSpec(3, QThread.NormalPriority, queue_limit=16),
+    BACKGROUND_PREFETCH: PoolSpec(2, QThread.LowestPriority, queue_limit=20),
+    CATALOG_SYNC: PoolSpec(1, QThread.LowestPriority, queue_limit=1, drop_oldest=False),
+    PRINTING_IO: PoolSpec(1, QThread.HighPriority),
+    ZPL_LINT: PoolSpec(1, QThread.NormalPriority, queue_limit=1),  # Solo importa la validación del texto más reciente
+    # Sin descartar tareas en cola: una revalidación rechazada libera su llave al momento, una descartada nunca lo haría
+    CACHE_REVALIDATION: PoolSpec(2, QThread.LowestPriority, queue_limit=20, drop_oldest=False),
+}
+
+
+class _PoolTask(QRunnable):
+    """Envuelve una tarea (QRunnable o función) para medir su espera en cola y aplicar la prioridad del pool."""
+
+    def __init__(self, pool, task):
+        super().__init__()
+        self.pool = pool
+        self.task = task
+        self.enqueued_at = time.perf_counter()
+
+    def run(self):
+        if not self.pool.task_started(self):
+            return  # Descartada mientras esperaba en cola
+        try:
+            if isinstance(self.task, QRunnable):
+                self.task.run()
+            else:
+                self.task()
+        except Exception as e:
+            logging.error(f"Error en una tarea del pool {self.pool.name}: {e!r}")
+            print(f"Error en una tarea del pool {self.pool.name}: {e!r}")
+        finally:
+            self.pool.task_finished()
+
+
+class _Pool:
+    def __init__(self, name, spec):
+        self.name = name
+        self.spec = spec
+        self.thread_pool = QThreadPool()
+        self.thread_pool.setMaxThreadCount(spec.max_threads)
+        self._lock = threading.Lock()
+        self._queued = OrderedDict()  # _PoolTask -> prioridad, en orden de llegada
+        self._waits = deque(maxlen=WAIT_SAMPLES)
+        self.active = 0
+        self.submitted = 0
+        self.completed = 0
+        self.dropped = 0
+        self.rejected = 0
+
+    def submit(self, task, priority):
+        pool_task = _PoolTask(self, task)
+        with self._lock:
+            if self.spec.queue_limit and len(self._queued) >= self.spec.queue_limit:
+                # La más vieja entre las de menor prioridad; una tarea nueva de prioridad aún menor se rechaza
+                victim, victim_priority = min(self._queued.items(), key=lambda entry: entry[1])
+                if not self.spec.drop_oldest or priority < victim_priority:
+                    self.rejected += 1
+                    logging.info(f"Cola del pool {self.name} llena: tarea rechazada.")
+                    return False
+                # Sigue en la cola de Qt, pero al llegar su turno termina sin ejecutarse
+                del self._queued[victim]
+                self.dropped += 1
+            self._queued[pool_task] = priority
+            self.submitted += 1
+        self.thread_pool.start(pool_task, priority)
+        return True
+
+    def task_started(self, pool_task):
+        with self._lock:
+            if self._queued.pop(pool_task, None) is None:
+                return False
+            self._waits.append(time.perf_counter() - pool_task.enqueued_at)
+            self.active += 1
+        QThread.currentThread().setPriority(self.spec.thread_priority)
+        return True
+
+    def task_finished(self):
+        with self._lock:
+            self.active -= 1
+            self.completed += 1
+
+    def clear(self):
+        with self._lock:
+            self.dropped += len(self._queued)
+            self._queued.clear()
+        self.thread_pool.clear()
+
+    def pending(self):
+        with self._lock:
+            return len(self._queued) + self.active
+
+    def stats(self):
+        with self._lock:
+            waits = sorted(self._waits)
+            counts = (self.active, len(self._queued), self.submitted, self.completed, self.dropped, self.rejected)
+
+        def percentile(fraction):
+            return waits[min(len(waits) - 1, int(len(waits) * fraction))] * 1000 if waits else 0.0
+
+        return PoolStats(self.name, self.spec.max_threads, *counts, percentile(0.5), percentile(0.95), waits[-1] * 1000 if waits else 0.0)
+
+
+class WorkloadExecutor:
+    """
+    Pools de hilos con nombre (QThreadPool), cada uno con su cantidad de hilos, prioridad de hilo y límite de cola.
+
+    `submit` acepta un QRunnable (los workers del proyecto) o una función; `priority` ordena la cola dentro del pool.
+    Con la cola llena se descarta la tarea en espera más vieja (útil cuando solo importa el último pedido, como en
+    las búsquedas y vistas previas) o se rechaza la nueva, según el PoolSpec. De cada pool se mide el tiempo que
+    las tareas esperan en cola antes de obtener un hilo. Los pools se crean al usarse por primera vez.
+    """
+
+    def __init__(self, pools=None):
+        self.specs = dict(DEFAULT_POOLS if pools is None else pools)
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def _pool(self, name):
+        with self._lock:
+            pool = self._pools.get(name)
+            if pool is None:
+                pool = self._pools[name] = _Pool(name, self.specs[name])
+            return pool
+
+    def submit(self, pool_name, task, priority=0):
+        """Encola la tarea en el pool; retorna False si fue rechazada por tener la cola llena."""
+        return self._pool(pool_name).submit(task, priority)
+
+    def clear(self, pool_name):
+        """Descarta las tareas que esperan en cola (las que ya se ejecutan terminan normalmente)."""
+        if pool_name in self._pools:
+            self._pools[pool_name].clear()
+
+    def pending(self, pool_name):
+        """Tareas en cola más las que se están ejecutando."""
+        return self._pools[pool_name].pending() if pool_name in self._pools else 0
+
+    def max_threads(self, pool_name):
+        return self.specs[pool_name].max_threads
+
+    def thread_priority(self, pool_name):
+        return self.specs[pool_name].thread_priority
+
+    def wait_for_done(self, pool_name, msecs=-1):
+        return self._pools[pool_name].thread_pool.waitForDone(msecs) if pool_name in self._pools else True
+
+    def stats(self):
+        """PoolStats de cada pool ya creado."""
+        with self._lock:
+            pools = list(self._pools.values())
+        return [pool.stats() for pool in pools]
+
+    def format_stats(self):
+        return "\n".join(
+            f"{stats.name}: {stats.active}/{stats.max_threads} activos, {stats.queued} en cola, {stats.completed} completadas,"
+            f" {stats.dropped} descartadas, {stats.rejected} rechazadas | espera p50 {stats.wait_p50_ms:.1f} ms,"
+            f" p95 {stats.wait_p95_ms:.1f} ms, máx {stats.wait_max_ms:.1f} ms"
+            for stats in self.stats()
+        )
+
+
+# Instancia compartida por la ventana principal y los widgets que generan vistas previas
+executor = WorkloadExecutor()
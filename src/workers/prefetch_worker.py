@@ -0,0 +1,28 @@
+# prefetch_worker.py
+from PyQt5.QtCore import QRunnable, pyqtSlot
+
+from ui.zpl_preview import build_preview_zpl, render_label_png
+
+
+class PrefetchWorker(QRunnable):
+    """
+    Precarga en segundo plano (en un pool de baja prioridad) la vista previa de la etiqueta de un item ya obtenido,
+    para que al buscarlo después se resuelva desde caché.
+    Los datos del item se precargan con el cliente asíncrono (quedan en la caché del cliente API).
+    """
+
+    def __init__(self, label, cancel_event):
+        super().__init__()
+        self.label = label
+        self.cancel_event = cancel_event  # threading.Event compartido por toda la tanda de precarga
+
+    @pyqtSlot()
+    def run(self):
+        """Método que se ejecuta en segundo plano."""
+        if self.cancel_event.is_set():
+            return
+
+        # Vista previa de la etiqueta (queda en la caché de vistas previas)
+        preview_zpl = build_preview_zpl(self.label.strip())
+        if preview_zpl:
+            render_label_png(preview_zpl)
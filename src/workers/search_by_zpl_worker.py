@@ -10,19 +10,25 @@ class ZplWorkerSignals(QObject):
 
 
 class ZplWorker(QRunnable):
-    def __init__(self, api, inventory_id, query_params, new_zpl_text):
+    def __init__(self, api, inventory_id, query_params, new_zpl_text, token=None):
         super().__init__()
         self.api = api
         self.inventory_id = inventory_id
         self.query_params = query_params
         self.new_zpl_text = new_zpl_text
+        self.token = token  # RequestToken: si otra búsqueda lo reemplaza, la petición se aborta
         self.signals = ZplWorkerSignals()
 
     @pyqtSlot()
     def run(self):
         """Método que se ejecuta en segundo plano."""
+        # Reemplazada antes de empezar (seguía en la cola del pool): no hace falta llamar a la API
+        if self.token is not None and self.token.cancelled:
+            return
+
         # 1) Llamada (potencialmente costosa) a la API
-        item = self.api.get_mercadolibre_item(self.inventory_id, self.query_params)
+        cancel_event = self.token.cancel_event if self.token is not None else None
+        item = self.api.get_mercadolibre_item(self.inventory_id, self.query_params, cancel_event=cancel_event)
 
         # 2) Determinar qué ZPL usar:
         #    - Si la API devolvió un ZPL nuevo en 'item["label"]', úsalo.
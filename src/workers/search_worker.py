@@ -8,17 +8,22 @@ class WorkerSignals(QObject):
 
 
 class SearchWorker(QRunnable):
-    def __init__(self, api, inventory_id, query_params):
+    def __init__(self, api, inventory_id, query_params, token=None):
         super().__init__()
         self.api = api
         self.inventory_id = inventory_id
         self.query_params = query_params
+        self.token = token  # RequestToken: si otra búsqueda lo reemplaza, la petición se aborta
         self.signals = WorkerSignals()
 
     @pyqtSlot()
     def run(self):
         """Este método se ejecuta en segundo plano para evitar bloquear la UI."""
+        # Reemplazada antes de empezar (seguía en la cola del pool): no hace falta llamar a la API
+        if self.token is not None and self.token.cancelled:
+            return
         # Llamada a tu API que puede demorar
-        item = self.api.get_mercadolibre_item(self.inventory_id, self.query_params)
+        cancel_event = self.token.cancel_event if self.token is not None else None
+        item = self.api.get_mercadolibre_item(self.inventory_id, self.query_params, cancel_event=cancel_event)
         # Emite la señal con el resultado
         self.signals.finished.emit(item)
@@ -0,0 +1,29 @@
+# zpl_lint_worker.py
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal, pyqtSlot
+
+from zpl import lint_zpl
+
+
+class LintSignals(QObject):
+    # Generación del texto validado y lista de ZplDiagnostic
+    finished = pyqtSignal(int, object)
+
+
+class ZplLintWorker(QRunnable):
+    """
+    Valida el ZPL del editor fuera del hilo de la interfaz.
+    Recibe los tokens ya calculados y la generación (versión) del texto, para que quien recibe
+    el resultado pueda descartarlo si el texto cambió mientras se validaba.
+    """
+
+    def __init__(self, tokens, generation):
+        super().__init__()
+        self.tokens = tokens
+        self.generation = generation
+        self.signals = LintSignals()
+
+    @pyqtSlot()
+    def run(self):
+        """Método que se ejecuta en segundo plano."""
+        diagnostics = lint_zpl(self.tokens)
+        self.signals.finished.emit(self.generation, diagnostics)
@@ -0,0 +1,5 @@
+# zpl/__init__.py
+from .document import LabelBlock, ZplDocument, document_from_tokens, parse_zpl_document, set_label_copies
+from .incremental import IncrementalZplTokens
+from .tokenizer import ZplToken, ZplTokens, tokenize
+from .linter import ERROR, WARNING, ZplDiagnostic, lint_zpl
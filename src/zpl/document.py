@@ -0,0 +1,129 @@
+import threading
+from typing import NamedTuple
+
+from tracing import tracer
+
+from .tokenizer import tokenize
+
+# document.py
+__all__ = ["LabelBlock", "ZplDocument", "parse_zpl_document", "document_from_tokens", "set_label_copies"]
+
+
+class LabelBlock(NamedTuple):
+    start: int  # Offset de ^XA dentro del documento
+    end: int  # Offset justo después de ^XZ
+    text: str
+    copies: int  # Cantidad indicada por ^PQ (1 si no tiene)
+
+
+class ZplDocument:
+    """
+    Documento ZPL dividido en bloques de etiqueta (^XA...^XZ).
+    Un documento es válido si contiene al menos un bloque y fuera de los bloques solo hay espacios.
+    """
+
+    def __init__(self, text, blocks, is_valid):
+        self.text = text
+        self.blocks = blocks
+        self.is_valid = is_valid
+
+    @property
+    def is_multi_label(self):
+        return len(self.blocks) > 1
+
+    @property
+    def total_labels(self):
+        """Total de etiquetas que imprime una pasada del documento (suma de los ^PQ de cada bloque)."""
+        return sum(block.copies for block in self.blocks)
+
+
+def document_from_tokens(tokens):
+    """Arma el documento (bloques y validez) a partir de los comandos ya tokenizados (ZplTokens), en una sola pasada."""
+    zpl_text = tokens.text
+    starts = tokens.starts
+    blocks = []
+    # Antes del primer comando solo se permiten espacios
+    is_valid = bool(starts) and not zpl_text[: starts[0]].strip()
+    block_start = None
+    copies = 1
+    for index, command in enumerate(tokens.commands):
+        if command == "XA" and zpl_text[starts[index]] == "^":
+            # Un ^XA sin su ^XZ queda "dentro" del bloque siguiente
+            if block_start is not None:
+                is_valid = False
+            block_start = starts[index]
+            copies = 1
+        elif block_start is None:
+            # Fuera de un bloque ^XA...^XZ solo se admiten comandos de control (~JA, ~SD, ...)
+            if zpl_text[starts[index]] != "~":
+                is_valid = False
+        elif command == "PQ":
+            copies_str = tokens.params(index).split(",", 1)[0].strip()
+            if copies_str.isdigit():
+                copies = int(copies_str)
+        elif command == "XZ" and zpl_text[starts[index]] == "^":
+            block_end = starts[index] + 3
+            blocks.append(LabelBlock(block_start, block_end, zpl_text[block_start:block_end], copies))
+            block_start = None
+            # Entre bloques solo se permiten espacios/saltos de línea
+            if zpl_text[block_end : tokens.end(index)].strip():
+                is_valid = False
+
+    if block_start is not None or not blocks:
+        is_valid = False
+
+    return ZplDocument(zpl_text, blocks, is_valid)
+
+
+def parse_zpl_document(zpl_text):
+    """
+    Divide el texto en bloques de etiqueta en una sola pasada.
+    El último resultado se memoriza, de modo que validar, previsualizar e imprimir el mismo texto no lo vuelve a parsear.
+    """
+    global _last_document
+    with _parse_lock:
+        cached_document = _last_document
+    if cached_document is not None and cached_document.text == zpl_text:
+        return cached_document
+
+    with tracer.span("zpl.parse", "zpl", chars=len(zpl_text)):
+        document = document_from_tokens(tokenize(zpl_text))
+    with _parse_lock:
+        _last_document = document
+    return document
+
+
+def set_label_copies(zpl_text, copies):
+    """
+    Retorna el ZPL con la cantidad `copies` en el primer parámetro de cada ^PQ (el resto de parámetros se conserva).
+    Si una etiqueta no tiene ^PQ, se agrega antes de su ^XZ.
+    """
+    tokens = tokenize(zpl_text)
+    starts = tokens.starts
+    parts = []
+    last_offset = 0
+    block_has_pq = False
+    for index, command in enumerate(tokens.commands):
+        if zpl_text[starts[index]] != "^":
+            continue
+        if command == "XA":
+            block_has_pq = False
+        elif command == "PQ":
+            block_has_pq = True
+            params_start = starts[index] + 3
+            params_end = zpl_text.find(",", params_start, tokens.end(index))
+            if params_end == -1:
+                params_end = tokens.end(index)
+            parts.append(zpl_text[last_offset:params_start])
+            parts.append(str(copies))
+            last_offset = params_end
+        elif command == "XZ" and not block_has_pq:
+            parts.append(zpl_text[last_offset : starts[index]])
+            parts.append(f"^PQ{copies},0,1,Y")
+            last_offset = starts[index]
+    parts.append(zpl_text[last_offset:])
+    return "".join(parts)
+
+
+_parse_lock = threading.Lock()
+_last_document = None
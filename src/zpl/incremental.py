@@ -0,0 +1,113 @@
+import bisect
+from itertools import accumulate
+
+from .document import document_from_tokens
+from .tokenizer import ZplTokens, scan_commands
+
+# incremental.py
+__all__ = ["IncrementalZplTokens"]
+
+
+class IncrementalZplTokens:
+    """
+    Copia del texto del editor con su lista de comandos ZPL, actualizada de forma incremental.
+
+    Cada edición solo actualiza la copia del texto y acumula el rango modificado; la re-tokenización
+    ocurre de forma diferida (al consultar los tokens) y únicamente alrededor de ese rango. Los comandos
+    se guardan como longitudes, así que los que siguen a la edición no se tocan (no hay que desplazarlos).
+    """
+
+    def __init__(self, text=""):
+        self.version = 0
+        self.reset(text)
+
+    def reset(self, text):
+        """Reemplaza todo el contenido (p. ej. después de un setPlainText) y re-tokeniza completo."""
+        self._text = text
+        starts, self._commands = scan_commands(text)
+        self._first = starts[0] if starts else len(text)  # Offset del primer comando
+        self._lengths = [end - start for start, end in zip(starts, starts[1:] + [len(text)])]
+        self._dirty = None  # (inicio, fin en coordenadas anteriores, fin en coordenadas actuales)
+        self._tokens = None
+        self._document = None
+        self.version += 1
+
+    @property
+    def text(self):
+        return self._text
+
+    def apply_change(self, position, chars_removed, inserted_text):
+        """Registra una edición: en `position` se eliminaron `chars_removed` caracteres y se insertó `inserted_text`."""
+        text = self._text
+        self._text = text[:position] + inserted_text + text[position + chars_removed :]
+        self._tokens = None
+        self._document = None
+        self.version += 1
+
+        removed_end = position + chars_removed
+        added_end = position + len(inserted_text)
+        if self._dirty is None:
+            self._dirty = (position, removed_end, added_end)
+            return
+
+        # Fusionar con el rango pendiente: antes de `start` nada cambió y después de `new_end` todo está desplazado
+        start, old_end, new_end = self._dirty
+        covered_end = max(new_end, removed_end)
+        old_end += covered_end - new_end
+        self._dirty = (min(start, position), old_end, covered_end + len(inserted_text) - chars_removed)
+
+    def tokens(self):
+        """ZplTokens del texto actual (aplica la re-tokenización pendiente, si la hay)."""
+        if self._tokens is None:
+            if self._dirty is not None:
+                self._flush()
+            starts = list(accumulate(self._lengths[:-1], initial=self._first)) if self._lengths else []
+            # Copia de la lista de comandos: el resultado puede usarse en otro hilo mientras se sigue editando
+            self._tokens = ZplTokens(self._text, starts, self._commands[:])
+        return self._tokens
+
+    def _flush(self):
+        start, old_end, new_end = self._dirty
+        self._dirty = None
+        lengths = self._lengths
+        delta = new_end - old_end
+        # Offsets de inicio según el texto anterior a las ediciones pendientes
+        old_starts = list(accumulate(lengths[:-1], initial=self._first)) if lengths else []
+
+        # El comando anterior a `start` puede crecer o partirse; los que empiezan en/después de `old_end` no cambian
+        first = max(bisect.bisect_left(old_starts, start) - 1, 0)
+        last = bisect.bisect_left(old_starts, old_end, lo=first)
+        window_start = old_starts[first] if old_starts and old_starts[first] < start else 0
+        window_end = old_starts[last] + delta if last < len(old_starts) else len(self._text)
+
+        new_starts, new_commands = scan_commands(self._text, window_start, window_end)
+        new_lengths = [end - begin for begin, end in zip(new_starts, new_starts[1:] + [window_end])]
+        if window_start == 0:
+            self._first = new_starts[0] if new_starts else window_end
+        self._lengths[first:last] = new_lengths
+        self._commands[first:last] = new_commands
+
+    def document(self):
+        """ZplDocument del texto actual, memorizado hasta la siguiente edición."""
+        if self._document is None:
+            self._document = document_from_tokens(self.tokens())
+        return self._document
+
+    def extract_barcode(self):
+        """
+        Equivalente por tokens a buscar ^BCN...^FD(...)^FS: el dato del primer ^FD posterior a ^BCN.
+        Retorna None si no se encuentra.
+        """
+        tokens = self.tokens()
+        barcode_index = tokens.index_of("BC")
+        while barcode_index != -1 and not self._text.startswith("^BCN", tokens.starts[barcode_index]):
+            barcode_index = tokens.index_of("BC", barcode_index + 1)
+        if barcode_index == -1:
+            return None
+        data_index = tokens.index_of("FD", barcode_index + 1)
+        if data_index == -1:
+            return None
+        end_index = tokens.index_of("FS", data_index + 1)
+        if end_index == -1:
+            return None
+        return self._text[tokens.starts[data_index] + 3 : tokens.starts[end_index]].strip()
@@ -0,0 +1,150 @@
+from typing import NamedTuple
+
+from .tokenizer import ZplTokens, tokenize
+
+# linter.py
+__all__ = ["ZplDiagnostic", "lint_zpl", "ERROR", "WARNING"]
+
+ERROR = "error"
+WARNING = "warning"
+
+# Valores admitidos por los parámetros de ^BC (o,h,f,g,e,m)
+BARCODE_ORIENTATIONS = ("N", "R", "I", "B")
+BARCODE_MODES = ("N", "U", "A", "D")
+YES_NO = ("Y", "N")
+MAX_BARCODE_HEIGHT = 32000
+
+# Comandos que inician un campo nuevo: si aparecen con un ^FD abierto, el campo anterior quedó sin ^FS
+FIELD_START_COMMANDS = frozenset(("FO", "FT", "FD", "FV", "XZ"))
+
+
+class ZplDiagnostic(NamedTuple):
+    start: int  # Offset de inicio del fragmento señalado
+    end: int  # Offset de fin (exclusivo)
+    severity: str  # ERROR o WARNING
+    code: str  # Identificador estable, p. ej. "unterminated-fd"
+    message: str
+
+
+def lint_zpl(zpl):
+    """
+    Valida un documento ZPL (texto o ZplTokens ya tokenizados) y retorna la lista de diagnósticos ordenada por offset.
+    Revisa la estructura ^XA...^XZ, campos ^FD/^FV sin ^FS, parámetros de ^BC y ^PQ,
+    y posiciones ^FO/^FT fuera del ancho (^PW) o largo (^LL) de la etiqueta.
+    """
+    tokens = zpl if isinstance(zpl, ZplTokens) else tokenize(zpl)
+    zpl_text = tokens.text
+    starts = tokens.starts
+    diagnostics = []
+
+    def report(index, severity, code, message):
+        start = starts[index]
+        # Se señala el comando sin los espacios/saltos de línea que lo siguen
+        end = start + len(zpl_text[start : tokens.end(index)].rstrip())
+        diagnostics.append(ZplDiagnostic(start, end, severity, code, message))
+
+    leading_text = zpl_text[: starts[0]] if starts else zpl_text
+    if leading_text.strip():
+        start = len(leading_text) - len(leading_text.lstrip())
+        end = len(leading_text.rstrip())
+        diagnostics.append(ZplDiagnostic(start, end, ERROR, "text-outside-label", "Texto fuera de un bloque ^XA...^XZ"))
+    if not starts:
+        return diagnostics
+
+    block_index = None  # Índice del ^XA del bloque abierto
+    field_index = None  # Índice del ^FD/^FV abierto (sin ^FS)
+    label_width = None  # ^PW y ^LL se mantienen entre etiquetas, igual que en la impresora
+    label_length = None
+
+    has_control_commands = "~" in zpl_text
+    for index, command in enumerate(tokens.commands):
+        if command == "FS" and block_index is not None:
+            # El caso más frecuente se resuelve primero
+            field_index = None
+            continue
+        if has_control_commands and zpl_text[starts[index]] != "^":
+            continue  # Comandos de control (~), no forman parte del formato
+
+        if field_index is not None and command in FIELD_START_COMMANDS:
+            report(field_index, ERROR, "unterminated-fd", f"^{tokens.commands[field_index]} sin ^FS de cierre")
+            field_index = None
+
+        if command == "XA":
+            if block_index is not None:
+                report(block_index, ERROR, "unclosed-label", "^XA sin ^XZ de cierre")
+            block_index = index
+            continue
+
+        if block_index is None:
+            if command == "XZ":
+                report(index, ERROR, "unexpected-xz", "^XZ sin ^XA de apertura")
+            else:
+                report(index, ERROR, "command-outside-label", f"^{command} fuera de un bloque ^XA...^XZ")
+            continue
+
+        if command == "XZ":
+            block_index = None
+            if tokens.params(index).strip():
+                diagnostics.append(
+                    ZplDiagnostic(starts[index] + 3, tokens.end(index), ERROR, "text-outside-label", "Texto fuera de un bloque ^XA...^XZ")
+                )
+        elif command == "FD" or command == "FV":
+            field_index = index
+        elif command == "BC":
+            message = _check_barcode_params(tokens.params(index))
+            if message:
+                report(index, ERROR, "invalid-bc", message)
+        elif command == "PW":
+            label_width = _parse_int(tokens.params(index))
+            if label_width is None:
+                report(index, ERROR, "invalid-pw", "^PW requiere el ancho de la etiqueta en puntos")
+        elif command == "LL":
+            label_length = _parse_int(tokens.params(index).split(",", 1)[0])
+        elif command == "FO" or command == "FT":
+            if label_width is None and label_length is None:
+                continue  # Sin ^PW/^LL no hay contra qué comparar
+            params = tokens.params(index).split(",")
+            x = _parse_int(params[0]) if params[0].strip() else 0
+            y = _parse_int(params[1]) if len(params) > 1 and params[1].strip() else 0
+            if x is None or y is None:
+                report(index, ERROR, "invalid-position", f"^{command} con coordenadas no numéricas")
+            elif label_width is not None and x >= label_width:
+                report(index, ERROR, "position-outside-label", f"^{command} en x={x} fuera del ancho de la etiqueta (^PW{label_width})")
+            elif label_length is not None and y >= label_length:
+                report(index, WARNING, "position-outside-label", f"^{command} en y={y} fuera del largo de la etiqueta (^LL{label_length})")
+        elif command == "PQ":
+            copies_str = tokens.params(index).split(",", 1)[0].strip()
+            if copies_str and not copies_str.isdigit():
+                report(index, ERROR, "invalid-pq", "^PQ requiere una cantidad numérica")
+
+    if field_index is not None:
+        report(field_index, ERROR, "unterminated-fd", f"^{tokens.commands[field_index]} sin ^FS de cierre")
+    if block_index is not None:
+        report(block_index, ERROR, "unclosed-label", "^XA sin ^XZ de cierre")
+
+    diagnostics.sort(key=lambda diagnostic: diagnostic.start)
+    return diagnostics
+
+
+def _parse_int(value):
+    value = value.strip()
+    return int(value) if value.isdigit() else None
+
+
+def _check_barcode_params(params):
+    """Retorna el mensaje de error de los parámetros de ^BC (o,h,f,g,e,m), o None si son válidos. Vacío = valor por defecto."""
+    values = [value.strip().upper() for value in params.split(",")]
+    if len(values) > 6:
+        return "^BC admite como máximo 6 parámetros"
+    values += [""] * (6 - len(values))
+    orientation, height, line, line_above, check_digit, mode = values
+    if orientation and orientation not in BARCODE_ORIENTATIONS:
+        return f"^BC: orientación '{orientation}' inválida (N, R, I o B)"
+    if height and (not height.isdigit() or not 1 <= int(height) <= MAX_BARCODE_HEIGHT):
+        return f"^BC: alto '{height}' inválido (1 a {MAX_BARCODE_HEIGHT} puntos)"
+    for name, value in (("línea de interpretación", line), ("línea superior", line_above), ("dígito verificador", check_digit)):
+        if value and value not in YES_NO:
+            return f"^BC: {name} '{value}' inválido (Y o N)"
+    if mode and mode not in BARCODE_MODES:
+        return f"^BC: modo '{mode}' inválido (N, U, A o D)"
+    return None
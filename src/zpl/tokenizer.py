@@ -0,0 +1,89 @@
+import re
+from itertools import accumulate
+from operator import add, itemgetter
+from typing import NamedTuple
+
+# tokenizer.py
+__all__ = ["ZplToken", "ZplTokens", "tokenize", "scan_commands"]
+
+# Cada comando empieza con ^ o ~ y se extiende hasta el siguiente prefijo (sus parámetros/datos incluidos)
+TOKEN_PATTERN = re.compile(r"[\^~][^\^~]*")
+COMMAND_NAME = itemgetter(slice(None, 2))
+
+
+class ZplToken(NamedTuple):
+    start: int  # Offset del prefijo (^ o ~)
+    end: int  # Offset donde empieza el siguiente comando (o fin del texto)
+    command: str  # Nombre del comando en mayúsculas, p. ej. "XA", "FD", "PQ"
+
+
+class ZplTokens:
+    """
+    Comandos de un texto ZPL como listas paralelas (offset de inicio y nombre de cada comando).
+    Los comandos son contiguos: cada uno termina donde empieza el siguiente, y el último al final del texto.
+    Se guardan así para poder buscar con `list.index` y actualizar por rebanadas sin crear un objeto por comando.
+    """
+
+    __slots__ = ("text", "starts", "commands")
+
+    def __init__(self, text, starts, commands):
+        self.text = text
+        self.starts = starts
+        self.commands = commands
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.starts)
+        return ZplToken(self.starts[index], self.end(index), self.commands[index])
+
+    def end(self, index):
+        return self.starts[index + 1] if index + 1 < len(self.starts) else len(self.text)
+
+    def prefix(self, index):
+        return self.text[self.starts[index]]
+
+    def params(self, index):
+        """Texto que sigue al nombre del comando (parámetros o datos de campo)."""
+        return self.text[self.starts[index] + 3 : self.end(index)]
+
+    def index_of(self, command, start_index=0, prefix="^"):
+        """Índice del primer comando `command` con el prefijo dado a partir de `start_index`, o -1."""
+        commands = self.commands
+        while True:
+            try:
+                index = commands.index(command, start_index)
+            except ValueError:
+                return -1
+            if self.text[self.starts[index]] == prefix:
+                return index
+            start_index = index + 1
+
+
+def scan_commands(zpl_text, start=0, end=None):
+    """Offsets y nombres de los comandos en `zpl_text[start:end]`. El texto previo al primer prefijo no genera comando."""
+    if end is None:
+        end = len(zpl_text)
+    if zpl_text.find("~", start, end) == -1:
+        # Caso habitual (sin comandos de control): str.split resuelve todo en C, sin un objeto Match por comando
+        parts = zpl_text[start:end].split("^")
+        offset = start + len(parts[0])
+        del parts[0]
+        # Cada comando ocupa su parte más el prefijo: inicio_i = offset + (suma de longitudes previas) + i
+        starts = list(map(add, accumulate(map(len, parts), initial=offset), range(len(parts))))
+        commands = list(map(str.upper, map(COMMAND_NAME, parts)))
+        return starts, commands
+
+    starts = []
+    commands = []
+    for match in TOKEN_PATTERN.finditer(zpl_text, start, end):
+        starts.append(match.start())
+        commands.append(match.group()[1:3].upper())
+    return starts, commands
+
+
+def tokenize(zpl_text):
+    """Tokeniza el texto completo."""
+    return ZplTokens(zpl_text, *scan_commands(zpl_text))
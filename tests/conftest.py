@@ -0,0 +1,218 @@
+import base64
+import gzip
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+
+def make_jwt(ttl):
+    """JWT sin firma válida (el cliente no la verifica) que vence en `ttl` segundos."""
+    now = time.time()
+
+    def encode(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode("utf-8")).rstrip(b"=").decode("ascii")
+
+    return f"{encode({'alg': 'HS256', 'typ': 'JWT'})}.{encode({'iat': now, 'exp': now + ttl})}.firma"
+
+
+class StubApiHandler(BaseHTTPRequestHandler):
+    """
+    Imita GET /mercadolibre/items/{id}, POST /mercadolibre/items/batch (solo con `server.batch_enabled`) y
+    POST /auth/login de la API, con un retraso configurable por respuesta. Con `server.catalog` (lista de cambios)
+    también imita el feed GET /mercadolibre/items/changes. `server.item_extra` agrega claves a cada item y
+    el parámetro `fields` proyecta la respuesta a las claves pedidas. Con `server.compress`, las respuestas se
+    comprimen con gzip si el cliente lo acepta. Los items llevan ETag y responden 304 si coincide If-None-Match.
+    Con `server.token_ttl` definido, el login emite JWT que vencen en esa cantidad de segundos y los GET con un
+    token vencido responden 401.
+    """
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        if self.path.startswith("/mercadolibre/items/changes"):
+            self._send_changes()
+            return
+        inventory_id = self.path.split("?", 1)[0].rsplit("/", 1)[-1]
+        with server.lock:
+            server.requests.append(self.path)
+        time.sleep(server.delays.get(inventory_id, server.delay))
+        if server.token_ttl is not None and not self._token_is_valid():
+            with server.lock:
+                server.rejected += 1
+            self._send_json(401, {"message": "token expirado"})
+            return
+        status = server.statuses.get(inventory_id, 200)
+        if status == 200:
+            item = self._item(inventory_id)
+            fields = parse_qs(urlsplit(self.path).query).get("fields")
+            if fields:
+                item = {key: value for key, value in item.items() if key in fields[0].split(",")}
+            etag = f'"{hashlib.sha1(json.dumps(item).encode("utf-8")).hexdigest()}"'
+            if self.headers.get("If-None-Match") == etag:
+                with server.lock:
+                    server.not_modified += 1
+                self._send_not_modified(etag)
+                return
+            self._send_json(200, item, etag=etag)
+        else:
+            self._send_json(status, {"message": "error"})
+
+    def do_POST(self):
+        server = self.server
+        if self.path.startswith("/v1/printers/"):
+            # Vistas previas de Labelary: el servidor local no las genera
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self._send_json(404, {"message": "not found"})
+            return
+        data = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.path.startswith("/auth/login"):
+            with server.lock:
+                server.logins += 1
+            time.sleep(server.login_delay)
+            self._send_json(200, {"access_token": make_jwt(server.token_ttl or 3600)})
+            return
+
+        with server.lock:
+            server.requests.append(self.path)
+        if not server.batch_enabled:
+            self._send_json(404, {"message": "not found"})
+            return
+        time.sleep(server.delay)
+        items = {
+            inventory_id: self._item(inventory_id)
+            for inventory_id in data.get("inventory_ids", [])
+            if server.statuses.get(inventory_id, 200) == 200
+        }
+        self._send_json(200, {"items": items})
+
+    def _send_changes(self):
+        """Feed de cambios del catálogo: `server.catalog` (lista de cambios con updated_at) paginado por cursor."""
+        server = self.server
+        query = parse_qs(urlsplit(self.path).query)
+        if server.catalog is None:
+            self._send_json(404, {"message": "not found"})
+            return
+        with server.lock:
+            server.requests.append(self.path)
+        updated_after = query.get("updated_after", [""])[0]
+        limit = int(query.get("limit", ["500"])[0])
+        pending = sorted((change for change in server.catalog if change["updated_at"] > updated_after), key=lambda change: change["updated_at"])
+        page = pending[:limit]
+        cursor = page[-1]["updated_at"] if page else updated_after
+        self._send_json(200, {"changes": page, "cursor": cursor, "has_more": len(pending) > limit})
+
+    def _item(self, inventory_id):
+        item = {"inventory_id": inventory_id, "label": f"^XA^FO10,10^BCN,80,Y,N^FD{inventory_id}^FS^PQ1,0,1,Y^XZ"}
+        item.update(self.server.item_extra)
+        return item
+
+    def _token_is_valid(self):
+        token = self.headers.get("Authorization", "").removeprefix("Bearer ")
+        try:
+            payload = token.split(".")[1]
+            claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        except (IndexError, ValueError):
+            return False
+        return claims["exp"] > time.time()
+
+    def _send_not_modified(self, etag):
+        self.send_response(304)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _send_json(self, status, data, etag=None):
+        body = json.dumps(data).encode("utf-8")
+        compress = self.server.compress and "gzip" in self.headers.get("Accept-Encoding", "")
+        if compress:
+            body = gzip.compress(body)
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            if etag:
+                self.send_header("ETag", etag)
+            if compress:
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except OSError:
+            pass  # El cliente cerró la conexión (petición cancelada)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_api_server():
+    """
+    Servidor HTTP local que imita la API de items. `server.delay` (segundos) aplica a todas las respuestas
+    y `server.delays[inventory_id]` a un item en particular; `server.statuses[inventory_id]` fuerza el código
+    de respuesta de un item y `server.requests` registra las rutas pedidas. `server.token_ttl` activa la
+    autenticación con tokens de vida corta; `server.logins`, `server.rejected` y `server.not_modified` cuentan
+    logins y respuestas 401 y 304.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubApiHandler)
+    server.daemon_threads = True
+    server.delay = 0
+    server.delays = {}
+    server.statuses = {}
+    server.batch_enabled = False
+    server.catalog = None
+    server.item_extra = {}
+    server.compress = False
+    server.token_ttl = None
+    server.login_delay = 0
+    server.logins = 0
+    server.rejected = 0
+    server.not_modified = 0
+    server.requests = []
+    server.lock = threading.Lock()
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def stub_api(stub_api_server, tmp_path):
+    """APIEndpoints apuntando al servidor local, con caché y copia del catálogo solo en memoria y un token ficticio."""
+    from PyQt5.QtCore import QSettings
+
+    from api import APIEndpoints
+
+    # Nada de la configuración ni de las cachés del usuario: el token y los logins van a un archivo temporal
+    settings = QSettings(str(tmp_path / "settings.ini"), QSettings.IniFormat)
+    api = APIEndpoints(cache_dir=None, settings=settings, base_url=stub_api_server.base_url)
+    api.interceptor.access_token = "test-token"
+    yield api
+    api.interceptor.close()
+
+
+@pytest.fixture
+def main_window(qtbot, stub_api_server, stub_api, tmp_path, monkeypatch):
+    """
+    MainWindow con la API de `stub_api`, la vista previa apuntando al servidor local (no a Labelary) y su
+    configuración en un archivo temporal. Requiere QtMultimedia.
+    """
+    pytest.importorskip("PyQt5.QtMultimedia", exc_type=ImportError)  # Sin las bibliotecas de audio del sistema no carga
+    from PyQt5.QtCore import QSettings
+
+    from ui import main_window
+
+    monkeypatch.setattr(main_window, "QSettings", lambda *args: QSettings(str(tmp_path / "settings.ini"), QSettings.IniFormat))
+    monkeypatch.setattr(main_window, "APIEndpoints", lambda pool_size=None: stub_api)
+    monkeypatch.setattr("ui.zpl_preview.LABELARY_URL", stub_api_server.base_url)
+    window = main_window.MainWindow()
+    qtbot.addWidget(window)
+    window.catalog_sync_timer.stop()
+    yield window
+    window.close()
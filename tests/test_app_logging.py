@@ -0,0 +1,28 @@
+import logging
+
+from app_logging import RateLimitFilter, zpl_digest
+
+
+def make_record(lineno, message="Impresión realizada"):
+    return logging.LogRecord("root", logging.INFO, "print_thread.py", lineno, message, None, None)
+
+
+def test_rate_limit_counts_suppressed_records_per_call_site(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr("app_logging.time.monotonic", lambda: now[0])
+    rate_limit = RateLimitFilter(max_records=2, window=1.0)
+
+    assert [rate_limit.filter(make_record(10)) for _ in range(5)] == [True, True, False, False, False]
+    assert rate_limit.filter(make_record(20))  # Otra línea de código tiene su propio límite
+
+    now[0] = 1.5
+    record = make_record(10)
+    assert rate_limit.filter(record)
+    assert record.getMessage() == "Impresión realizada (3 mensajes similares suprimidos)"
+
+
+def test_zpl_digest_is_short_and_stable():
+    digest = zpl_digest("^XA^FDRefacción^FS^XZ")
+    assert digest == zpl_digest("^XA^FDRefacción^FS^XZ")
+    assert digest != zpl_digest("^XA^FDOtra^FS^XZ")
+    assert len(digest) == 12
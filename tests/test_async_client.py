@@ -0,0 +1,106 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from api import AsyncApiClient
+from metrics import API_LATENCY, LatencySummary, metrics
+from tracing import Tracer
+
+
+def test_concurrent_item_lookups_on_the_loop(qtbot, stub_api_server, stub_api):
+    stub_api_server.delay = 0.05
+    client = AsyncApiClient(stub_api)
+    try:
+        futures = [client.get_item(f"SKU{index}", {"label_size": "4_x_2_5", "qty": "2"}) for index in range(40)]
+        items = [future.result(timeout=10) for future in futures]
+    finally:
+        client.close()
+
+    assert [item["inventory_id"] for item in items] == [f"SKU{index}" for index in range(40)]
+    assert all("^PQ2," in item["label"] for item in items)
+    assert len(stub_api_server.requests) == 40
+
+
+def test_finished_signal_is_delivered_on_the_gui_thread(qtbot, stub_api_server, stub_api):
+    client = AsyncApiClient(stub_api)
+    try:
+        future = client.get_item("SKU1", {"label_size": "4_x_2_5"})
+        with qtbot.waitSignal(future.finished, timeout=5000) as blocker:
+            pass
+    finally:
+        client.close()
+
+    assert blocker.args[0]["inventory_id"] == "SKU1"
+
+
+def test_cancelled_lookup_does_not_emit(qtbot, stub_api_server, stub_api):
+    stub_api_server.delay = 0.5
+    client = AsyncApiClient(stub_api)
+    results = []
+    try:
+        future = client.get_item("SLOW", {"label_size": "4_x_2_5"})
+        future.finished.connect(results.append)
+        time.sleep(0.1)
+        assert future.cancel()
+        qtbot.wait(800)
+    finally:
+        client.close()
+
+    assert future.cancelled()
+    assert results == []
+
+
+def test_httpx_lookup_retries_with_the_interceptor_policy(stub_api_server, stub_api, tmp_path, monkeypatch):
+    pytest.importorskip("httpx")
+    tracer = Tracer(enabled=True, log_file=str(tmp_path / "trace.log"))
+    monkeypatch.setattr("api.http_interceptor.tracer", tracer)
+    stub_api.interceptor.retry_policy.base_delay = 0
+    stub_api_server.statuses["DOWN"] = 503
+    latency_count = (metrics.latency(API_LATENCY) or LatencySummary(0, 0, 0, 0, 0)).count
+    client = AsyncApiClient(stub_api)
+    try:
+        assert client.get_item("DOWN", {"label_size": "4_x_2_5"}).result(timeout=5) is None
+    finally:
+        client.close()
+
+    # Tres intentos (los 5xx se reintentan), cada uno medido y con su span
+    assert len(stub_api_server.requests) == 3
+    assert metrics.latency(API_LATENCY).count == latency_count + 3
+    assert [(span.name, span.args["attempt"], span.args["status"]) for span in tracer.spans()] == [("api.request", attempt, 503) for attempt in (1, 2, 3)]
+
+
+def test_httpx_lookup_fails_fast_while_the_breaker_is_open(stub_api_server, stub_api):
+    pytest.importorskip("httpx")
+    circuit_breaker = stub_api.interceptor.circuit_breaker
+    for _ in range(circuit_breaker.failure_threshold):
+        circuit_breaker.record_failure()
+    client = AsyncApiClient(stub_api)
+    try:
+        assert client.get_item("SKU1", {"label_size": "4_x_2_5"}).result(timeout=5) is None
+    finally:
+        client.close()
+
+    assert circuit_breaker.is_open
+    assert stub_api_server.requests == []
+
+
+def test_scan_and_prefetch_of_one_item_send_one_request(stub_api_server, stub_api):
+    stub_api_server.delay = 0.3
+    query = {"label_size": "4_x_2_5"}
+    client = AsyncApiClient(stub_api)
+    try:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            # Precarga (loop) antes que el escaneo (hilo) de SKU1; al revés con SKU2
+            prefetch = client.get_item("SKU1", query)
+            time.sleep(0.05)
+            scan = executor.submit(stub_api.get_mercadolibre_item, "SKU1", query)
+            other_scan = executor.submit(stub_api.get_mercadolibre_item, "SKU2", query)
+            time.sleep(0.05)
+            other_prefetch = client.get_item("SKU2", query)
+            items = [prefetch.result(timeout=5), scan.result(timeout=5), other_scan.result(timeout=5), other_prefetch.result(timeout=5)]
+    finally:
+        client.close()
+
+    assert [item["inventory_id"] for item in items] == ["SKU1", "SKU1", "SKU2", "SKU2"]
+    assert sorted(path.split("?", 1)[0] for path in stub_api_server.requests) == ["/mercadolibre/items/SKU1", "/mercadolibre/items/SKU2"]
@@ -0,0 +1,55 @@
+import time
+
+from api import AsyncApiClient
+
+QUERY = {"label_size": "4_x_2_5", "qty": "3"}
+
+
+def test_batch_endpoint_is_used_when_available(stub_api, stub_api_server):
+    stub_api_server.batch_enabled = True
+    stub_api_server.statuses["MISSING"] = 404
+    ids = [f"SKU{index}" for index in range(120)] + ["MISSING", "SKU0"]
+
+    results = dict(stub_api.get_mercadolibre_items(ids, QUERY))
+
+    assert len(results) == 121 and results["MISSING"] is None
+    assert all("^PQ3," in results[f"SKU{index}"]["label"] for index in range(120))
+    assert stub_api_server.requests == ["/mercadolibre/items/batch?label_size=4_x_2_5"] * 3
+
+    # Los items del lote quedan en caché
+    assert stub_api.get_mercadolibre_item("SKU7", QUERY)["inventory_id"] == "SKU7"
+    assert len(stub_api_server.requests) == 3
+
+
+def test_falls_back_to_bounded_fan_out(stub_api, stub_api_server):
+    stub_api_server.delay = 0.1
+    ids = [f"SKU{index}" for index in range(16)]
+
+    started = time.perf_counter()
+    results = dict(stub_api.get_mercadolibre_items(ids, QUERY, max_concurrency=8))
+    elapsed = time.perf_counter() - started
+
+    assert sorted(results) == sorted(ids)
+    assert stub_api.batch_supported is False
+    # Un intento de lote (404, sin reintentos) y luego 16 peticiones individuales de a 8: ~2 rondas, no 16
+    assert len(stub_api_server.requests) == 17
+    assert elapsed < 0.8
+
+    # Ya se sabe que no hay endpoint de lote: no se vuelve a intentar
+    dict(stub_api.get_mercadolibre_items(["OTHER"], QUERY))
+    assert stub_api_server.requests[-1].startswith("/mercadolibre/items/OTHER")
+
+
+def test_async_batch_streams_items(qtbot, stub_api, stub_api_server):
+    stub_api_server.delays = {"SLOW": 0.3}
+    stub_api.get_mercadolibre_item("CACHED", QUERY)
+    client = AsyncApiClient(stub_api)
+    received = []
+    try:
+        batch = client.get_items(["SLOW", "FAST", "CACHED"], QUERY, on_item=lambda inventory_id, item: received.append(inventory_id))
+        with qtbot.waitSignal(batch.finished, timeout=5000):
+            pass
+    finally:
+        client.close()
+
+    assert received == ["CACHED", "FAST", "SLOW"]
@@ -0,0 +1,106 @@
+import time
+import types
+
+from api import CatalogMirror
+
+
+def make_change(inventory_id, updated_at, label_size="4_x_2_5", keys=(), deleted=False):
+    item = None
+    if not deleted:
+        item = {
+            "inventory_id": inventory_id,
+            "label": f"^XA^FO10,10^BCN,80,Y,N^FD{inventory_id}^FS^PQ1,0,1,Y^XZ",
+            "pictures": [{"url": f"https://example.com/{inventory_id}.jpg"}],
+            "tecneu_item_relationships": [],
+            "label_size": label_size,
+        }
+    return {"inventory_id": inventory_id, "updated_at": updated_at, "keys": list(keys), "item": item}
+
+
+def test_delta_sync_follows_the_cursor(stub_api, stub_api_server):
+    stub_api_server.catalog = [make_change(f"SKU{index}", f"2025-01-01T00:00:{index:02d}") for index in range(25)]
+    sync = stub_api.catalog_sync
+    sync.page_size = 10
+
+    assert sync.sync("4_x_2_5") == 25
+    assert len(stub_api_server.requests) == 3
+    assert stub_api.catalog_mirror.count("4_x_2_5") == 25
+
+    # Solo se traen los cambios posteriores al cursor (incluidas las bajas)
+    stub_api_server.catalog.append(make_change("SKU3", "2025-01-02T00:00:00", deleted=True))
+    stub_api_server.catalog.append(make_change("NEW", "2025-01-02T00:00:01", keys=["7501234567890"]))
+    assert sync.sync("4_x_2_5") == 2
+    assert "updated_after=2025-01-01T00%3A00%3A24" in stub_api_server.requests[-1]
+    assert stub_api.catalog_mirror.get_item("SKU3", "4_x_2_5") is None
+    assert stub_api.catalog_mirror.get_item("7501234567890", "4_x_2_5")["inventory_id"] == "NEW"
+
+
+def test_search_resolves_from_the_mirror_and_refreshes(stub_api, stub_api_server):
+    stub_api_server.delay = 0.3
+    stub_api.catalog_mirror.apply_changes("4_x_2_5", [make_change("SKU1", "2025-01-01T00:00:00")])
+    stub_api.catalog_mirror.mark_synced("4_x_2_5")
+
+    started = time.perf_counter()
+    item = stub_api.get_mercadolibre_item("SKU1", {"label_size": "4_x_2_5", "qty": "4"})
+    assert time.perf_counter() - started < 0.1
+    assert "^PQ4," in item["label"]
+
+    # La revalidación en segundo plano deja el item de la API en la caché
+    deadline = time.monotonic() + 3
+    while stub_api.item_cache.get(("SKU1", (("label_size", "4_x_2_5"),))) is None and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert len(stub_api_server.requests) == 1
+
+
+def test_mirror_without_changes_feed(stub_api, stub_api_server):
+    assert stub_api.catalog_sync.sync("4_x_2_5") == 0
+    assert stub_api.catalog_sync.supported is False
+
+
+def test_old_mirrored_item_is_not_served_without_a_changes_feed(stub_api, stub_api_server):
+    stub_api.catalog_mirror.apply_changes("4_x_2_5", [make_change("SKU1", "2025-01-01T00:00:00")])
+    stub_api.catalog_mirror.mark_synced("4_x_2_5")
+    stub_api_server.item_extra = {"precio": 10}
+    query = {"label_size": "4_x_2_5"}
+
+    # Sin feed de cambios nadie actualiza la copia: la búsqueda espera a la API
+    assert stub_api.catalog_sync.sync("4_x_2_5") == 0
+    assert stub_api.get_mercadolibre_item("SKU1", query)["precio"] == 10
+    assert stub_api_server.requests[-1].startswith("/mercadolibre/items/SKU1")
+
+    # Sin conexión (breaker abierto) la copia sí se usa, aunque sea vieja
+    stub_api.item_cache.clear()
+    circuit_breaker = stub_api.interceptor.circuit_breaker
+    for _ in range(circuit_breaker.failure_threshold):
+        circuit_breaker.record_failure()
+    requests_before = len(stub_api_server.requests)
+    assert stub_api.get_mercadolibre_item("SKU1", query)["precio"] == 10
+    assert len(stub_api_server.requests) == requests_before
+
+
+def test_mirror_is_not_served_after_the_last_sync_gets_old(stub_api, stub_api_server, monkeypatch):
+    stub_api_server.catalog = [make_change("SKU1", "2025-01-01T00:00:00")]
+    assert stub_api.catalog_sync.sync("4_x_2_5") == 1
+    assert stub_api.catalog_sync.is_current("4_x_2_5")
+    requests_after_sync = len(stub_api_server.requests)
+
+    later = time.time() + stub_api.catalog_sync.max_age + 1
+    monkeypatch.setattr("api.catalog_mirror.time", types.SimpleNamespace(time=lambda: later))
+    assert not stub_api.catalog_sync.is_current("4_x_2_5")
+    assert stub_api.get_mercadolibre_item("SKU1", {"label_size": "4_x_2_5"}) is not None
+    assert len(stub_api_server.requests) == requests_after_sync + 1
+
+
+def test_mirror_persists_on_disk(tmp_path):
+    path = str(tmp_path / "catalog.sqlite3")
+    mirror = CatalogMirror(path)
+    mirror.apply_changes("8_x_5", [make_change("SKU9", "2025-01-01T00:00:00", label_size="8_x_5")], cursor="2025-01-01T00:00:00")
+    mirror.close()
+
+    mirror = CatalogMirror(path)
+    try:
+        assert mirror.get_item("SKU9", "8_x_5")["label_size"] == "8_x_5"
+        assert mirror.get_item("SKU9", "4_x_2_5") is None
+        assert mirror.sync_cursor("8_x_5") == "2025-01-01T00:00:00"
+    finally:
+        mirror.close()
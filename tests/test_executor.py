@@ -0,0 +1,95 @@
+import threading
+
+from workers.executor import INTERACTIVE_API, ZPL_LINT, PoolSpec, WorkloadExecutor
+
+
+def make_executor(**spec):
+    return WorkloadExecutor({"pool": PoolSpec(1, **spec)})
+
+
+def occupy(executor, pool_name="pool"):
+    """Ocupa todos los hilos del pool hasta que se libere el evento retornado."""
+    threads = executor.max_threads(pool_name)
+    started = threading.Semaphore(0)
+    release = threading.Event()
+
+    def blocker():
+        started.release()
+        release.wait(5)
+
+    for _ in range(threads):
+        executor.submit(pool_name, blocker)
+    for _ in range(threads):
+        assert started.acquire(timeout=5)
+    return release
+
+
+def test_full_queue_drops_oldest_waiting_task():
+    executor = make_executor(queue_limit=2)
+    ran = []
+    release = occupy(executor)
+    for name in ("a", "b", "c"):
+        assert executor.submit("pool", lambda name=name: ran.append(name))
+    release.set()
+    assert executor.wait_for_done("pool", 5000)
+
+    assert ran == ["b", "c"]
+    stats = executor.stats()[0]
+    assert (stats.submitted, stats.completed, stats.dropped, stats.queued, stats.active) == (4, 3, 1, 0, 0)
+
+
+def test_full_queue_rejects_new_task_without_drop_oldest():
+    executor = make_executor(queue_limit=1, drop_oldest=False)
+    ran = []
+    release = occupy(executor)
+    assert executor.submit("pool", lambda: ran.append("a"))
+    assert not executor.submit("pool", lambda: ran.append("b"))
+    release.set()
+    executor.wait_for_done("pool", 5000)
+
+    assert ran == ["a"]
+    assert executor.stats()[0].rejected == 1
+
+
+def test_priority_orders_queue_and_wait_is_measured():
+    executor = make_executor()
+    ran = []
+    release = occupy(executor)
+    executor.submit("pool", lambda: ran.append("low"))
+    executor.submit("pool", lambda: ran.append("high"), priority=1)
+    threading.Timer(0.05, release.set).start()
+    executor.wait_for_done("pool", 5000)
+
+    assert ran == ["high", "low"]
+    assert executor.stats()[0].wait_max_ms >= 40
+
+
+def test_clear_discards_waiting_tasks():
+    executor = make_executor()
+    ran = []
+    release = occupy(executor)
+    executor.submit("pool", lambda: ran.append("a"))
+    assert executor.pending("pool") == 2
+    executor.clear("pool")
+    release.set()
+    executor.wait_for_done("pool", 5000)
+
+    assert ran == []
+    assert executor.pending("pool") == 0
+    assert executor.stats()[0].dropped == 1
+
+
+def test_lint_submissions_do_not_evict_queued_searches():
+    executor = WorkloadExecutor()
+    ran = []
+    releases = [occupy(executor, INTERACTIVE_API), occupy(executor, ZPL_LINT)]
+    executor.submit(INTERACTIVE_API, lambda: ran.append("búsqueda"))
+    # Una validación por cada pausa al escribir: solo se conserva la más reciente
+    for version in range(20):
+        executor.submit(ZPL_LINT, lambda version=version: ran.append(version))
+    for release in releases:
+        release.set()
+    assert executor.wait_for_done(INTERACTIVE_API, 5000) and executor.wait_for_done(ZPL_LINT, 5000)
+
+    assert sorted(ran, key=str) == [19, "búsqueda"]
+    assert {stats.name: stats.dropped for stats in executor.stats()} == {INTERACTIVE_API: 0, ZPL_LINT: 19}
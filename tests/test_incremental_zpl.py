@@ -0,0 +1,85 @@
+import random
+import re
+
+import pytest
+
+from zpl import IncrementalZplTokens, tokenize
+
+# Fragmentos con los que se arman los textos y las ediciones: prefijos sueltos, comandos, datos y saltos de línea
+FRAGMENTS = ["^", "~", "^XA", "^XZ", "^FO10,20", "^BCN,80,Y,N", "^BCR", "^FD", "^FS", "~DGR:A.GRF,4,1,", "SKU", "1", ",", " ", "\n", "A"]
+# Búsqueda con la que el editor extraía el código de barras antes de los tokens
+BARCODE_PATTERN = re.compile(r"\^BCN.*?\^FD(.*?)\^FS", re.DOTALL)
+
+
+def random_text(rng, max_fragments):
+    return "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, max_fragments)))
+
+
+def regex_barcode(text):
+    match = BARCODE_PATTERN.search(text)
+    return match.group(1).strip() if match else None
+
+
+def assert_matches_full_tokenize(incremental):
+    expected = tokenize(incremental.text)
+    tokens = incremental.tokens()
+    assert tokens.starts == expected.starts
+    assert tokens.commands == expected.commands
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_random_edits_match_full_tokenize(seed):
+    rng = random.Random(seed)
+    text = random_text(rng, 30)
+    incremental = IncrementalZplTokens(text)
+
+    for _ in range(40):
+        position = rng.randint(0, len(text))
+        chars_removed = rng.randint(0, min(len(text) - position, 12))
+        inserted_text = random_text(rng, 4)
+        text = text[:position] + inserted_text + text[position + chars_removed :]
+        incremental.apply_change(position, chars_removed, inserted_text)
+        assert incremental.text == text
+
+        # A veces se acumulan varias ediciones antes de consultar (rango pendiente fusionado)
+        if rng.random() < 0.4:
+            assert_matches_full_tokenize(incremental)
+            assert incremental.extract_barcode() == regex_barcode(text)
+
+    assert_matches_full_tokenize(incremental)
+    assert incremental.extract_barcode() == regex_barcode(text)
+
+
+@pytest.mark.parametrize(
+    "zpl_text, expected",
+    [
+        ("^XA^FO10,10^BCN,80,Y,N^FDSKU123^FS^XZ", "SKU123"),
+        ("^XA^BCN,80^FD  SKU 123 \n^FS^XZ", "SKU 123"),  # Se recortan los espacios
+        ("^XA^FDTítulo^FS^BCN,80^FO5,5^FDSKU9^FS^XZ", "SKU9"),  # Solo cuenta el ^FD posterior al ^BCN
+        ("^XA^BCR,80^FDROTADO^FS^BCN,80^FDNORMAL^FS^XZ", "NORMAL"),  # Otra orientación no cuenta
+        ("^XA^BCN,80~JA^FDSKU7^FS^XZ", "SKU7"),  # Comandos de control intermedios
+        ("^XA^BQN,2,5^FDQA,URL^FS^XZ", None),  # QR, no Code 128
+        ("^XA^FDSKU1^FS^XZ", None),  # Sin código de barras
+        ("^XA^BCN,80^FS^XZ", None),  # Sin ^FD
+        ("^XA^BCN,80^FDSKU1^XZ", None),  # ^FD sin ^FS
+        ("", None),
+    ],
+)
+def test_extract_barcode(zpl_text, expected):
+    assert IncrementalZplTokens(zpl_text).extract_barcode() == expected
+    assert regex_barcode(zpl_text) == expected
+
+
+def test_extract_barcode_follows_edits():
+    zpl_text = "^XA^BCN,80^FDSKU1^FS^XZ"
+    incremental = IncrementalZplTokens(zpl_text)
+    assert incremental.extract_barcode() == "SKU1"
+
+    data_start = zpl_text.index("SKU1")
+    incremental.apply_change(data_start, 4, "SKU22")
+    assert incremental.extract_barcode() == "SKU22"
+
+    # Borrar el ^FS deja el dato sin cerrar
+    fs_start = incremental.text.index("^FS")
+    incremental.apply_change(fs_start, 3, "")
+    assert incremental.extract_barcode() is None
@@ -0,0 +1,128 @@
+import json
+import threading
+import time
+import types
+
+import pytest
+
+from api.item_cache import ItemCache
+from api.lazy_json import LazyJsonObject
+
+QUERY = {"label_size": "4_x_2_5"}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Reloj de la caché controlado por la prueba (`clock.now`, en segundos)."""
+    fake = types.SimpleNamespace(now=1000.0)
+    fake.time = lambda: fake.now
+    monkeypatch.setattr("api.item_cache.time", fake)
+    return fake
+
+
+def test_entry_is_fresh_then_stale_then_dropped(clock):
+    cache = ItemCache(ttl=300, stale_ttl=600)
+    key = ItemCache.make_key("SKU1", QUERY)
+    cache.put(key, {"label": "^XA^XZ"}, etag='"v1"')
+
+    assert cache.get(key) == {"label": "^XA^XZ"}
+
+    # Vencida: ya no se da como vigente, pero puede servirse mientras se revalida
+    clock.now += 301
+    assert cache.get(key) is None
+    entry = cache.lookup(key)
+    assert entry.etag == '"v1"' and not cache.is_fresh(entry)
+
+    # El 304 la vuelve vigente sin cambiar el item
+    cache.refresh(key)
+    assert cache.get(key) == {"label": "^XA^XZ"}
+
+    # Pasado ttl + stale_ttl no se sirve y se descarta
+    clock.now += 901
+    assert cache.lookup(key) is None
+    assert cache._entries == {}
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ItemCache(max_entries=2)
+    keys = [ItemCache.make_key(f"SKU{index}", QUERY) for index in range(3)]
+    cache.put(keys[0], {"label": "0"})
+    cache.put(keys[1], {"label": "1"})
+    cache.get(keys[0])  # SKU0 pasa a ser el más reciente
+    cache.put(keys[2], {"label": "2"})
+
+    assert cache.contains(keys[0]) and cache.contains(keys[2])
+    assert not cache.contains(keys[1])
+
+
+def test_saved_entries_keep_the_raw_item_json(tmp_path, clock):
+    path = tmp_path / "items.json"
+    cache = ItemCache(ttl=300, stale_ttl=600, persist_path=str(path))
+    raw = b'{"label": "^XA^FDRefacci\xc3\xb3n^FS^XZ",  "precio": 1.50}'
+    lazy_key = ItemCache.make_key("SKU1", QUERY)
+    cache.put(lazy_key, LazyJsonObject(raw), etag='"v1"')
+    clock.now += 500
+    plain_key = ItemCache.make_key("SKU2", {"label_size": "4_x_2_5", "fields": "label"})
+    cache.put(plain_key, {"label": "^XA^FDDos^FS^XZ"})
+    cache.save()
+
+    # El item sin decodificar se escribe tal como llegó (espacios y "1.50" incluidos)
+    assert raw.decode("utf-8") in path.read_text(encoding="utf-8")
+
+    loaded = ItemCache(ttl=300, stale_ttl=600, persist_path=str(path))
+    assert loaded.lookup(lazy_key) == (json.loads(raw), '"v1"', 1000.0)
+    assert loaded.get(plain_key) == {"label": "^XA^FDDos^FS^XZ"}
+
+    # Al cargar se descartan las entradas que ya no pueden servirse
+    clock.now += 501
+    loaded = ItemCache(ttl=300, stale_ttl=600, persist_path=str(path))
+    assert loaded.lookup(lazy_key) is None
+    assert loaded.lookup(plain_key) is not None  # Vencida, pero todavía servible
+
+
+def test_stale_item_is_served_while_revalidated_with_etag(qtbot, stub_api, stub_api_server, clock):
+    item = stub_api.get_mercadolibre_item("SKU1", QUERY)
+    cache_key = ItemCache.make_key("SKU1", QUERY)
+    assert stub_api.item_cache.lookup(cache_key).etag
+
+    # Vencida: se responde con la entrada en caché sin esperar a la API, que revalida con If-None-Match
+    clock.now += stub_api.item_cache.ttl + 1
+    stub_api_server.delay = 0.3
+    started = time.perf_counter()
+    assert stub_api.get_mercadolibre_item("SKU1", QUERY) == item
+    assert time.perf_counter() - started < 0.2
+
+    qtbot.waitUntil(lambda: stub_api_server.not_modified == 1, timeout=2000)
+    qtbot.waitUntil(lambda: stub_api.item_cache.get(cache_key) is not None, timeout=2000)
+    assert stub_api.item_cache.lookup(cache_key).item is item
+    assert len(stub_api_server.requests) == 2
+
+    # Si el item cambió en el backend, la revalidación guarda la respuesta nueva
+    stub_api_server.item_extra = {"precio": 10}
+    clock.now += stub_api.item_cache.ttl + 1
+    assert "precio" not in stub_api.get_mercadolibre_item("SKU1", QUERY)
+    qtbot.waitUntil(lambda: stub_api.item_cache.get(cache_key) is not None, timeout=2000)
+    assert stub_api.get_mercadolibre_item("SKU1", QUERY)["precio"] == 10
+    assert stub_api_server.not_modified == 1
+
+
+def test_stale_items_are_revalidated_on_a_bounded_pool(qtbot, stub_api, stub_api_server, clock):
+    from workers.executor import CACHE_REVALIDATION, executor
+
+    inventory_ids = [f"SKU{index}" for index in range(40)]
+    for inventory_id in inventory_ids:
+        stub_api.item_cache.put(ItemCache.make_key(inventory_id, QUERY), {"label": "^XA^XZ"}, etag='"v1"')
+
+    # Cuarenta entradas vencidas a la vez: se revalidan en los hilos del pool y lo que no cabe en su cola se omite
+    clock.now += stub_api.item_cache.ttl + 1
+    stub_api_server.delay = 0.2
+    threads_before = threading.active_count()
+    for inventory_id in inventory_ids:
+        assert stub_api.get_mercadolibre_item(inventory_id, QUERY) == {"label": "^XA^XZ"}
+
+    spec = executor.specs[CACHE_REVALIDATION]
+    assert executor.pending(CACHE_REVALIDATION) <= spec.max_threads + spec.queue_limit
+    assert threading.active_count() <= threads_before + spec.max_threads
+    # Las llaves rechazadas no quedan marcadas: la próxima consulta vuelve a revalidarlas
+    assert len(stub_api._revalidating) <= spec.max_threads + spec.queue_limit
+    qtbot.waitUntil(lambda: not stub_api._revalidating, timeout=10000)
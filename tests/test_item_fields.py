@@ -0,0 +1,49 @@
+import json
+
+from api import LazyJsonObject
+from api.endpoints import DISPLAY_FIELDS, LABEL_FIELDS
+
+EXTRA = {
+    "pictures": [{"url": "https://example.com/1.jpg"}],
+    "tecneu_item_relationships": [],
+    "variations": [{"id": index, "attributes": [{"name": "color", "value": "rojo"}] * 5} for index in range(50)],
+}
+
+
+def test_projection_is_sent_and_cached_separately(stub_api, stub_api_server):
+    stub_api_server.item_extra = EXTRA
+
+    item = stub_api.get_mercadolibre_item("SKU1", {"label_size": "4_x_2_5", "fields": LABEL_FIELDS})
+    assert set(item) == {"label"}
+    assert "fields=label" in stub_api_server.requests[-1]
+
+    # Misma proyección en otro orden: misma llave de caché
+    stub_api.get_mercadolibre_item("SKU1", {"label_size": "4_x_2_5", "fields": "label"})
+    assert len(stub_api_server.requests) == 1
+
+    item = stub_api.get_mercadolibre_item("SKU1", {"label_size": "4_x_2_5", "fields": DISPLAY_FIELDS})
+    assert set(item) == set(DISPLAY_FIELDS)
+    assert len(stub_api_server.requests) == 2
+
+
+def test_full_cached_item_satisfies_a_projection(stub_api, stub_api_server):
+    stub_api_server.item_extra = EXTRA
+
+    stub_api.get_mercadolibre_item("SKU1", {"label_size": "4_x_2_5"})
+    item = stub_api.get_mercadolibre_item("SKU1", {"label_size": "4_x_2_5", "fields": LABEL_FIELDS, "qty": "2"})
+
+    assert "^PQ2," in item["label"]
+    assert len(stub_api_server.requests) == 1
+
+
+def test_stored_responses_are_not_decoded(stub_api, stub_api_server):
+    stub_api_server.item_extra = EXTRA
+
+    # Sin cantidad que aplicar, nadie lee el item: llega a la caché y a la copia local sin decodificar
+    item = stub_api.get_mercadolibre_item("SKU1", {"label_size": "4_x_2_5"})
+    assert isinstance(item, LazyJsonObject) and not item.decoded
+    assert stub_api.catalog_mirror.get_item("SKU1", "4_x_2_5").json_text() == item.json_text()
+
+    assert item["variations"][3]["id"] == 3
+    assert item.decoded
+    assert json.loads(json.dumps([item], default=dict))[0]["inventory_id"] == "SKU1"
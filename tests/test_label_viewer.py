@@ -0,0 +1,36 @@
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice, Qt
+from PyQt5.QtGui import QImage
+
+from ui.zpl_preview import LabelViewer, preview_cache
+
+
+def png_bytes(color):
+    image = QImage(40, 20, QImage.Format_RGB32)
+    image.fill(color)
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.WriteOnly)
+    image.save(buffer, "PNG")
+    return bytes(data)
+
+
+def test_previous_label_is_not_shown_while_a_cached_png_is_decoded(qtbot):
+    viewer = LabelViewer()
+    qtbot.addWidget(viewer)
+    first_zpl, second_zpl = "^XA^FDPrimera^FS^XZ", "^XA^FDSegunda^FS^XZ"
+    preview_cache.put(first_zpl, png_bytes(Qt.red))
+    preview_cache.put(second_zpl, png_bytes(Qt.blue))
+
+    viewer.preview_label(first_zpl)
+    qtbot.waitUntil(lambda: viewer.last_load_successful, timeout=2000)
+    first_pixmap = viewer.last_pixmap
+
+    # Hasta que llega la decodificación de la segunda etiqueta no hay imagen vigente que reutilizar
+    viewer.preview_label(second_zpl)
+    assert not viewer.last_load_successful
+    assert viewer.last_pixmap is None
+    assert viewer.label.pixmap() is None or viewer.label.pixmap().isNull()
+
+    qtbot.waitUntil(lambda: viewer.last_load_successful, timeout=2000)
+    assert viewer.last_pixmap is not first_pixmap
+    assert viewer.last_pixmap.toImage().pixelColor(0, 0) == Qt.blue
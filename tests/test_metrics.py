@@ -0,0 +1,40 @@
+from metrics import Metrics
+
+
+def test_latency_percentiles_use_the_most_recent_samples():
+    metrics = Metrics(latency_samples=100)
+    for ms in range(1000):
+        metrics.observe("api", ms)
+
+    summary = metrics.latency("api")
+    assert summary.count == 1000
+    assert (summary.p50_ms, summary.p95_ms, summary.max_ms) == (950, 995, 999)
+    assert metrics.latency("preview_render") is None
+
+
+def test_hit_rate_and_events_per_minute(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("metrics.time.monotonic", lambda: now[0])
+    metrics = Metrics(rate_window=60.0)
+    for hit in (True, True, True, False):
+        metrics.cache_access("item_cache", hit)
+    assert metrics.hit_rate("item_cache") == (0.75, 4)
+    assert metrics.hit_rate("preview_cache") == (None, 0)
+
+    metrics.event("labels_printed", 10)
+    now[0] = 130.0
+    metrics.event("labels_printed", 5)
+    assert metrics.per_minute("labels_printed") == 15
+    now[0] = 170.0  # Los primeros 10 quedan fuera de la ventana
+    assert metrics.per_minute("labels_printed") == 5
+    assert metrics.total("labels_printed") == 15
+
+
+def test_gauges_are_read_on_demand():
+    metrics = Metrics()
+    pending = [3]
+    metrics.set_gauge("printer_queue", lambda: pending[0])
+    pending[0] = 1
+    assert metrics.gauge("printer_queue") == 1
+    metrics.set_gauge("printer_queue", None)
+    assert metrics.gauge("printer_queue") is None
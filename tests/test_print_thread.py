@@ -0,0 +1,111 @@
+import pytest
+from PyQt5.QtCore import Qt
+
+from config import MAX_DELAY
+from metrics import LABELS_PRINTED, metrics
+from print_thread import PrinterUnavailableError, PrintThread
+
+LABEL = "^XA^FO20,20^FDTEC-00001^FS^PQ1,0,1,Y^XZ"
+
+
+class RecordingPrinter:
+    def __init__(self):
+        self.jobs = []
+
+    def output(self, zpl):
+        self.jobs.append(zpl)
+
+
+def test_all_copies_are_sent_in_one_job_at_max_delay():
+    printer = RecordingPrinter()
+    thread = PrintThread(5, MAX_DELAY, LABEL, "simulada", transport=printer)
+    thread.start()
+    assert thread.wait(5000)
+
+    assert len(printer.jobs) == 1
+    assert "^PQ5,0,1,Y" in printer.jobs[0]
+    assert thread.copies == 0
+
+
+def test_print_and_pause_sends_a_single_copy():
+    printer = RecordingPrinter()
+    thread = PrintThread(3, 1, LABEL, "simulada", transport=printer)
+    thread.print_and_pause()
+
+    assert len(printer.jobs) == 1
+    assert "^PQ1,0,1,Y" in printer.jobs[0]
+    assert thread.pause
+
+
+MULTI_LABEL = "^XA^FO20,20^FDUNO^FS^PQ2,0,1,Y^XZ\n^XA^FO20,20^FDDOS^FS^XZ"
+
+
+def run_print_job(copies, delay, zpl):
+    """Ejecuta el trabajo completo sin esperas entre etiquetas; retorna el ZPL enviado y las copias restantes emitidas."""
+    printer = RecordingPrinter()
+    thread = PrintThread(copies, delay, zpl, "simulada", transport=printer)
+    thread.wait_with_delay = lambda: None
+    remaining = []
+    thread.update_signal.connect(remaining.append, Qt.DirectConnection)
+    thread.start()
+    assert thread.wait(5000)
+    return printer.jobs, remaining
+
+
+def test_single_label_is_sent_one_copy_at_a_time():
+    jobs, remaining = run_print_job(3, 1, LABEL.replace("^PQ1", "^PQ7"))
+
+    assert jobs == [LABEL] * 3
+    assert remaining == ["2", "1", "0"]
+
+
+def test_multi_label_document_is_sent_once_per_pass():
+    printed_before = metrics.total(LABELS_PRINTED)
+    # Cada bloque conserva su ^PQ: `copies` cuenta pasadas del documento completo
+    jobs, remaining = run_print_job(3, 1, MULTI_LABEL)
+
+    assert jobs == [MULTI_LABEL] * 3
+    assert remaining == ["2", "1", "0"]
+    # Cada pasada imprime 3 etiquetas (^PQ2 en el primer bloque y 1 en el segundo)
+    assert metrics.total(LABELS_PRINTED) - printed_before == 9
+
+
+def test_multi_label_passes_are_sent_in_one_job_at_max_delay():
+    printed_before = metrics.total(LABELS_PRINTED)
+    jobs, remaining = run_print_job(3, MAX_DELAY, MULTI_LABEL)
+
+    assert jobs == ["\n".join([MULTI_LABEL] * 3)]
+    assert remaining == ["0"]
+    assert metrics.total(LABELS_PRINTED) - printed_before == 9
+
+
+class UnreachableZebra:
+    def __init__(self, queue):
+        self.queue = queue
+
+    def setqueue(self, queue):
+        raise OSError("cola no encontrada")
+
+
+def test_unavailable_printer_raises_from_the_constructor(monkeypatch):
+    monkeypatch.setattr("print_thread.Zebra", None)
+    with pytest.raises(PrinterUnavailableError, match="módulo zebra no está instalado"):
+        PrintThread(1, 1, LABEL, "Zebra ZD420")
+
+    monkeypatch.setattr("print_thread.Zebra", UnreachableZebra)
+    with pytest.raises(PrinterUnavailableError, match="cola de la impresora: cola no encontrada"):
+        PrintThread(1, 1, LABEL, "Zebra ZD420")
+
+
+def test_main_window_reports_an_unavailable_printer(main_window, monkeypatch):
+    monkeypatch.setattr("print_thread.Zebra", UnreachableZebra)
+    errors = []
+    monkeypatch.setattr(main_window, "show_error_message", errors.append)
+    main_window.selected_printer_name = "Zebra ZD420"
+    main_window.zpl_textedit.setPlainText(LABEL)
+    main_window.copies_entry.setValue("2")
+
+    main_window.handle_double_space_press()
+
+    assert errors == ["Error al establecer la cola de la impresora: cola no encontrada."]
+    assert main_window.print_thread is None
@@ -0,0 +1,67 @@
+import threading
+import time
+
+from api import RequestTracker
+
+
+def test_starting_a_request_cancels_the_previous_one():
+    tracker = RequestTracker()
+    first = tracker.start()
+    second = tracker.start()
+
+    assert first.cancelled
+    assert not tracker.is_current(first)
+    assert tracker.is_current(second)
+    assert second.generation > first.generation
+
+    tracker.cancel()
+    assert not tracker.is_current(second)
+
+
+def test_superseded_lookup_is_aborted_and_not_cached(stub_api_server, stub_api):
+    stub_api_server.delays["SLOW_A"] = 0.5
+    tracker = RequestTracker()
+    results = {}
+
+    token_a = tracker.start()
+    thread = threading.Thread(
+        target=lambda: results.setdefault("A", stub_api.get_mercadolibre_item("SLOW_A", {"label_size": "4_x_2_5"}, cancel_event=token_a.cancel_event))
+    )
+    thread.start()
+    time.sleep(0.1)
+
+    # El operador escanea B mientras A sigue en curso
+    token_b = tracker.start()
+    results["B"] = stub_api.get_mercadolibre_item("FAST_B", {"label_size": "4_x_2_5"}, cancel_event=token_b.cancel_event)
+    thread.join(5)
+
+    assert results["A"] is None  # La respuesta de A se descartó al llegar, sin leerla ni guardarla
+    assert stub_api.item_cache.lookup(stub_api.prepare_item_lookup("SLOW_A", {"label_size": "4_x_2_5"}).cache_key) is None
+    assert results["B"]["inventory_id"] == "FAST_B"
+
+
+def test_new_search_cancels_the_previous_one_and_drops_its_result(qtbot, stub_api_server, main_window):
+    stub_api_server.delays["SLOW_A"] = 0.5
+    tracker = main_window.item_request_tracker
+    tokens = []
+    start = tracker.start
+    tracker.start = lambda: tokens.append(start()) or tokens[-1]
+    results = []
+    handle_search_result = main_window.handle_search_result
+
+    def record_result(item, token=None):
+        results.append(item)
+        handle_search_result(item, token)
+
+    main_window.handle_search_result = record_result
+
+    main_window.execute_search("SLOW_A")
+    qtbot.wait(100)
+    main_window.execute_search("FAST_B")
+    qtbot.waitUntil(lambda: len(results) == 2, timeout=5000)
+
+    assert main_window.item_request_tracker is tracker
+    assert len(tokens) == 2
+    assert tokens[0].cancel_event.is_set()  # La petición HTTP de A se abortó
+    assert "FAST_B" in main_window.latest_item_data["label"]
+    assert "FAST_B" in main_window.zpl_textedit.toPlainText()
@@ -0,0 +1,94 @@
+import threading
+import time
+
+from requests.exceptions import InvalidHeader
+
+from api import CircuitBreaker, RetryPolicy
+from api.retry_policy import CLOSED, HALF_OPEN, OPEN
+
+
+def test_not_found_is_not_retried(stub_api, stub_api_server):
+    stub_api_server.statuses["MISSING"] = 404
+
+    assert stub_api.get_mercadolibre_item("MISSING", {}) is None
+    assert len(stub_api_server.requests) == 1
+
+
+def test_server_errors_are_retried_with_backoff(stub_api, stub_api_server):
+    stub_api_server.statuses["FLAKY"] = 503
+    stub_api.interceptor.retry_policy = RetryPolicy(max_attempts=3, base_delay=0.01, max_delay=0.02)
+
+    assert stub_api.get_mercadolibre_item("FLAKY", {}) is None
+    assert len(stub_api_server.requests) == 3
+
+
+def test_breaker_fails_fast_while_open(stub_api, stub_api_server):
+    interceptor = stub_api.interceptor
+    interceptor.retry_policy = RetryPolicy(max_attempts=1)
+    interceptor.circuit_breaker = CircuitBreaker(failure_threshold=2, cooldown=0.2)
+    states = []
+    interceptor.circuit_breaker.add_listener(states.append)
+    stub_api_server.statuses["DOWN"] = 500
+
+    stub_api.get_mercadolibre_item("DOWN", {})
+    stub_api.get_mercadolibre_item("DOWN", {})
+    assert interceptor.circuit_breaker.state == OPEN
+
+    # Abierto: ni siquiera se contacta al backend
+    stub_api.get_mercadolibre_item("OK", {})
+    assert len(stub_api_server.requests) == 2
+
+    # Tras el enfriamiento, la petición de prueba exitosa cierra el circuito
+    time.sleep(0.25)
+    assert interceptor.circuit_breaker.state == HALF_OPEN
+    assert stub_api.get_mercadolibre_item("OK", {})["inventory_id"] == "OK"
+    assert interceptor.circuit_breaker.state == CLOSED
+    assert states == [OPEN, HALF_OPEN, CLOSED]
+
+
+def open_breaker_until_half_open(interceptor):
+    interceptor.retry_policy = RetryPolicy(max_attempts=1)
+    interceptor.circuit_breaker = CircuitBreaker(failure_threshold=1, cooldown=0.1)
+    interceptor.circuit_breaker.record_failure()
+    time.sleep(0.15)
+    assert interceptor.circuit_breaker.state == HALF_OPEN
+
+
+def test_cancelled_half_open_trial_releases_the_breaker(stub_api, stub_api_server):
+    interceptor = stub_api.interceptor
+    open_breaker_until_half_open(interceptor)
+    stub_api_server.delays["SLOW"] = 0.3
+    cancel_event = threading.Event()
+    threading.Timer(0.1, cancel_event.set).start()
+
+    # La petición de prueba se cancela al recibir los encabezados, sin resultado para el breaker
+    assert stub_api.get_mercadolibre_item("SLOW", {}, use_cache=False, cancel_event=cancel_event) is None
+    assert interceptor.circuit_breaker.state == HALF_OPEN
+    assert stub_api.get_mercadolibre_item("OK", {})["inventory_id"] == "OK"
+    assert interceptor.circuit_breaker.state == CLOSED
+
+
+def test_half_open_trial_that_raises_releases_the_breaker(stub_api, monkeypatch):
+    interceptor = stub_api.interceptor
+    open_breaker_until_half_open(interceptor)
+    request = interceptor.session.request
+
+    def invalid_header(*args, **kwargs):
+        raise InvalidHeader("encabezado inválido")
+
+    monkeypatch.setattr(interceptor.session, "request", invalid_header)
+    assert stub_api.get_mercadolibre_item("OK", {}) is None
+    assert interceptor.circuit_breaker.state == HALF_OPEN
+
+    # La siguiente petición puede hacer la prueba
+    monkeypatch.setattr(interceptor.session, "request", request)
+    assert stub_api.get_mercadolibre_item("OK", {})["inventory_id"] == "OK"
+    assert interceptor.circuit_breaker.state == CLOSED
+
+
+def test_backoff_delay_is_bounded():
+    policy = RetryPolicy(base_delay=0.2, max_delay=1.0)
+
+    assert all(0 <= policy.delay(attempt) <= 1.0 for attempt in range(1, 10) for _ in range(20))
+    assert policy.delay(1, retry_after="0.5") == 0.5
+    assert policy.delay(1, retry_after="120") == 1.0
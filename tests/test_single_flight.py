@@ -0,0 +1,88 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from api import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    single_flight = SingleFlight()
+    calls = []
+    started = threading.Event()
+
+    def slow_lookup():
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        return {"label": "^XA^XZ"}
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        leader = executor.submit(single_flight.do, "A1", slow_lookup)
+        started.wait(1)
+        followers = [executor.submit(single_flight.do, "A1", slow_lookup) for _ in range(7)]
+        results = [leader.result()] + [future.result() for future in followers]
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert not single_flight.in_flight("A1")
+
+
+def test_errors_reach_every_waiting_caller():
+    single_flight = SingleFlight()
+    started = threading.Event()
+
+    def failing_lookup():
+        started.set()
+        time.sleep(0.1)
+        raise ValueError("fallo")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(single_flight.do, "A1", failing_lookup)
+        started.wait(1)
+        follower = executor.submit(single_flight.do, "A1", failing_lookup)
+        for future in (leader, follower):
+            with pytest.raises(ValueError):
+                future.result()
+
+
+def test_threads_repeat_the_call_when_the_loop_task_running_it_is_cancelled():
+    single_flight = SingleFlight()
+    started = threading.Event()
+    calls = []
+
+    async def slow_lookup():
+        calls.append("loop")
+        started.set()
+        await asyncio.sleep(5)
+
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    try:
+        leader = asyncio.run_coroutine_threadsafe(single_flight.do_async("A1", slow_lookup), loop)
+        assert started.wait(1)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            follower = executor.submit(single_flight.do, "A1", lambda: calls.append("hilo") or "item")
+            time.sleep(0.05)
+            leader.cancel()
+            # El hilo no recibe la cancelación de la tarea: ejecuta la llamada él mismo
+            assert follower.result(timeout=2) == "item"
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+
+    assert calls == ["loop", "hilo"]
+    assert not single_flight.in_flight("A1")
+
+
+def test_concurrent_item_lookups_hit_the_backend_once(stub_api_server, stub_api):
+    stub_api_server.delay = 0.3
+
+    # Doble escaneo + ZplWorker: mismo item, distinta cantidad (qty no se envía a la API)
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        futures = [executor.submit(stub_api.get_mercadolibre_item, "SKU1", {"label_size": "4_x_2_5", "qty": str(qty)}) for qty in range(6)]
+        items = [future.result() for future in futures]
+
+    assert len(stub_api_server.requests) == 1
+    assert [item["label"].count(f"^PQ{qty},") for qty, item in enumerate(items)] == [1] * 6
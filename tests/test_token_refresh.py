@@ -0,0 +1,63 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from api import AsyncApiClient
+from api.http_interceptor import token_expiry
+from conftest import make_jwt
+
+
+def test_token_expiry_reads_jwt_claims():
+    expires_at, issued_at = token_expiry(make_jwt(120))
+
+    assert abs(expires_at - issued_at - 120) < 1e-6
+    assert token_expiry("no-es-un-jwt") == (None, None)
+    assert token_expiry(None) == (None, None)
+
+
+def test_concurrent_401s_share_one_login(stub_api, stub_api_server):
+    stub_api_server.token_ttl = 60
+    stub_api_server.login_delay = 0.2  # Los demás hilos reciben su 401 mientras el primero sigue en login
+
+    with ThreadPoolExecutor(8) as pool:
+        items = list(pool.map(lambda i: stub_api.get_mercadolibre_item(f"ITEM{i}", {}, use_cache=False), range(8)))
+
+    assert all(item is not None for item in items)
+    assert stub_api_server.logins == 1
+
+
+def test_token_is_refreshed_before_it_expires(stub_api, stub_api_server):
+    stub_api_server.token_ttl = 1.0
+    interceptor = stub_api.interceptor
+    assert interceptor.login()
+    assert stub_api_server.logins == 1
+
+    # La renovación en segundo plano ocurre antes del vencimiento: ninguna petición recibe 401
+    deadline = time.monotonic() + 2.5
+    while time.monotonic() < deadline:
+        assert stub_api.get_mercadolibre_item("ITEM", {}, use_cache=False) is not None
+        time.sleep(0.05)
+
+    assert stub_api_server.rejected == 0
+    assert stub_api_server.logins >= 3
+
+
+def test_expired_token_is_renewed_before_the_request(stub_api, stub_api_server):
+    stub_api_server.token_ttl = 60
+    stub_api.interceptor.access_token = make_jwt(-1)
+
+    assert stub_api.get_mercadolibre_item("ITEM", {}, use_cache=False) is not None
+    assert stub_api_server.rejected == 0
+    assert stub_api_server.logins == 1
+
+
+def test_async_lookup_renews_an_expired_token_before_the_request(stub_api, stub_api_server):
+    stub_api_server.token_ttl = 60
+    stub_api.interceptor.access_token = make_jwt(-1)
+    client = AsyncApiClient(stub_api)
+    try:
+        assert client.get_item("ITEM", {}).result(timeout=5) is not None
+    finally:
+        client.close()
+
+    assert stub_api_server.rejected == 0
+    assert stub_api_server.logins == 1
@@ -0,0 +1,55 @@
+import json
+import threading
+
+from app_logging import flush_logs
+from tracing import NULL_SPAN, Tracer
+
+
+def make_tracer(tmp_path, **kwargs):
+    return Tracer(enabled=True, log_file=str(tmp_path / "trace.log"), export_dir=str(tmp_path / "traces"), **kwargs)
+
+
+def test_disabled_tracer_returns_shared_null_span(tmp_path):
+    tracer = Tracer(enabled=False, log_file=str(tmp_path / "trace.log"))
+    with tracer.span("api.request", "api") as span:
+        span.set(status=200)
+    tracer.start_scan("TEC-1")
+    tracer.end_scan()
+
+    assert span is NULL_SPAN
+    assert tracer.spans() == []
+    assert not (tmp_path / "trace.log").exists()
+
+
+def test_spans_are_logged_and_exported_as_chrome_trace(tmp_path):
+    tracer = make_tracer(tmp_path)
+    tracer.start_scan("TEC-1")
+    with tracer.span("api.request", "api", endpoint="/mercadolibre/items/TEC-1") as span:
+        span.set(status=200)
+    worker = threading.Thread(target=lambda: tracer.span("json.decode", "decode", size=10).end(), name="worker")
+    worker.start()
+    worker.join()
+    tracer.end_scan(found=True)
+    tracer.start_scan("TEC-2")
+    tracer.span("zpl.parse", "zpl").end()
+
+    path = tracer.export_chrome_trace(scan=1)
+    events = json.loads(open(path, encoding="utf-8").read())["traceEvents"]
+    spans = {event["name"]: event for event in events if event["ph"] == "X"}
+    assert set(spans) == {"scan", "api.request", "json.decode"}
+    assert spans["api.request"]["args"] == {"scan": 1, "endpoint": "/mercadolibre/items/TEC-1", "status": 200}
+    assert {event["args"]["name"] for event in events if event["ph"] == "M"} >= {"worker"}
+
+    flush_logs()
+    lines = [json.loads(line) for line in (tmp_path / "trace.log").read_text(encoding="utf-8").splitlines()]
+    assert [line["name"] for line in lines] == ["api.request", "json.decode", "scan", "zpl.parse"]
+
+
+def test_slow_scan_is_exported_when_the_next_one_starts(tmp_path):
+    tracer = make_tracer(tmp_path, slow_scan_ms=0)
+    tracer.start_scan("TEC-1")
+    tracer.end_scan()
+    assert not (tmp_path / "traces").exists()
+
+    tracer.start_scan("TEC-2")
+    assert len(list((tmp_path / "traces").glob("scan-1-*.json"))) == 1
@@ -0,0 +1,23 @@
+from api.transfer_stats import API, TransferStats
+from custom_widgets.image_loader import thumbnail_url
+
+
+def test_thumbnail_url_uses_the_mercadolibre_variant():
+    assert thumbnail_url("https://http2.mlstatic.com/D_NQ_NP_123456-MLM789_012023-O.webp") == "https://http2.mlstatic.com/D_NQ_NP_123456-MLM789_012023-I.webp"
+    assert thumbnail_url("http://mlm-s2-p.mlstatic.com/123-MLM456_789-F.jpg?x=1") == "http://mlm-s2-p.mlstatic.com/123-MLM456_789-I.jpg?x=1"
+    # Otros servidores no tienen variantes
+    assert thumbnail_url("https://example.com/foto-O.jpg") == "https://example.com/foto-O.jpg"
+
+
+def test_compressed_api_responses_are_measured(stub_api, stub_api_server, monkeypatch):
+    stub_api_server.compress = True
+    stub_api_server.item_extra = {"pictures": [{"url": f"https://http2.mlstatic.com/D_{index}-O.jpg"} for index in range(50)]}
+    stats = TransferStats()
+    monkeypatch.setattr("api.http_interceptor.transfer_stats", stats)
+
+    item = stub_api.get_mercadolibre_item("SKU1", {"label_size": "4_x_2_5"})
+
+    assert len(item["pictures"]) == 50
+    scan = stats.start_scan()
+    assert scan[f"{API}_count"] == 1
+    assert 0 < scan[f"{API}_wire"] < scan[f"{API}_decoded"] / 3
@@ -0,0 +1,46 @@
+import pytest
+
+from zpl import parse_zpl_document, set_label_copies
+
+
+def test_document_is_split_into_label_blocks():
+    zpl_text = "~JA\n^XA^FDUNO^FS^PQ2,0,1,Y^XZ\n\n^XA^FDDOS^FS^XZ"
+    document = parse_zpl_document(zpl_text)
+
+    assert document.is_valid and document.is_multi_label
+    assert [block.text for block in document.blocks] == ["^XA^FDUNO^FS^PQ2,0,1,Y^XZ", "^XA^FDDOS^FS^XZ"]
+    assert [zpl_text[block.start : block.end] for block in document.blocks] == [block.text for block in document.blocks]
+    assert [block.copies for block in document.blocks] == [2, 1]
+    assert document.total_labels == 3
+
+
+@pytest.mark.parametrize(
+    "zpl_text",
+    [
+        "^XA^FDUNO^FS^XZ texto suelto ^XA^FDDOS^FS^XZ",  # Texto entre bloques
+        "^XA^FDUNO^FS^XA^FDDOS^FS^XZ",  # ^XA sin su ^XZ
+        "^XA^FDUNO^FS^XZ^FO10,10",  # Comando fuera de un bloque
+        "^XA^FDUNO^FS",  # Sin ^XZ
+        "",
+    ],
+)
+def test_malformed_documents_are_invalid(zpl_text):
+    assert not parse_zpl_document(zpl_text).is_valid
+
+
+@pytest.mark.parametrize(
+    "zpl_text, expected",
+    [
+        ("^XA^FDSKU^FS^PQ1,0,1,Y^XZ", "^XA^FDSKU^FS^PQ5,0,1,Y^XZ"),
+        ("^XA^FDSKU^FS^PQ3^XZ", "^XA^FDSKU^FS^PQ5^XZ"),  # ^PQ sin más parámetros
+        ("^XA^FDSKU^FS^pq2,0,1,N^XZ", "^XA^FDSKU^FS^pq5,0,1,N^XZ"),  # Se conservan el resto de parámetros
+        ("^XA^FDSKU^FS^XZ", "^XA^FDSKU^FS^PQ5,0,1,Y^XZ"),  # Sin ^PQ: se agrega antes del ^XZ
+        ("^XA^FDPQ1^FS^XZ", "^XA^FDPQ1^FS^PQ5,0,1,Y^XZ"),  # "PQ" dentro de un dato no es un comando
+        (
+            "^XA^FDUNO^FS^PQ2,0,1,Y^XZ\n^XA^FDDOS^FS^XZ",
+            "^XA^FDUNO^FS^PQ5,0,1,Y^XZ\n^XA^FDDOS^FS^PQ5,0,1,Y^XZ",
+        ),  # Cada bloque de un documento con varias etiquetas
+    ],
+)
+def test_set_label_copies(zpl_text, expected):
+    assert set_label_copies(zpl_text, 5) == expected
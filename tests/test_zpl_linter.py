@@ -0,0 +1,56 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from zpl import ERROR, lint_zpl, parse_zpl_document
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "zpl"
+GOOD_FIXTURES = sorted((FIXTURES_DIR / "good").glob("*.zpl"))
+BAD_FIXTURES = sorted((FIXTURES_DIR / "bad").glob("*.zpl"))
+
+
+def read_fixture(path):
+    return path.read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("path", GOOD_FIXTURES, ids=lambda path: path.stem)
+def test_good_fixtures_have_no_diagnostics(path):
+    zpl_text = read_fixture(path)
+    assert lint_zpl(zpl_text) == []
+    assert parse_zpl_document(zpl_text.strip()).is_valid
+
+
+@pytest.mark.parametrize("path", BAD_FIXTURES, ids=lambda path: path.stem)
+def test_bad_fixtures_report_expected_code(path):
+    """El nombre del archivo indica el código esperado: <código>__<descripción>.zpl"""
+    zpl_text = read_fixture(path)
+    expected_code = path.stem.split("__", 1)[0]
+    diagnostics = lint_zpl(zpl_text)
+
+    assert expected_code in [diagnostic.code for diagnostic in diagnostics]
+    for diagnostic in diagnostics:
+        assert 0 <= diagnostic.start < diagnostic.end <= len(zpl_text)
+
+
+def test_diagnostic_offsets_point_to_command():
+    zpl_text = "^XA^PW400^FO520,20^FDFuera^FS^XZ"
+    (diagnostic,) = lint_zpl(zpl_text)
+    assert diagnostic.severity == ERROR
+    assert zpl_text[diagnostic.start : diagnostic.end] == "^FO520,20"
+
+
+def test_large_document_lints_under_50ms():
+    """Documento de ~500 KB (gráficos embebidos y varias etiquetas con muchos campos)."""
+    label = "^XA^PW800^FO10,10^GFA,60000,60000,100," + "F0" * 60000 + "^FS" + "^FO10,10^A0N,20,20^FDtexto^FS" * 500 + "^PQ1,0,1,Y^XZ\n"
+    zpl_text = label * 4
+    assert len(zpl_text) > 400_000
+
+    elapsed = min(_timed(lint_zpl, zpl_text) for _ in range(3))
+    assert elapsed < 0.05
+
+
+def _timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start